@@ -0,0 +1,328 @@
+from typing import Optional, List, Dict, Any, Tuple, Union
+from collections import OrderedDict
+from contextvars import ContextVar
+from starlette.responses import Response
+import asyncio
+import ipaddress
+import json
+import math
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Applied when RATE_LIMITS is unset, but only once TRUSTED_PROXIES makes client
+# addresses reliable; behind a proxy the socket peer is the same for everyone
+DEFAULT_RATE_LIMITS = "POST /api/contact=5/min:5;POST,PUT,DELETE /api/*=120/min:30"
+BUSY_MESSAGE = "Server is busy, please retry shortly"
+# Paths that never touch MongoDB and are never shed
+EXEMPT_PATHS = ("/api/", "/api/health", "/api/stats/")
+PERIODS = {"s": 1, "sec": 1, "min": 60, "h": 3600}
+
+class RateLimitRule:
+    """Per-client token bucket limit for requests matching methods and a path"""
+
+    def __init__(self, methods: Tuple[str, ...], path: str, rate: float, burst: int):
+        self.methods = methods
+        self.path = path
+        self.rate = rate
+        self.burst = burst
+        self.name = f"{','.join(methods)} {path}"
+
+    def matches(self, method: str, path: str) -> bool:
+        if method not in self.methods:
+            return False
+        if self.path.endswith("*"):
+            return path.startswith(self.path[:-1])
+        return path == self.path
+
+def parse_rate_limits(spec: str) -> List[RateLimitRule]:
+    """Parse "METHODS PATH=COUNT/PERIOD[:BURST]" rules separated by ';'
+
+    e.g. "POST /api/contact=5/min:5;POST,PUT,DELETE /api/*=120/min:30".
+    The first matching rule applies; an empty spec disables rate limiting.
+    """
+    rules = []
+    for entry in filter(None, (part.strip() for part in spec.split(";"))):
+        target, limit = entry.rsplit("=", 1)
+        methods, path = target.split()
+        limit, _, burst = limit.partition(":")
+        count, period = limit.split("/")
+        rate = float(count) / PERIODS[period]
+        rules.append(RateLimitRule(
+            tuple(method.upper() for method in methods.split(",")),
+            path,
+            rate,
+            int(burst) if burst else max(1, math.ceil(float(count)))
+        ))
+    return rules
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+def parse_networks(spec: str) -> List[Network]:
+    """Parse comma-separated addresses or CIDRs such as 10.0.0.0/8,127.0.0.1"""
+    return [ipaddress.ip_network(part.strip(), strict=False) for part in spec.split(",") if part.strip()]
+
+def client_address(peer: Optional[str], forwarded_for: Optional[str], trusted: List[Network]) -> str:
+    """Address of the client that sent a request, as far as it can be trusted
+
+    X-Forwarded-For is only read when the socket peer is a trusted proxy.
+    Each proxy appends the address it received the request from, so the
+    list is walked from the right, skipping trusted proxies; the first
+    other hop is the client. Entries further left are client-supplied.
+    """
+    if not peer:
+        return "unknown"
+    if not forwarded_for or not _is_trusted(peer, trusted):
+        return peer
+    client = peer
+    for hop in reversed(forwarded_for.split(",")):
+        hop = hop.strip()
+        try:
+            ipaddress.ip_address(hop)
+        except ValueError:
+            # Garbage appended by the client; the last valid hop is all we know
+            return client
+        client = hop
+        if not _is_trusted(hop, trusted):
+            return client
+    return client
+
+def _is_trusted(address: str, trusted: List[Network]) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in trusted)
+
+class AdmissionController:
+    """Per-IP token buckets plus global caps on concurrent Mongo-bound requests.
+
+    Writes get their own, smaller cap inside the global one, so a flood of
+    admin or contact writes can never take every slot from public reads.
+
+    All of this state is per process. Under the prefork launcher every
+    worker enforces the limits on its own, so with N workers a client may
+    get up to N times its rate limit and MongoDB may see up to N times
+    max_concurrency requests; size the settings per worker.
+    """
+
+    def __init__(self, rules: List[RateLimitRule], max_concurrency: int, max_write_concurrency: int, queue_timeout: float, max_clients: int = 10000):
+        self.rules = rules
+        self.queue_timeout = queue_timeout
+        self.max_clients = max_clients
+        self.max_concurrency = max_concurrency
+        self.max_write_concurrency = max_write_concurrency
+        self.reset()
+
+    def reset(self):
+        """Drop all buckets, slots and counters, e.g. in a freshly forked worker"""
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._write_slots = asyncio.Semaphore(self.max_write_concurrency)
+        # (rule name, client) -> [tokens, last refill]; LRU-bounded to max_clients
+        self._buckets: OrderedDict = OrderedDict()
+        self.in_flight = 0
+        self.admitted = 0
+        self.shed_overloaded = 0
+        self.shed_rate_limited: Dict[str, int] = {rule.name: 0 for rule in self.rules}
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        max_concurrency = int(os.environ.get('MAX_DB_CONCURRENCY', '64'))
+        default_rules = DEFAULT_RATE_LIMITS if os.environ.get('TRUSTED_PROXIES') else ""
+        return cls(
+            rules=parse_rate_limits(os.environ.get('RATE_LIMITS', default_rules)),
+            max_concurrency=max_concurrency,
+            max_write_concurrency=int(os.environ.get('MAX_DB_WRITE_CONCURRENCY', str(max(1, max_concurrency // 2)))),
+            queue_timeout=float(os.environ.get('ADMISSION_QUEUE_TIMEOUT_MS', '100')) / 1000,
+            max_clients=int(os.environ.get('RATE_LIMIT_MAX_CLIENTS', '10000'))
+        )
+
+    def check_rate(self, method: str, path: str, client: str) -> Optional[float]:
+        """Take a token for the request; returns seconds to wait if none is left"""
+        rule = next((rule for rule in self.rules if rule.matches(method, path)), None)
+        if rule is None:
+            return None
+
+        now = time.monotonic()
+        key = (rule.name, client)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [float(rule.burst), now]
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(rule.burst, bucket[0] + (now - bucket[1]) * rule.rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return None
+        self.shed_rate_limited[rule.name] += 1
+        return (1 - bucket[0]) / rule.rate
+
+    async def _acquire(self, semaphore: asyncio.Semaphore) -> bool:
+        if not semaphore.locked():
+            await semaphore.acquire()
+            return True
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=self.queue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def acquire(self, write: bool) -> bool:
+        """Take a concurrency slot, waiting at most queue_timeout"""
+        if write and not await self._acquire(self._write_slots):
+            self.shed_overloaded += 1
+            return False
+        if not await self._acquire(self._slots):
+            if write:
+                self._write_slots.release()
+            self.shed_overloaded += 1
+            return False
+        self.in_flight += 1
+        self.admitted += 1
+        return True
+
+    def release(self, write: bool):
+        self.in_flight -= 1
+        self._slots.release()
+        if write:
+            self._write_slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "max_write_concurrency": self.max_write_concurrency,
+            "admitted": self.admitted,
+            "shed_overloaded": self.shed_overloaded,
+            "shed_rate_limited": dict(self.shed_rate_limited),
+            "tracked_clients": len(self._buckets),
+        }
+
+# Set by AdmissionControlMiddleware once the app builds its middleware stack
+admission_controller: Optional[AdmissionController] = None
+
+class ReadTicket:
+    """Concurrency slot a read request may take once it knows it must query MongoDB"""
+
+    def __init__(self, controller: AdmissionController):
+        self.controller = controller
+        self.held = False
+
+_read_ticket: ContextVar[Optional[ReadTicket]] = ContextVar("admission_read_ticket", default=None)
+
+async def admit_read() -> bool:
+    """Take the current read request's slot; False if it should be shed
+
+    Reads answered from validators or caches never call this, so they are
+    never shed for a MongoDB cap they would not use. Outside admission
+    control, and on repeated calls, this admits immediately.
+    """
+    ticket = _read_ticket.get()
+    if ticket is None or ticket.held:
+        return True
+    if not await ticket.controller.acquire(False):
+        return False
+    ticket.held = True
+    return True
+
+class ServerBusy(Exception):
+    """Raised by a read that could not be admitted; answered by server_busy_handler"""
+
+def _rejection_body(message: str) -> bytes:
+    return json.dumps({"success": False, "message": message}).encode()
+
+def busy_response() -> Response:
+    """The 503 a shed read gets, the same one the middleware sends"""
+    return Response(
+        _rejection_body(BUSY_MESSAGE),
+        status_code=503,
+        media_type="application/json",
+        headers={"Retry-After": "1"}
+    )
+
+async def server_busy_handler(request, exc: ServerBusy) -> Response:
+    return busy_response()
+
+def _reset_after_fork():
+    if admission_controller is not None:
+        admission_controller.reset()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+class AdmissionControlMiddleware:
+    """ASGI middleware answering shed requests with 429/503 before any work is done"""
+
+    def __init__(self, app):
+        global admission_controller
+        self.app = app
+        self.enabled = os.environ.get('ADMISSION_CONTROL', '1') == '1'
+        # Proxies whose X-Forwarded-For is believed, e.g. the ingress
+        self.trusted_proxies = parse_networks(os.environ.get('TRUSTED_PROXIES', ''))
+        self.controller = admission_controller = AdmissionController.from_env()
+
+    def _client(self, scope) -> str:
+        client = scope.get("client")
+        forwarded_for = None
+        if self.trusted_proxies:
+            # Proxies may send several headers; together they form one list
+            values = [value.decode("latin-1") for name, value in scope["headers"] if name == b"x-forwarded-for"]
+            forwarded_for = ",".join(values) or None
+        return client_address(client[0] if client else None, forwarded_for, self.trusted_proxies)
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if (
+            not self.enabled
+            or scope["type"] != "http"
+            or not path.startswith("/api/")
+            or path in EXEMPT_PATHS
+            or path.startswith(EXEMPT_PATHS[-1])
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        retry_after = self.controller.check_rate(method, path, self._client(scope))
+        if retry_after is not None:
+            await _reject(send, 429, "Too many requests, please slow down", retry_after)
+            return
+
+        if method not in ("POST", "PUT", "PATCH", "DELETE"):
+            # Reads take their slot through admit_read, after the 304 and cache checks
+            ticket = ReadTicket(self.controller)
+            token = _read_ticket.set(ticket)
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                _read_ticket.reset(token)
+                if ticket.held:
+                    self.controller.release(False)
+            return
+
+        if not await self.controller.acquire(True):
+            await _reject(send, 503, BUSY_MESSAGE, 1)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(True)
+
+async def _reject(send, status_code: int, message: str, retry_after: float):
+    body = _rejection_body(message)
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,309 @@
+"""Drive every public and admin API route in-process and report throughput and latency.
+
+Requests go through httpx's ASGI transport straight into the FastAPI app,
+so numbers cover routing, validation, serialization and the database layer
+without any network or server overhead. The app runs against a scratch
+database on MONGO_URL, or against mongomock-motor with --backend memory.
+
+    python -m benchmarks.endpoints --concurrency 1,16,64 --requests 500 \\
+        --contacts 100000 --projects 10000 --output bench.json
+    python -m benchmarks.endpoints --compare bench.json --output bench-new.json
+"""
+from benchmarks.common import summarize_latencies
+from dotenv import load_dotenv
+from datetime import datetime
+from pathlib import Path
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+import uuid
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# (name, method, path, body); {service_id}-style placeholders are filled from the dataset
+SCENARIOS = [
+    ("root", "GET", "/api/", None),
+    ("health", "GET", "/api/health", None),
+    ("profile", "GET", "/api/profile", None),
+    ("portfolio", "GET", "/api/portfolio", None),
+    ("portfolio_fresh", "GET", "/api/portfolio?snapshot=false", None),
+    ("search", "GET", "/api/search?q=react", None),
+    ("services", "GET", "/api/services", None),
+    ("service", "GET", "/api/services/{service_id}", None),
+    ("projects", "GET", "/api/projects", None),
+    ("projects_fields", "GET", "/api/projects?fields=title,image,technologies", None),
+    ("projects_technology", "GET", "/api/projects?technology=React", None),
+    ("projects_facets", "GET", "/api/projects/facets", None),
+    ("project", "GET", "/api/projects/{project_id}", None),
+    ("testimonials", "GET", "/api/testimonials", None),
+    ("testimonial", "GET", "/api/testimonials/{testimonial_id}", None),
+    ("contacts_page", "GET", "/api/contact?limit=50", None),
+    ("contacts_unread", "GET", "/api/contact?limit=50&is_read=false", None),
+    ("contacts_export", "GET", "/api/contact/export", None),
+    ("profile_update", "PUT", "/api/profile", {"location": "San Francisco, CA"}),
+    ("services_bulk_reorder", "POST", "/api/services/bulk", {"order": "{service_ids}"}),
+    ("service_create", "POST", "/api/services", {"title": "Bench", "description": "Benchmark", "features": []}),
+    ("service_update", "PUT", "/api/services/{service_id}", {"description": "Benchmark update"}),
+    ("service_delete", "DELETE", "/api/services/{disposable_service_id}", None),
+    ("projects_bulk_reorder", "POST", "/api/projects/bulk", {"order": "{project_ids}"}),
+    ("project_create", "POST", "/api/projects", {
+        "title": "Bench", "description": "Benchmark", "image": "/api/placeholder/400/300",
+        "technologies": ["React"], "results": [], "live_url": "#", "github_url": "#"
+    }),
+    ("project_update", "PUT", "/api/projects/{project_id}", {"description": "Benchmark update"}),
+    ("project_delete", "DELETE", "/api/projects/{disposable_project_id}", None),
+    ("testimonials_bulk_reorder", "POST", "/api/testimonials/bulk", {"order": "{testimonial_ids}"}),
+    ("testimonial_create", "POST", "/api/testimonials", {
+        "name": "Bench", "position": "CTO", "company": "Bench", "content": "Benchmark", "rating": 5
+    }),
+    ("testimonial_update", "PUT", "/api/testimonials/{testimonial_id}", {"content": "Benchmark update"}),
+    ("testimonial_delete", "DELETE", "/api/testimonials/{disposable_testimonial_id}", None),
+    ("contact_submit", "POST", "/api/contact", {"name": "Bench", "email": "bench@example.com", "message": "Benchmark"}),
+    ("contact_mark_read", "PUT", "/api/contact/{contact_id}", {"is_read": True}),
+]
+
+# Full reorders must list every active document, so these are read right before use
+ORDER_PLACEHOLDERS = {"{service_ids}": "services", "{project_ids}": "projects", "{testimonial_ids}": "testimonials"}
+# Ids that can only be used once, e.g. by DELETE; a fresh document is inserted per request
+DISPOSABLE_PLACEHOLDERS = {
+    "{disposable_service_id}": "services",
+    "{disposable_project_id}": "projects",
+    "{disposable_testimonial_id}": "testimonials",
+}
+
+def _use_memory_backend():
+    """Swap Motor for mongomock-motor so the suite runs without a mongod"""
+    try:
+        import mongomock_motor
+    except ImportError:
+        sys.exit("--backend memory needs mongomock-motor: pip install mongomock-motor")
+
+    import database
+
+    class MemoryClient(mongomock_motor.AsyncMongoMockClient):
+        def __init__(self, *args, **kwargs):
+            super().__init__()
+
+    database.AsyncIOMotorClient = MemoryClient
+    # mongomock cannot explain queries
+    os.environ["INDEX_PLAN_CHECK"] = "off"
+
+async def _prepare(args):
+    """Start the app against a scratch database and load the dataset"""
+    os.environ["DB_NAME"] = f"{os.environ.get('DB_NAME', 'portfolio')}_bench"
+    # Every request comes from one client; per-IP rate limits would only measure 429s
+    os.environ.setdefault("RATE_LIMITS", "")
+    if args.backend == "memory":
+        _use_memory_backend()
+
+    import database
+    from seed_data import generate_synthetic
+    from server import app
+
+    # Start once to reach the scratch database, wipe it, then start clean
+    for handler in app.router.on_startup:
+        await handler()
+    await database.database.client.drop_database(os.environ["DB_NAME"])
+    for handler in app.router.on_shutdown:
+        await handler()
+    for handler in app.router.on_startup:
+        await handler()
+    await generate_synthetic(
+        {"contacts": args.contacts, "projects": args.projects, "services": args.services, "testimonials": args.testimonials},
+        batch_size=1000
+    )
+
+    ids = {}
+    for collection_name, key in (("services", "service_id"), ("projects", "project_id"), ("testimonials", "testimonial_id")):
+        document = await database.database.db[collection_name].find_one({"is_active": True}, {"id": 1})
+        ids[key] = document["id"]
+    document = await database.database.db.contacts.find_one({}, {"id": 1})
+    ids["contact_id"] = document["id"]
+    return app, ids
+
+async def _active_ids(collection_name):
+    import database
+
+    documents = await database.get_documents(collection_name, {"is_active": True}, [("order", 1)], fields=["id"])
+    return [document["id"] for document in documents]
+
+async def _disposable_ids(collection_name, count):
+    """Insert inactive documents for a DELETE scenario to remove, one per request"""
+    import database
+    from seed_data import synthetic_document
+
+    rng = random.Random(collection_name)
+    now = datetime.utcnow()
+    documents = [
+        {**synthetic_document(collection_name, n, rng, now), "id": f"bench-{collection_name}-{uuid.uuid4().hex}", "is_active": False}
+        for n in range(count)
+    ]
+    await database.database.db[collection_name].insert_many(documents)
+    database.bump_collection_version(collection_name)
+    return [document["id"] for document in documents]
+
+def _render(value, ids):
+    if isinstance(value, str):
+        if value in ORDER_PLACEHOLDERS:
+            return ids[value]
+        return value.format(**ids)
+    if isinstance(value, dict):
+        return {key: _render(item, ids) for key, item in value.items()}
+    return value
+
+async def _run_scenario(client, scenario, ids, concurrency, total):
+    name, method, path, body = scenario
+    for placeholder, collection_name in ORDER_PLACEHOLDERS.items():
+        if body and placeholder in body.values():
+            ids = {**ids, placeholder: await _active_ids(collection_name)}
+    disposable = next((placeholder for placeholder in DISPOSABLE_PLACEHOLDERS if placeholder in path), None)
+    if disposable:
+        urls = iter([
+            path.replace(disposable, document_id)
+            for document_id in await _disposable_ids(DISPOSABLE_PLACEHOLDERS[disposable], total)
+        ])
+    else:
+        url = _render(path, ids)
+    payload = _render(body, ids)
+    latencies, errors = [], 0
+    counter = itertools.count()
+
+    async def worker():
+        nonlocal errors
+        while next(counter) < total:
+            request_url = next(urls) if disposable else url
+            started = time.perf_counter()
+            response = await client.request(method, request_url, json=payload)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "route": name, "method": method, "path": path, "concurrency": concurrency,
+        "requests_per_sec": round(total / elapsed, 1), "errors": errors,
+        **summarize_latencies(latencies)
+    }
+
+async def _measure_allocations(client, scenario, ids, samples):
+    """Mean peak traced allocation and net retained blocks per request"""
+    name, method, path, body = scenario
+    if any(placeholder in path for placeholder in DISPOSABLE_PLACEHOLDERS):
+        return {}
+    for placeholder, collection_name in ORDER_PLACEHOLDERS.items():
+        if body and placeholder in body.values():
+            ids = {**ids, placeholder: await _active_ids(collection_name)}
+    url, payload = _render(path, ids), _render(body, ids)
+    await client.request(method, url, json=payload)
+
+    tracemalloc.start()
+    peaks = []
+    blocks_before = sys.getallocatedblocks()
+    for _ in range(samples):
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        await client.request(method, url, json=payload)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    retained = sys.getallocatedblocks() - blocks_before
+    tracemalloc.stop()
+    return {
+        "peak_alloc_kib_per_request": round(sum(peaks) / len(peaks) / 1024, 2),
+        "retained_blocks_per_request": round(retained / samples, 2),
+    }
+
+async def run(args):
+    import httpx
+
+    app, ids = await _prepare(args)
+    selected = [scenario for scenario in SCENARIOS if not args.routes or scenario[0] in args.routes]
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for scenario in selected:
+            for concurrency in args.concurrency:
+                # Exports stream the whole contacts collection, keep them short
+                total = max(concurrency, args.requests // 10) if scenario[0] == "contacts_export" else args.requests
+                result = await _run_scenario(client, scenario, ids, concurrency, total)
+                if args.allocations:
+                    result.update(await _measure_allocations(client, scenario, ids, args.allocation_samples))
+                results.append(result)
+                print(f"{result['route']:<28}c={concurrency:<4}{result['requests_per_sec']:>10} req/s"
+                      f"{result['p50_ms']:>9} p50{result['p95_ms']:>9} p95{result['p99_ms']:>9} p99 ms")
+
+    for handler in app.router.on_shutdown:
+        await handler()
+    return results
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def _compare(results, baseline_path):
+    baseline = {
+        (result["route"], result["concurrency"]): result
+        for result in json.loads(Path(baseline_path).read_text())["results"]
+    }
+    print(f"\n{'route':<28}{'conc':>6}{'req/s':>12}{'p99 ms':>12}")
+    for result in results:
+        before = baseline.get((result["route"], result["concurrency"]))
+        if not before:
+            continue
+        throughput = (result["requests_per_sec"] / before["requests_per_sec"] - 1) * 100 if before["requests_per_sec"] else 0.0
+        p99 = (result["p99_ms"] / before["p99_ms"] - 1) * 100 if before["p99_ms"] else 0.0
+        print(f"{result['route']:<28}{result['concurrency']:>6}{throughput:>+11.1f}%{p99:>+11.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=["mongo", "memory"], default="mongo")
+    parser.add_argument("--concurrency", default="1,16", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="requests per route and concurrency level")
+    parser.add_argument("--routes", help="comma-separated scenario names, default all")
+    parser.add_argument("--contacts", type=int, default=1000)
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--services", type=int, default=30)
+    parser.add_argument("--testimonials", type=int, default=50)
+    parser.add_argument("--allocations", action="store_true", help="also measure allocations per request")
+    parser.add_argument("--allocation-samples", type=int, default=50)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run to diff against")
+    args = parser.parse_args()
+    args.concurrency = [int(level) for level in args.concurrency.split(",")]
+    args.routes = set(args.routes.split(",")) if args.routes else None
+
+    load_dotenv(BACKEND_DIR / ".env")
+    results = asyncio.run(run(args))
+
+    if args.compare:
+        _compare(results, args.compare)
+    if args.output:
+        report = {
+            "meta": {
+                "timestamp": datetime.utcnow().isoformat(),
+                "revision": _git_revision(),
+                "backend": args.backend,
+                "requests": args.requests,
+                "dataset": {
+                    "contacts": args.contacts, "projects": args.projects,
+                    "services": args.services, "testimonials": args.testimonials
+                },
+            },
+            "results": results,
+        }
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Compare round trips and latency of the legacy and current write path.
+
+The legacy functions reproduce the read-back-after-write pattern the write
+layer used before it moved to single-command writes. Both variants run
+against a scratch database on MONGO_URL.
+
+    python -m benchmarks.write_path --iterations 500 --output write_path.json
+"""
+from benchmarks.common import CommandCounter, summarize_latencies
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+from datetime import datetime
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import os
+import time
+import uuid
+
+import database
+from database import create_document, update_document, upsert_profile
+
+# Legacy write path: every write is followed by a separate read
+async def legacy_create(collection_name, document):
+    result = await database.database.db[collection_name].insert_one(document)
+    created = await database.database.db[collection_name].find_one({"_id": result.inserted_id})
+    created["_id"] = str(created["_id"])
+    return created
+
+async def legacy_update(collection_name, document_id, update_data):
+    update_data["updated_at"] = datetime.utcnow()
+    result = await database.database.db[collection_name].update_one({"id": document_id}, {"$set": update_data})
+    if result.modified_count > 0:
+        return await database.database.db[collection_name].find_one({"id": document_id})
+    return None
+
+async def legacy_upsert_profile(profile_data):
+    existing = await database.database.db.profiles.find_one({})
+    profile_data["updated_at"] = datetime.utcnow()
+    if existing:
+        await database.database.db.profiles.update_one({"id": existing["id"]}, {"$set": profile_data})
+        return await database.database.db.profiles.find_one({})
+    return await legacy_create("profiles", profile_data)
+
+def _service(i: int):
+    now = datetime.utcnow()
+    return {
+        "id": str(uuid.uuid4()), "title": f"Service {i}", "description": "Benchmark service",
+        "features": ["a", "b"], "order": i, "is_active": True, "created_at": now, "updated_at": now,
+    }
+
+async def _measure(name, iterations, operation, counter):
+    latencies = []
+    counter.reset()
+    for i in range(iterations):
+        started = time.perf_counter()
+        await operation(i)
+        latencies.append((time.perf_counter() - started) * 1000)
+    round_trips = counter.reset()
+    return {"operation": name, "round_trips_per_op": round(round_trips / iterations, 2), **summarize_latencies(latencies)}
+
+async def run(iterations: int):
+    counter = CommandCounter()
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"], event_listeners=[counter])
+    db_name = f"{os.environ.get('DB_NAME', 'portfolio')}_bench_writes"
+    database.database.client = client
+    database.database.db = client[db_name]
+    await client.drop_database(db_name)
+    await database.database.db.services.create_index("id", unique=True)
+    await database.database.db.profiles.insert_one({"id": "profile-bench", "name": "Bench", "email": "bench@example.com"})
+
+    legacy_ids, current_ids = [], []
+
+    async def create_legacy(i):
+        legacy_ids.append((await legacy_create("services", _service(i)))["id"])
+
+    async def create_current(i):
+        current_ids.append((await create_document("services", _service(i)))["id"])
+
+    results = [
+        await _measure("create (legacy)", iterations, create_legacy, counter),
+        await _measure("create", iterations, create_current, counter),
+        await _measure("update (legacy)", iterations, lambda i: legacy_update("services", legacy_ids[i], {"order": -i}), counter),
+        await _measure("update", iterations, lambda i: update_document("services", current_ids[i], {"order": -i}), counter),
+        await _measure("upsert_profile (legacy)", iterations, lambda i: legacy_upsert_profile({"name": f"Bench {i}"}), counter),
+        await _measure("upsert_profile", iterations, lambda i: upsert_profile({"name": f"Bench {i}"}), counter),
+    ]
+
+    await client.drop_database(db_name)
+    client.close()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    load_dotenv(Path(database.__file__).parent / ".env")
+    results = asyncio.run(run(args.iterations))
+
+    print(f"{'operation':<26}{'trips/op':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for result in results:
+        print(f"{result['operation']:<26}{result['round_trips_per_op']:>10}{result['p50_ms']:>10}{result['p99_ms']:>10}")
+    if args.output:
+        Path(args.output).write_text(json.dumps({"iterations": args.iterations, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
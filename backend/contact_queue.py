@@ -0,0 +1,219 @@
+from models import Contact
+from database import database, bump_collection_version
+from pymongo.errors import BulkWriteError
+from typing import Optional, List, Dict, Any, Tuple
+from pathlib import Path
+from datetime import datetime
+import asyncio
+import fcntl
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY = 11000
+
+class ContactQueueFull(Exception):
+    """Too many contacts are waiting for MongoDB; the submission was not accepted"""
+
+class ContactQueue:
+    """Write-behind ingestion for contact submissions.
+
+    A submission is acknowledged once it is appended to a local journal and
+    fsync'd. Concurrent submissions share a single write + fsync (group
+    commit). A background task moves journaled contacts into the contacts
+    collection with insert_many, in batches bounded by size and time.
+
+    Each worker journals to its own file and holds an exclusive flock on it.
+    On start, journals that nobody holds (left behind by a crashed worker)
+    are replayed and removed; starts are serialized on a lock file in the
+    journal directory. Replays may re-insert contacts that were already
+    flushed; the unique id index turns those into ignored duplicate-key
+    errors, so nothing is lost or stored twice.
+
+    While MongoDB is unreachable contacts pile up in memory and the journal;
+    past max_pending new submissions are refused with ContactQueueFull.
+    created_at is stamped when a batch is written rather than on submit, so
+    contacts become visible in created_at order and keyset pages or
+    exports resuming from a cursor do not skip late-flushed ones.
+    """
+
+    def __init__(self):
+        self.running = False
+        self.batch_size = 100
+        self.flush_interval = 0.5
+        self.max_pending = 10000
+        self.journal_path: Optional[Path] = None
+        self._journal = None
+        self._journal_lock = asyncio.Lock()
+        self._to_journal: List[Tuple[Dict[str, Any], bytes, asyncio.Future]] = []
+        self._writer: Optional[asyncio.Task] = None
+        self._pending: List[Dict[str, Any]] = []
+        self._wakeup = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+        self._stats = {"accepted": 0, "flushed": 0, "batches": 0, "failed_flushes": 0, "replayed": 0, "rejected": 0}
+
+    async def start(self, journal_dir: str, batch_size: int = 100, flush_interval: float = 0.5, max_pending: int = 10000):
+        """Replay orphaned journals, then open this worker's journal and start flushing"""
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        directory = Path(journal_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        # Workers booting together take turns, so nobody replays a journal
+        # that another worker has created but not locked yet
+        with open(directory / "contacts.lock", "ab") as directory_lock:
+            await asyncio.to_thread(fcntl.flock, directory_lock.fileno(), fcntl.LOCK_EX)
+            await self._replay_orphans(directory)
+
+            self.journal_path = directory / f"contacts-{os.getpid()}.journal"
+            self._journal = open(self.journal_path, "ab")
+            fcntl.flock(self._journal.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        self._flusher = asyncio.create_task(self._flush_loop())
+        self.running = True
+        logger.info(f"Contact write-behind queue journaling to {self.journal_path}")
+
+    async def stop(self):
+        """Stop accepting submissions and flush everything journaled so far"""
+        if not self.running:
+            return
+        self.running = False
+        if self._writer:
+            await self._writer
+        self._flusher.cancel()
+        try:
+            await self._flusher
+        except asyncio.CancelledError:
+            pass
+        await self._flush_pending()
+
+        async with self._journal_lock:
+            if not self._pending:
+                # Unlink while still holding the lock so no replay picks it up
+                self.journal_path.unlink(missing_ok=True)
+                self._journal.close()
+            else:
+                # Mongo is unreachable; keep the journal for the next start to replay
+                logger.error(f"{len(self._pending)} contacts left in {self.journal_path}")
+                self._journal.close()
+
+    async def submit(self, document: Dict[str, Any]):
+        """Durably accept a contact; returns once it is fsync'd to the journal"""
+        if not self.running:
+            raise RuntimeError("Contact queue is not running")
+        if len(self._pending) + len(self._to_journal) >= self.max_pending:
+            self._stats["rejected"] += 1
+            raise ContactQueueFull(f"{self.max_pending} contacts are already waiting to be stored")
+        line = Contact(**document).model_dump_json().encode() + b"\n"
+        future = asyncio.get_running_loop().create_future()
+        self._to_journal.append((document, line, future))
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_journal())
+        await future
+
+    async def _write_journal(self):
+        """Append every queued line with one write and one fsync per round"""
+        while self._to_journal:
+            entries, self._to_journal = self._to_journal, []
+            try:
+                async with self._journal_lock:
+                    await asyncio.to_thread(self._append, b"".join(line for _, line, _ in entries))
+            except Exception as e:
+                logger.error(f"Error journaling contact submissions: {e}")
+                for _, _, future in entries:
+                    future.set_exception(e)
+                continue
+
+            self._pending.extend(document for document, _, _ in entries)
+            self._stats["accepted"] += len(entries)
+            for _, _, future in entries:
+                future.set_result(None)
+            if len(self._pending) >= self.batch_size:
+                self._wakeup.set()
+
+    def _append(self, data: bytes):
+        self._journal.write(data)
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self._flush_pending()
+
+    async def _flush_pending(self):
+        while self._pending:
+            batch = self._pending[:self.batch_size]
+            try:
+                await insert_contacts(batch)
+            except Exception as e:
+                self._stats["failed_flushes"] += 1
+                logger.error(f"Error flushing {len(batch)} contacts, will retry: {e}")
+                return
+            del self._pending[:len(batch)]
+            self._stats["flushed"] += len(batch)
+            self._stats["batches"] += 1
+
+        # Everything journaled is in Mongo; start the journal over
+        async with self._journal_lock:
+            if not self._pending and not self._to_journal and self._journal.tell():
+                await asyncio.to_thread(self._truncate)
+
+    def _truncate(self):
+        self._journal.truncate(0)
+        # truncate leaves the position alone; tell() is what marks the journal non-empty
+        self._journal.seek(0)
+        os.fsync(self._journal.fileno())
+
+    async def _replay_orphans(self, directory: Path):
+        for path in sorted(directory.glob("contacts-*.journal")):
+            with open(path, "rb+") as journal:
+                try:
+                    fcntl.flock(journal.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue  # owned by a live worker
+
+                documents = []
+                for number, line in enumerate(journal, start=1):
+                    try:
+                        documents.append(Contact.model_validate_json(line).model_dump())
+                    except ValueError:
+                        # A crash can tear the last line; it was never acknowledged
+                        logger.warning(f"Skipping unreadable line {number} in {path}")
+                for start in range(0, len(documents), self.batch_size):
+                    await insert_contacts(documents[start:start + self.batch_size])
+                self._stats["replayed"] += len(documents)
+                logger.info(f"Replayed {len(documents)} contacts from {path}")
+            path.unlink()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "pending": len(self._pending),
+            "journal": str(self.journal_path) if self.journal_path else None,
+            **self._stats
+        }
+
+async def insert_contacts(documents: List[Dict[str, Any]]):
+    """insert_many that treats already-stored contacts (same id) as success
+
+    created_at is set to the time of the write, see ContactQueue.
+    """
+    if not documents:
+        return
+    now = datetime.utcnow()
+    for document in documents:
+        document["created_at"] = now
+    try:
+        await database.db.contacts.insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        if any(error["code"] != DUPLICATE_KEY for error in e.details["writeErrors"]):
+            raise
+    bump_collection_version("contacts", [document["id"] for document in documents])
+
+contact_queue = ContactQueue()
@@ -1,6 +1,20 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from typing import Optional, List, Dict, Any
+from pymongo import IndexModel, ReturnDocument, InsertOne, UpdateOne, DeleteOne
+from models import IndexSpec, COLLECTION_MODELS, ID_INDEX
+from metrics import command_metrics
+from slow_queries import slow_query_log
+from tracing import span, KIND_CLIENT
+from mongo_pool import client_options, read_preference, pool_metrics, prewarm_pool, DEFAULT_MAX_POOL_SIZE
+from typing import Optional, List, Dict, Any, Hashable, Tuple, AsyncIterator, Callable
+from collections import OrderedDict
+import asyncio
+import base64
+import hashlib
+import json
 import os
+import time
+import uuid
+import zlib
 import logging
 from datetime import datetime
 
@@ -9,9 +23,170 @@ logger = logging.getLogger(__name__)
 class Database:
     client: Optional[AsyncIOMotorClient] = None
     db = None
+    # Same database with the read preference configured for GET routes
+    read_db = None
+    # Startup marker as read at connect time: index fingerprint and seed state
+    startup_marker: Dict[str, Any] = {}
 
 database = Database()
 
+class CollectionVersions:
+    """Monotonically increasing per-collection write counters.
+
+    Versions are local to one process and count its own invalidations, so
+    the same number means different content in different workers; they key
+    the in-process caches. Validators are built from the shared counters
+    that cross-worker invalidation keeps in MongoDB instead: while this
+    worker's view of a collection is known to match a shared counter value,
+    every worker hands out the same ETag for it. A collection with no known
+    shared value (invalidation off, or a local write not yet published)
+    falls back to the local version under a random per-process epoch,
+    renewed in every forked worker, which never matches anywhere else.
+    """
+
+    def __init__(self):
+        self.epoch = uuid.uuid4().hex[:12]
+        self._versions: Dict[str, int] = {}
+        self._shared: Dict[str, str] = {}
+
+    def new_epoch(self):
+        """Start a new epoch, e.g. in a freshly forked worker"""
+        self.epoch = uuid.uuid4().hex[:12]
+
+    def get(self, collection_name: str) -> int:
+        return self._versions.get(collection_name, 0)
+
+    def bump(self, collection_name: str) -> int:
+        version = self.get(collection_name) + 1
+        self._versions[collection_name] = version
+        # Until told otherwise, this write is not counted in any shared value
+        self._shared.pop(collection_name, None)
+        return version
+
+    def set_shared(self, collection_name: str, validator: str):
+        """Record that the collection as read from now on matches a shared counter value"""
+        self._shared[collection_name] = validator
+
+    def etag(self, *collection_names: str, variant: str = "") -> str:
+        """Strong ETag for a representation built from the given collections"""
+        versions = ".".join(
+            self._shared.get(name) or f"{self.epoch}~{self.get(name)}" for name in collection_names
+        )
+        suffix = f"-{zlib.crc32(variant.encode()):08x}" if variant else ""
+        return f'"{versions}{suffix}"'
+
+collection_versions = CollectionVersions()
+os.register_at_fork(after_in_child=collection_versions.new_epoch)
+
+class DocumentCache:
+    """Per-collection read-through cache with TTL and size bounds.
+
+    Cached values are shared between callers and must be treated as read-only.
+    Entries are only stored if the collection version did not move while they
+    were being read, so a read that raced with a write is never cached.
+    """
+
+    def __init__(self, ttl: float = 60.0, max_entries: int = 128):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[str, OrderedDict] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def configure(self, ttl: float, max_entries: int):
+        """Apply new bounds and drop everything cached so far"""
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries.clear()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def _counters(self, collection_name: str) -> Dict[str, int]:
+        counters = self._stats.get(collection_name)
+        if counters is None:
+            counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+            self._stats[collection_name] = counters
+        return counters
+
+    def get(self, collection_name: str, key: Hashable) -> Optional[Any]:
+        """Return the cached value or None on a miss"""
+        counters = self._counters(collection_name)
+        entries = self._entries.get(collection_name)
+        entry = entries.get(key) if entries else None
+        if entry is None:
+            counters["misses"] += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del entries[key]
+            counters["misses"] += 1
+            return None
+
+        entries.move_to_end(key)
+        counters["hits"] += 1
+        return value
+
+    def set(self, collection_name: str, key: Hashable, value: Any, version: int):
+        """Store a value read while the collection was at the given version"""
+        if not self.enabled or version != collection_versions.get(collection_name):
+            return
+
+        entries = self._entries.setdefault(collection_name, OrderedDict())
+        entries[key] = (time.monotonic() + self.ttl, value)
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+            self._counters(collection_name)["evictions"] += 1
+
+    def invalidate(self, collection_name: str):
+        """Drop all cached reads for a collection after a write"""
+        self._entries.pop(collection_name, None)
+        self._counters(collection_name)["invalidations"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        collections = {}
+        for collection_name, counters in self._stats.items():
+            lookups = counters["hits"] + counters["misses"]
+            collections[collection_name] = {
+                **counters,
+                "entries": len(self._entries.get(collection_name, ())),
+                "hit_ratio": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+            }
+        return {
+            "enabled": self.enabled,
+            "ttl_seconds": self.ttl,
+            "max_entries": self.max_entries,
+            "collections": collections,
+        }
+
+document_cache = DocumentCache()
+
+# Collections that make up the public portfolio page
+PORTFOLIO_COLLECTIONS = ("profiles", "services", "projects", "testimonials")
+
+# Last assembled /portfolio payload and the collection versions it was built from
+_portfolio_snapshot: Dict[str, Any] = {"versions": None, "expires_at": 0.0, "data": None}
+
+# Called synchronously after every write with the collection and the ids it touched
+_write_listeners: List[Callable[[str, Optional[List[str]]], None]] = []
+
+def add_write_listener(listener: Callable[[str, Optional[List[str]]], None]):
+    """Register a callback for writes; it must be cheap and must not block"""
+    _write_listeners.append(listener)
+
+def bump_collection_version(collection_name: str, document_ids: Optional[List[str]] = None) -> int:
+    """Record a write: advance the collection version and drop its cached reads
+
+    document_ids lists the documents that may have changed, None means any.
+    """
+    version = collection_versions.bump(collection_name)
+    document_cache.invalidate(collection_name)
+    for listener in _write_listeners:
+        listener(collection_name, document_ids)
+    return version
+
 async def get_database() -> AsyncIOMotorClient:
     return database.db
 
@@ -19,79 +194,323 @@ async def get_database() -> AsyncIOMotorClient:
 async def connect_to_mongo():
     """Create database connection"""
     try:
-        database.client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+        options = client_options()
+        pool_metrics.max_pool_size = options.get("maxPoolSize", DEFAULT_MAX_POOL_SIZE)
+        database.client = AsyncIOMotorClient(
+            os.environ['MONGO_URL'],
+            event_listeners=[pool_metrics, command_metrics, slow_query_log],
+            **options
+        )
         database.db = database.client[os.environ['DB_NAME']]
+        database.read_db = database.client.get_database(
+            os.environ['DB_NAME'],
+            read_preference=read_preference()
+        )
+        slow_query_log.configure(
+            threshold_ms=float(os.environ.get('SLOW_QUERY_MS', '100')),
+            capacity=int(os.environ.get('SLOW_QUERY_BUFFER', '200')),
+            explain=explain_command
+        )
+        document_cache.configure(
+            ttl=float(os.environ.get('CACHE_TTL_SECONDS', '60')),
+            max_entries=int(os.environ.get('CACHE_MAX_ENTRIES', '128'))
+        )
         
         # Test the connection
         await database.client.admin.command('ping')
         logger.info("Successfully connected to MongoDB")
-        
-        # Create indexes for better performance
-        await create_indexes()
+        database.startup_marker = await read_startup_marker()
+
+        # Indexes are only reconciled when the registry changed since the last boot
+        await asyncio.gather(
+            prewarm_pool(
+                database.client,
+                int(os.environ.get('MONGO_PREWARM_CONNECTIONS', str(options.get("minPoolSize", 0))))
+            ),
+            create_indexes()
+        )
         
     except Exception as e:
         logger.error(f"Failed to connect to MongoDB: {e}")
         raise
 
+async def explain_command(command: Dict[str, Any]) -> Dict[str, Any]:
+    """Query planner output for a raw command document, without running it"""
+    return await database.db.command({"explain": command, "verbosity": "queryPlanner"})
+
 async def close_mongo_connection():
     """Close database connection"""
     if database.client:
         database.client.close()
         logger.info("Disconnected from MongoDB")
 
+# Declared indexes per collection, taken from the document models
+INDEX_REGISTRY: Dict[str, List[IndexSpec]] = {
+    collection_name: model.indexes for collection_name, model in COLLECTION_MODELS.items()
+}
+
+# Query shapes issued by the routes; verify_query_plans() checks none of them scans
+ROUTE_QUERIES = [
+    ("services", {"is_active": True}, [("order", 1)]),
+    ("projects", {"is_active": True}, [("order", 1)]),
+    ("projects", {"technologies": {"$all": ["plan-probe"]}, "is_active": True}, [("order", 1)]),
+    ("testimonials", {"is_active": True}, [("order", 1)]),
+    ("contacts", {}, [("created_at", -1), ("id", -1)]),
+    ("contacts", {"is_read": False}, [("created_at", -1), ("id", -1)]),
+    *[(collection_name, {"id": "plan-probe"}, None) for collection_name in COLLECTION_MODELS]
+]
+
+# Result of the last check_indexes() or reconcile_indexes() run
+index_report: Dict[str, Dict[str, List[str]]] = {}
+
+# Startup marker: one document recording what earlier boots already did
+STARTUP_MARKER_ID = "startup"
+
+def index_fingerprint() -> str:
+    """Hash of the declared index registry; changes whenever a spec does"""
+    registry = {
+        collection_name: [spec.model_dump() for spec in specs]
+        for collection_name, specs in sorted(INDEX_REGISTRY.items())
+    }
+    return hashlib.sha256(json.dumps(registry, sort_keys=True).encode()).hexdigest()[:16]
+
+async def read_startup_marker() -> Dict[str, Any]:
+    return await database.db.app_meta.find_one({"_id": STARTUP_MARKER_ID}) or {}
+
+async def write_startup_marker(**fields: Any):
+    """Record startup work as done so later boots can skip it"""
+    await database.db.app_meta.update_one(
+        {"_id": STARTUP_MARKER_ID},
+        {"$set": {**fields, "updated_at": datetime.utcnow()}},
+        upsert=True
+    )
+    database.startup_marker.update(fields)
+
+def _index_model(spec: IndexSpec) -> IndexModel:
+    return IndexModel(spec.keys, name=spec.name, unique=spec.unique, **spec.options)
+
+async def _existing_indexes(collection_name: str) -> Dict[str, Dict[str, Any]]:
+    return {index["name"]: index async for index in database.db[collection_name].list_indexes()}
+
+def _index_drift(existing: Dict[str, Dict[str, Any]], specs: List[IndexSpec]) -> Dict[str, List[str]]:
+    declared = {spec.name: spec for spec in specs}
+    return {
+        "missing": [name for name in declared if name not in existing],
+        "extra": [name for name in existing if name != "_id_" and name not in declared],
+        "mismatched": [
+            name for name, spec in declared.items()
+            if name in existing and bool(existing[name].get("unique")) != spec.unique
+        ]
+    }
+
+def _store_report(report: Dict[str, Dict[str, List[str]]]):
+    index_report.clear()
+    index_report.update(report)
+
+async def check_indexes() -> Dict[str, Dict[str, List[str]]]:
+    """Report drift from the declared specs without changing anything
+
+    Collections are checked concurrently, one listIndexes each.
+    """
+    existing = await asyncio.gather(*(_existing_indexes(name) for name in INDEX_REGISTRY))
+    report = {
+        collection_name: _index_drift(indexes, INDEX_REGISTRY[collection_name])
+        for collection_name, indexes in zip(INDEX_REGISTRY, existing)
+    }
+    _store_report(report)
+    return report
+
+async def reconcile_indexes(drop_extra: bool = False) -> Dict[str, Dict[str, List[str]]]:
+    """Create missing registry indexes and report drift from the declared specs
+
+    Collections are reconciled concurrently, one listIndexes each.
+    """
+    async def reconcile(collection_name: str, specs: List[IndexSpec]) -> Dict[str, List[str]]:
+        collection = database.db[collection_name]
+        drift = _index_drift(await _existing_indexes(collection_name), specs)
+        missing, extra, mismatched = drift["missing"], drift["extra"], drift["mismatched"]
+        declared = {spec.name: spec for spec in specs}
+
+        if missing:
+            await collection.create_indexes([_index_model(declared[name]) for name in missing])
+            logger.info(f"Created indexes on {collection_name}: {', '.join(missing)}")
+        if extra:
+            if drop_extra:
+                for name in extra:
+                    await collection.drop_index(name)
+                logger.info(f"Dropped undeclared indexes on {collection_name}: {', '.join(extra)}")
+            else:
+                logger.warning(f"Undeclared indexes on {collection_name}: {', '.join(extra)}")
+        if mismatched:
+            logger.warning(f"Indexes with drifted options on {collection_name}: {', '.join(mismatched)}")
+
+        return drift
+
+    results = await asyncio.gather(*(reconcile(name, specs) for name, specs in INDEX_REGISTRY.items()))
+    report = dict(zip(INDEX_REGISTRY, results))
+    _store_report(report)
+    return report
+
+async def backfill_missing_ids() -> Dict[str, int]:
+    """Give every document without an id a fresh one
+
+    Older versions of the create routes stored documents without an id.
+    Two of those in one collection would fail the unique id index build.
+    """
+    async def backfill(collection_name: str) -> int:
+        collection = database.db[collection_name]
+        missing = [document["_id"] async for document in collection.find({"id": None}, {"_id": 1})]
+        if not missing:
+            return 0
+        await collection.bulk_write(
+            [UpdateOne({"_id": object_id, "id": None}, {"$set": {"id": str(uuid.uuid4())}}) for object_id in missing],
+            ordered=False
+        )
+        bump_collection_version(collection_name)
+        logger.info(f"Assigned ids to {len(missing)} {collection_name} documents")
+        return len(missing)
+
+    collection_names = [
+        name for name, specs in INDEX_REGISTRY.items()
+        if any(spec.name == ID_INDEX.name for spec in specs)
+    ]
+    counts = await asyncio.gather(*(backfill(name) for name in collection_names))
+    return dict(zip(collection_names, counts))
+
+def _is_collscan(stage: Dict[str, Any]) -> bool:
+    if stage.get("stage") == "COLLSCAN":
+        return True
+    children = stage.get("inputStages", [])
+    if "inputStage" in stage:
+        children = [stage["inputStage"], *children]
+    return any(_is_collscan(child) for child in children)
+
+async def verify_query_plans() -> List[str]:
+    """Explain every known route query and return the ones planned as a COLLSCAN"""
+    async def is_collscan(collection_name: str, filter_dict: Dict, sort_dict: Optional[List]) -> bool:
+        cursor = database.db[collection_name].find(filter_dict)
+        if sort_dict:
+            cursor = cursor.sort(sort_dict)
+        explain = await cursor.explain()
+        winning_plan = explain["queryPlanner"]["winningPlan"]
+        # Slot-based engine plans nest the classic plan tree under queryPlan
+        return _is_collscan(winning_plan.get("queryPlan", winning_plan))
+
+    scans = await asyncio.gather(*(is_collscan(*query) for query in ROUTE_QUERIES))
+    return [
+        f"{collection_name} {filter_dict} sort={sort_dict}"
+        for (collection_name, filter_dict, sort_dict), scan in zip(ROUTE_QUERIES, scans) if scan
+    ]
+
 async def create_indexes():
-    """Create database indexes for better performance"""
+    """Reconcile the index registry and optionally check route query plans
+
+    Every startup compares the live indexes with the registry. When the
+    startup marker shows this exact registry was already reconciled and
+    nothing has drifted since, the id backfill, index builds and plan
+    checks are skipped, unless STARTUP_INDEX_CHECK=always.
+    """
+    fingerprint = index_fingerprint()
+    drop_extra = os.environ.get('INDEX_DROP_EXTRA') == '1'
+    if database.startup_marker.get("index_fingerprint") == fingerprint and os.environ.get('STARTUP_INDEX_CHECK') != 'always':
+        try:
+            report = await check_indexes()
+        except Exception as e:
+            logger.error(f"Failed to check indexes: {e}")
+            return
+        # Mismatched options are only ever reported, so they do not force a reconcile
+        if not any(drift["missing"] or (drop_extra and drift["extra"]) for drift in report.values()):
+            for collection_name, drift in report.items():
+                if drift["extra"]:
+                    logger.warning(f"Undeclared indexes on {collection_name}: {', '.join(drift['extra'])}")
+                if drift["mismatched"]:
+                    logger.warning(f"Indexes with drifted options on {collection_name}: {', '.join(drift['mismatched'])}")
+            logger.info("Indexes match the registry reconciled at an earlier startup, skipping reconcile")
+            return
+        logger.warning("Indexes drifted since the last startup, reconciling")
+
     try:
-        # Profiles collection - ensure single profile
-        await database.db.profiles.create_index("email", unique=True)
-        
-        # Services collection - order index
-        await database.db.services.create_index([("order", 1), ("is_active", 1)])
-        
-        # Projects collection - order index
-        await database.db.projects.create_index([("order", 1), ("is_active", 1)])
-        
-        # Testimonials collection - order index  
-        await database.db.testimonials.create_index([("order", 1), ("is_active", 1)])
-        
-        # Contacts collection - created_at index
-        await database.db.contacts.create_index([("created_at", -1)])
-        
-        logger.info("Database indexes created successfully")
+        await backfill_missing_ids()
+        await reconcile_indexes(drop_extra=drop_extra)
+        logger.info("Database indexes reconciled successfully")
     except Exception as e:
         logger.error(f"Failed to create indexes: {e}")
+        return
+
+    plan_check = os.environ.get('INDEX_PLAN_CHECK', 'warn')
+    if plan_check != 'off':
+        try:
+            failures = await verify_query_plans()
+        except Exception as e:
+            logger.error(f"Failed to verify route query plans: {e}")
+            failures = []
+        for failure in failures:
+            logger.warning(f"Route query is a collection scan: {failure}")
+        if failures and plan_check == 'fail':
+            raise RuntimeError(f"{len(failures)} route queries are collection scans")
+    await write_startup_marker(index_fingerprint=fingerprint)
 
 # Generic CRUD operations
+def _db_span(operation: str, collection_name: str):
+    """Tracing span around one MongoDB round trip"""
+    return span(
+        "mongo", f"{operation} {collection_name}", KIND_CLIENT,
+        **{"db.system": "mongodb", "db.operation": operation, "db.mongodb.collection": collection_name}
+    )
+
+def _projection(fields: Optional[List[str]] = None) -> Dict[str, int]:
+    """Mongo projection that drops _id and optionally keeps only the given fields
+
+    Documents are addressed by their string id, so _id never leaves the
+    database and nothing has to convert ObjectIds per document.
+    """
+    if not fields:
+        return {"_id": 0}
+    return {**{field: 1 for field in fields}, "_id": 0}
+
 async def create_document(collection_name: str, document: Dict[str, Any]) -> Dict[str, Any]:
-    """Create a new document in the specified collection"""
+    """Create a new document in the specified collection
+
+    The inserted document is returned as written, without reading it back.
+    """
     try:
-        result = await database.db[collection_name].insert_one(document)
+        with _db_span("insert", collection_name):
+            result = await database.db[collection_name].insert_one(document)
+        bump_collection_version(collection_name, [document["id"]])
         if result.inserted_id:
-            created_doc = await database.db[collection_name].find_one({"_id": result.inserted_id})
-            # Convert ObjectId to string for JSON serialization
-            created_doc["_id"] = str(created_doc["_id"])
-            return created_doc
+            # insert_one adds the ObjectId to the dict; it is not part of the API
+            return {key: value for key, value in document.items() if key != "_id"}
         return None
     except Exception as e:
         logger.error(f"Error creating document in {collection_name}: {e}")
         raise
 
-async def get_document(collection_name: str, document_id: str) -> Optional[Dict[str, Any]]:
-    """Get a document by ID"""
+async def get_document(collection_name: str, document_id: str, fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+    """Get a document by ID, optionally projected down to the given fields"""
     try:
-        document = await database.db[collection_name].find_one({"id": document_id})
-        if document:
-            document["_id"] = str(document["_id"])
-        return document
+        with _db_span("find", collection_name):
+            return await database.read_db[collection_name].find_one({"id": document_id}, _projection(fields))
     except Exception as e:
         logger.error(f"Error fetching document from {collection_name}: {e}")
         raise
 
-async def get_documents(collection_name: str, filter_dict: Optional[Dict] = None, sort_dict: Optional[List] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-    """Get multiple documents with optional filtering and sorting"""
+async def get_documents(collection_name: str, filter_dict: Optional[Dict] = None, sort_dict: Optional[List] = None, limit: Optional[int] = None, cached: bool = False, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Get multiple documents with optional filtering, sorting and projection
+
+    With cached=True the result is served from document_cache when possible
+    and must not be mutated by the caller.
+    """
     try:
         filter_dict = filter_dict or {}
-        cursor = database.db[collection_name].find(filter_dict)
+        use_cache = cached and document_cache.enabled
+        if use_cache:
+            cache_key = repr((filter_dict, sort_dict, limit, fields))
+            documents = document_cache.get(collection_name, cache_key)
+            if documents is not None:
+                return documents
+            version = collection_versions.get(collection_name)
+
+        cursor = database.read_db[collection_name].find(filter_dict, _projection(fields))
         
         if sort_dict:
             cursor = cursor.sort(sort_dict)
@@ -99,11 +518,11 @@ async def get_documents(collection_name: str, filter_dict: Optional[Dict] = None
         if limit:
             cursor = cursor.limit(limit)
             
-        documents = await cursor.to_list(length=None)
-        
-        # Convert ObjectId to string for all documents
-        for doc in documents:
-            doc["_id"] = str(doc["_id"])
+        with _db_span("find", collection_name):
+            documents = await cursor.to_list(length=None)
+
+        if use_cache:
+            document_cache.set(collection_name, cache_key, documents, version)
             
         return documents
     except Exception as e:
@@ -111,22 +530,22 @@ async def get_documents(collection_name: str, filter_dict: Optional[Dict] = None
         raise
 
 async def update_document(collection_name: str, document_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    """Update a document by ID"""
+    """Update a document by ID and return it as stored after the update"""
     try:
         # Add updated_at timestamp
         update_data["updated_at"] = datetime.utcnow()
         
-        result = await database.db[collection_name].update_one(
-            {"id": document_id},
-            {"$set": update_data}
-        )
+        with _db_span("findAndModify", collection_name):
+            updated_doc = await database.db[collection_name].find_one_and_update(
+                {"id": document_id},
+                {"$set": update_data},
+                projection=_projection(),
+                return_document=ReturnDocument.AFTER
+            )
         
-        if result.modified_count > 0:
-            updated_doc = await database.db[collection_name].find_one({"id": document_id})
-            if updated_doc:
-                updated_doc["_id"] = str(updated_doc["_id"])
-            return updated_doc
-        return None
+        if updated_doc:
+            bump_collection_version(collection_name, [document_id])
+        return updated_doc
     except Exception as e:
         logger.error(f"Error updating document in {collection_name}: {e}")
         raise
@@ -134,39 +553,215 @@ async def update_document(collection_name: str, document_id: str, update_data: D
 async def delete_document(collection_name: str, document_id: str) -> bool:
     """Delete a document by ID"""
     try:
-        result = await database.db[collection_name].delete_one({"id": document_id})
+        with _db_span("delete", collection_name):
+            result = await database.db[collection_name].delete_one({"id": document_id})
+        if result.deleted_count > 0:
+            bump_collection_version(collection_name, [document_id])
         return result.deleted_count > 0
     except Exception as e:
         logger.error(f"Error deleting document from {collection_name}: {e}")
         raise
 
+async def insert_missing_documents(collection_name: str, documents: List[Dict[str, Any]]) -> int:
+    """Insert the documents whose id is not stored yet, in one round trip
+
+    Each document becomes an upsert that only writes on insert, so running
+    this again (or from several workers at once) never duplicates or
+    overwrites anything. Returns the number of documents inserted.
+    """
+    if not documents:
+        return 0
+    try:
+        with _db_span("bulkWrite", collection_name):
+            result = await database.db[collection_name].bulk_write(
+                [UpdateOne({"id": document["id"]}, {"$setOnInsert": document}, upsert=True) for document in documents],
+                ordered=False
+            )
+        if result.upserted_count:
+            bump_collection_version(
+                collection_name,
+                [documents[index]["id"] for index in result.upserted_ids]
+            )
+        return result.upserted_count
+    except Exception as e:
+        logger.error(f"Error inserting documents into {collection_name}: {e}")
+        raise
+
+async def bulk_write_documents(collection_name: str, creates: List[Dict[str, Any]], updates: List[Tuple[str, Dict[str, Any]]], deletes: List[str], order: List[str], transactional: bool = False) -> Dict[str, Any]:
+    """Apply creates, partial updates, deletes and a reorder as one ordered bulk_write
+
+    Operations run in that sequence and stop at the first failure. With
+    transactional=True they run inside a transaction so a failure leaves
+    nothing applied; this needs a replica set or sharded cluster.
+    """
+    now = datetime.utcnow()
+    operations = [InsertOne(document) for document in creates]
+    operations += [
+        UpdateOne({"id": document_id}, {"$set": {**changes, "updated_at": now}})
+        for document_id, changes in updates
+    ]
+    operations += [DeleteOne({"id": document_id}) for document_id in deletes]
+    operations += [
+        UpdateOne({"id": document_id}, {"$set": {"order": position, "updated_at": now}})
+        for position, document_id in enumerate(order, start=1)
+    ]
+    if not operations:
+        return {"inserted_ids": [], "matched": 0, "modified": 0, "deleted": 0}
+
+    collection = database.db[collection_name]
+    try:
+        with _db_span("bulkWrite", collection_name):
+            if transactional:
+                async with await database.client.start_session() as session:
+                    async with session.start_transaction():
+                        result = await collection.bulk_write(operations, ordered=True, session=session)
+            else:
+                result = await collection.bulk_write(operations, ordered=True)
+    except Exception as e:
+        logger.error(f"Error applying bulk write to {collection_name}: {e}")
+        raise
+    finally:
+        # A failed non-transactional batch may still have applied a prefix
+        bump_collection_version(collection_name, [
+            *(document["id"] for document in creates),
+            *(document_id for document_id, _ in updates),
+            *deletes,
+            *order
+        ])
+
+    return {
+        "inserted_ids": [document["id"] for document in creates],
+        "matched": result.matched_count,
+        "modified": result.modified_count,
+        "deleted": result.deleted_count
+    }
+
+# Keyset pagination over (created_at, id)
+def encode_cursor(document: Dict[str, Any]) -> str:
+    """Opaque cursor pointing just past the given document"""
+    raw = json.dumps([document["created_at"].isoformat(), document["id"]])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Parse a cursor from encode_cursor, raising ValueError if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, document_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(document_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def keyset_filter(after: Tuple[datetime, str], descending: bool = True) -> Dict[str, Any]:
+    """Filter matching documents strictly after a (created_at, id) position"""
+    created_at, document_id = after
+    op = "$lt" if descending else "$gt"
+    return {"$or": [
+        {"created_at": {op: created_at}},
+        {"created_at": created_at, "id": {op: document_id}}
+    ]}
+
+async def get_documents_page(collection_name: str, filter_dict: Optional[Dict] = None, limit: int = 50, after: Optional[Tuple[datetime, str]] = None, descending: bool = True) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Get one page ordered by (created_at, id) and the cursor for the next page"""
+    filter_dict = dict(filter_dict or {})
+    if after:
+        filter_dict = {"$and": [filter_dict, keyset_filter(after, descending)]} if filter_dict else keyset_filter(after, descending)
+
+    direction = -1 if descending else 1
+    documents = await get_documents(
+        collection_name,
+        filter_dict,
+        [("created_at", direction), ("id", direction)],
+        limit=limit + 1
+    )
+    if len(documents) > limit:
+        documents = documents[:limit]
+        return documents, encode_cursor(documents[-1])
+    return documents, None
+
+async def iter_documents(collection_name: str, filter_dict: Optional[Dict] = None, sort_dict: Optional[List] = None, batch_size: int = 500) -> AsyncIterator[Dict[str, Any]]:
+    """Stream documents from a cursor without materializing the result set"""
+    cursor = database.read_db[collection_name].find(filter_dict or {}, _projection())
+    if sort_dict:
+        cursor = cursor.sort(sort_dict)
+    cursor = cursor.batch_size(batch_size)
+    try:
+        async for document in cursor:
+            yield document
+    finally:
+        await cursor.close()
+
 # Specific database functions
-async def get_profile() -> Optional[Dict[str, Any]]:
+async def get_profile(cached: bool = False, fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
     """Get the single profile document"""
-    documents = await get_documents("profiles", limit=1)
+    documents = await get_documents("profiles", limit=1, cached=cached, fields=fields)
     return documents[0] if documents else None
 
-async def upsert_profile(profile_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Create or update the profile"""
+async def upsert_profile(profile_data: Dict[str, Any], create: bool = True) -> Optional[Dict[str, Any]]:
+    """Create or update the profile in a single atomic command
+
+    With create=False a missing profile is not created and None is returned.
+    """
     try:
-        existing_profile = await get_profile()
-        
-        if existing_profile:
-            # Update existing profile
-            profile_data["updated_at"] = datetime.utcnow()
-            result = await database.db.profiles.update_one(
-                {"id": existing_profile["id"]},
-                {"$set": profile_data}
+        now = datetime.utcnow()
+        profile_data["updated_at"] = now
+        # Only fill identity fields the caller did not provide, $set and $setOnInsert may not overlap
+        on_insert = {
+            key: value for key, value in {"id": str(uuid.uuid4()), "created_at": now}.items()
+            if key not in profile_data
+        }
+
+        with _db_span("findAndModify", "profiles"):
+            profile = await database.db.profiles.find_one_and_update(
+                {},
+                {"$set": profile_data, **({"$setOnInsert": on_insert} if create and on_insert else {})},
+                upsert=create,
+                projection=_projection(),
+                return_document=ReturnDocument.AFTER
             )
-            if result.modified_count > 0:
-                updated_profile = await get_profile()
-                return updated_profile
-        else:
-            # Create new profile
-            profile_data["created_at"] = datetime.utcnow()
-            profile_data["updated_at"] = datetime.utcnow()
-            return await create_document("profiles", profile_data)
+        if profile:
+            bump_collection_version("profiles", [profile["id"]])
+        return profile
             
     except Exception as e:
         logger.error(f"Error upserting profile: {e}")
-        raise
\ No newline at end of file
+        raise
+
+async def get_portfolio(cached: bool = False) -> Dict[str, Any]:
+    """Get every public portfolio section, reading the collections concurrently"""
+    profile, services, projects, testimonials = await asyncio.gather(
+        get_profile(cached=cached),
+        get_documents("services", {"is_active": True}, [("order", 1)], cached=cached),
+        get_documents("projects", {"is_active": True}, [("order", 1)], cached=cached),
+        get_documents("testimonials", {"is_active": True}, [("order", 1)], cached=cached)
+    )
+    return {
+        "profile": profile,
+        "services": services,
+        "projects": projects,
+        "testimonials": testimonials,
+        "skills": profile.get("skills", []) if profile else []
+    }
+
+async def get_portfolio_snapshot() -> Dict[str, Any]:
+    """Get the precomputed portfolio payload, rebuilding it after writes or expiry"""
+    versions = tuple(collection_versions.get(name) for name in PORTFOLIO_COLLECTIONS)
+    if (
+        _portfolio_snapshot["versions"] == versions
+        and _portfolio_snapshot["expires_at"] > time.monotonic()
+    ):
+        return _portfolio_snapshot["data"]
+    return await refresh_portfolio_snapshot()
+
+async def refresh_portfolio_snapshot() -> Dict[str, Any]:
+    """Rebuild the portfolio snapshot from the read cache"""
+    versions = tuple(collection_versions.get(name) for name in PORTFOLIO_COLLECTIONS)
+    data = await get_portfolio(cached=True)
+    if document_cache.enabled and versions == tuple(
+        collection_versions.get(name) for name in PORTFOLIO_COLLECTIONS
+    ):
+        _portfolio_snapshot.update(
+            versions=versions,
+            expires_at=time.monotonic() + document_cache.ttl,
+            data=data
+        )
+    return data
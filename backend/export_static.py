@@ -0,0 +1,230 @@
+from database import get_portfolio, add_write_listener, PORTFOLIO_COLLECTIONS
+from facets import technology_facets
+from models import Portfolio, Profile, Service, Project, Testimonial, ProjectFacets
+from responses import dump_json, precompress
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+import argparse
+import asyncio
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import logging
+
+logger = logging.getLogger(__name__)
+
+ENCODING_SUFFIXES = {"gzip": ".gz", "br": ".br"}
+LIST_MODELS = {"services": Service, "projects": Project, "testimonials": Testimonial}
+
+async def render_public_routes() -> Dict[str, bytes]:
+    """Route path -> JSON body for every public GET route, as the API would serve it
+
+    Item routes are exported for active documents only, the ones the lists link to.
+    """
+    portfolio = await get_portfolio()
+    await technology_facets.refresh()
+
+    routes = {"/api/portfolio": dump_json(Portfolio, portfolio)}
+    if portfolio["profile"]:
+        routes["/api/profile"] = dump_json(Profile, portfolio["profile"])
+    for collection_name, model in LIST_MODELS.items():
+        routes[f"/api/{collection_name}"] = dump_json(List[model], portfolio[collection_name])
+        for document in portfolio[collection_name]:
+            routes[f"/api/{collection_name}/{document['id']}"] = dump_json(model, document)
+    routes["/api/projects/facets"] = dump_json(ProjectFacets, {"technologies": technology_facets.facets()})
+    return routes
+
+def _read_manifest(output_dir: Path) -> Dict[str, Any]:
+    try:
+        return json.loads((output_dir / "manifest.json").read_text())
+    except (FileNotFoundError, ValueError):
+        return {"files": {}}
+
+def _reuse_or_write(target: Path, data: Optional[bytes], previous: Optional[Path]) -> int:
+    """Hard-link an identical file from the previous version, otherwise write it"""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if previous is not None and previous.exists():
+        try:
+            os.link(previous, target)
+        except OSError:
+            shutil.copyfile(previous, target)
+    else:
+        target.write_bytes(data)
+    return target.stat().st_size
+
+def write_snapshot(output_dir: Path, routes: Dict[str, bytes], keep: int = 3) -> Dict[str, Any]:
+    """Write a content-addressed version directory, then switch manifest.json and current/ to it
+
+    Blocking; holds an exclusive lock so concurrent exporters (several
+    workers) take turns. A version whose content already exists is not
+    written again, and files unchanged since the previous version are
+    hard-linked instead of recompressed.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with open(output_dir / ".lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+
+        hashes = {route: hashlib.sha256(body).hexdigest() for route, body in routes.items()}
+        version = hashlib.sha256(
+            "\n".join(f"{route} {digest}" for route, digest in sorted(hashes.items())).encode()
+        ).hexdigest()[:12]
+        previous = _read_manifest(output_dir)
+        if previous.get("version") == version:
+            return previous
+
+        version_dir = output_dir / version
+        staging_dir = output_dir / f".tmp-{version}-{os.getpid()}"
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        files = {}
+        for route, body in routes.items():
+            relative = route.lstrip("/") + ".json"
+            old = previous["files"].get(route)
+            unchanged = old is not None and old["sha256"] == hashes[route]
+            encodings = None if unchanged else precompress(body)
+            available = old["encodings"] if unchanged else encodings
+
+            entry = {
+                "path": f"{version}/{relative}",
+                "sha256": hashes[route],
+                "etag": f'"{hashes[route][:16]}"',
+                "bytes": _reuse_or_write(
+                    staging_dir / relative, body,
+                    output_dir / old["path"] if unchanged else None
+                ),
+                "encodings": {},
+            }
+            for encoding in available:
+                suffix = ENCODING_SUFFIXES[encoding]
+                entry["encodings"][encoding] = {
+                    "path": f"{entry['path']}{suffix}",
+                    "bytes": _reuse_or_write(
+                        staging_dir / f"{relative}{suffix}",
+                        encodings[encoding] if encodings else None,
+                        output_dir / old["encodings"][encoding]["path"] if unchanged else None
+                    ),
+                }
+            files[route] = entry
+
+        if version_dir.exists():
+            shutil.rmtree(staging_dir)
+        else:
+            os.rename(staging_dir, version_dir)
+
+        manifest = {"version": version, "generated_at": datetime.utcnow().isoformat(), "files": files}
+        manifest_tmp = output_dir / f".manifest-{os.getpid()}.json"
+        manifest_tmp.write_text(json.dumps(manifest, indent=2))
+        os.replace(manifest_tmp, output_dir / "manifest.json")
+
+        # current/ always points at a complete version, for servers that map URLs to files
+        link_tmp = output_dir / f".current-{os.getpid()}"
+        if link_tmp.is_symlink():
+            link_tmp.unlink()
+        link_tmp.symlink_to(version, target_is_directory=True)
+        os.replace(link_tmp, output_dir / "current")
+
+        versions = sorted(
+            (path for path in output_dir.iterdir() if path.is_dir() and not path.is_symlink() and not path.name.startswith(".")),
+            key=lambda path: path.stat().st_mtime,
+            reverse=True
+        )
+        for stale in versions[max(keep, 1):]:
+            if stale.name != version:
+                shutil.rmtree(stale, ignore_errors=True)
+        return manifest
+
+async def export_static(output_dir: Path, keep: int = 3) -> Dict[str, Any]:
+    """Render every public route and write it out as the current static snapshot"""
+    try:
+        routes = await render_public_routes()
+        manifest = await asyncio.to_thread(write_snapshot, output_dir, routes, keep)
+        logger.info(f"Exported static snapshot {manifest['version']} ({len(routes)} routes) to {output_dir}")
+        return manifest
+    except Exception as e:
+        logger.error(f"Error exporting static snapshot: {e}")
+        raise
+
+class StaticExporter:
+    """Re-exports the static snapshot after writes to the public collections.
+
+    Writes within the debounce window are folded into one export, and a
+    write during an export queues exactly one more.
+    """
+
+    def __init__(self):
+        self.output_dir: Optional[Path] = None
+        self.keep = 3
+        self.debounce = 1.0
+        self.last_manifest: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._pending = False
+        self._listening = False
+
+    @property
+    def running(self) -> bool:
+        return self.output_dir is not None
+
+    def start(self, output_dir: str, keep: int = 3, debounce: float = 1.0):
+        self.output_dir = Path(output_dir)
+        self.keep = keep
+        self.debounce = debounce
+        if not self._listening:
+            add_write_listener(self._on_write)
+            self._listening = True
+        self.schedule()
+
+    async def stop(self):
+        self.output_dir = None
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _on_write(self, collection_name: str, document_ids: Optional[List[str]]):
+        if self.running and collection_name in PORTFOLIO_COLLECTIONS:
+            self.schedule()
+
+    def schedule(self):
+        if self._task and not self._task.done():
+            self._pending = True
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        self._pending = True
+        while self._pending and self.running:
+            self._pending = False
+            await asyncio.sleep(self.debounce)
+            try:
+                self.last_manifest = await export_static(self.output_dir, self.keep)
+            except Exception:
+                # Already logged; the next write tries again
+                pass
+
+static_exporter = StaticExporter()
+
+async def main(args):
+    from database import connect_to_mongo, close_mongo_connection
+
+    await connect_to_mongo()
+    try:
+        await export_static(Path(args.output), keep=args.keep)
+    finally:
+        await close_mongo_connection()
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    ROOT_DIR = Path(__file__).parent
+    load_dotenv(ROOT_DIR / '.env')
+    parser = argparse.ArgumentParser(description="Export the public API routes as static JSON files")
+    parser.add_argument("--output", default=os.environ.get('STATIC_EXPORT_DIR', str(ROOT_DIR / 'data' / 'static')))
+    parser.add_argument("--keep", type=int, default=3, help="snapshot versions to keep on disk")
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    asyncio.run(main(parser.parse_args()))
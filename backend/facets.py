@@ -0,0 +1,78 @@
+from database import database, add_write_listener
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple, Any
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+class TechnologyFacets:
+    """Running technology counts over active projects.
+
+    Each project's technologies are remembered, so a write only re-reads the
+    projects it touched and moves their counts, never re-aggregating.
+    """
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self._technologies: Dict[str, Tuple[str, ...]] = {}
+        # ids to re-read, None to rebuild from scratch
+        self._stale: Optional[Set[str]] = None
+        self._dirty = True
+        self._lock = asyncio.Lock()
+
+    def mark_stale(self, collection_name: str, document_ids: Optional[List[str]]):
+        if collection_name != "projects":
+            return
+        if document_ids is None:
+            self._stale = None
+        elif not self._dirty:
+            self._stale = set(document_ids)
+        elif self._stale is not None:
+            self._stale.update(document_ids)
+        self._dirty = True
+
+    def _set(self, counts: Counter, technologies: Dict[str, Tuple[str, ...]], project_id: str, project_technologies: Tuple[str, ...]):
+        counts.subtract(technologies.pop(project_id, ()))
+        if project_technologies:
+            technologies[project_id] = project_technologies
+            counts.update(project_technologies)
+
+    async def refresh(self):
+        """Apply pending project writes to the counts
+
+        Callers arriving during a refresh wait for it. The new counts are
+        built on the side and swapped in at the end, so readers never see
+        them half-built.
+        """
+        async with self._lock:
+            if not self._dirty:
+                return
+            stale, self._stale, self._dirty = self._stale, set(), False
+            try:
+                filter_dict: Dict[str, Any] = {"is_active": True}
+                if stale is None:
+                    counts, technologies = Counter(), {}
+                else:
+                    counts, technologies = Counter(self.counts), dict(self._technologies)
+                    filter_dict["id"] = {"$in": list(stale)}
+                    for project_id in stale:
+                        self._set(counts, technologies, project_id, ())
+                cursor = database.read_db.projects.find(filter_dict, {"_id": 0, "id": 1, "technologies": 1})
+                async for project in cursor:
+                    # A technology listed twice on one project still counts once
+                    self._set(counts, technologies, project["id"], tuple(dict.fromkeys(project.get("technologies") or ())))
+            except Exception:
+                self.mark_stale("projects", None if stale is None else list(stale))
+                raise
+            # Unary plus drops technologies no project uses anymore
+            self.counts, self._technologies = +counts, technologies
+
+    def facets(self) -> List[Dict[str, Any]]:
+        return [
+            {"value": value, "count": count}
+            for value, count in sorted(self.counts.items(), key=lambda item: (-item[1], item[0].lower()))
+        ]
+
+technology_facets = TechnologyFacets()
+add_write_listener(technology_facets.mark_stale)
@@ -0,0 +1,230 @@
+from database import database, add_write_listener, bump_collection_version, collection_versions, PORTFOLIO_COLLECTIONS
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+from typing import Dict, List, Optional, Any, Set, Tuple
+import asyncio
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_COLLECTION = "collection_versions"
+
+class CacheInvalidator:
+    """Carries writes made by other worker processes into this one's caches.
+
+    After each of its own writes a worker $inc's a counter document per
+    collection. On a replica set or sharded cluster a change stream on the
+    portfolio collections and those counters reports every write; on a
+    standalone mongod each worker polls the counters instead. Either way
+    remote writes go through bump_collection_version, so document_cache,
+    response_cache, search and facets all catch up; reads never query
+    anything extra.
+
+    Local version numbers drift apart between workers (a poll folds several
+    remote writes into one bump, a change stream echoes our own writes back
+    as a second one), so ETags are built from the shared counters instead:
+    once every write counted up to a counter value has been applied here,
+    that value becomes the collection's validator. Counter documents get a
+    random epoch when created, so values from a dropped and recreated
+    counter never repeat old validators.
+    """
+
+    def __init__(self):
+        self.mode: Optional[str] = None
+        self.poll_interval = 1.0
+        self._task: Optional[asyncio.Task] = None
+        self._publishing: Set[asyncio.Task] = set()
+        # Last shared counter (epoch, value) seen per collection, to skip our own writes
+        self._seen: Dict[str, Tuple[Optional[str], int]] = {}
+        # Local writes whose counter increment is still in flight
+        self._unpublished: Dict[str, int] = {}
+        # Change stream mode: our last counter value the stream has yet to deliver
+        self._awaiting: Dict[str, int] = {}
+        self._applying_remote = False
+        self._listening = False
+        self._stats = {"remote_invalidations": 0, "published": 0, "errors": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self, mode: str = "auto", poll_interval: float = 1.0):
+        """Pick change streams or polling and start watching
+
+        mode is "auto", "changestream", "poll" or "off".
+        """
+        if mode == "off":
+            return
+        if mode == "auto":
+            mode = "changestream" if await self._supports_change_streams() else "poll"
+        self.mode = mode
+        self.poll_interval = poll_interval
+        if not self._listening:
+            add_write_listener(self._on_local_write)
+            self._listening = True
+        await self._poll_once(apply=False)
+        if mode == "poll":
+            self._task = asyncio.create_task(self._poll_loop())
+        else:
+            self._task = asyncio.create_task(self._watch_loop())
+        logger.info(f"Cross-worker cache invalidation using {mode}")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._publishing:
+            await asyncio.gather(*self._publishing, return_exceptions=True)
+
+    async def _supports_change_streams(self) -> bool:
+        try:
+            hello = await database.client.admin.command("hello")
+        except Exception as e:
+            logger.warning(f"Could not detect the deployment type, polling for invalidations: {e}")
+            return False
+        return "setName" in hello or hello.get("msg") == "isdbgrid"
+
+    def _apply_remote(self, collection_name: str, document_ids: Optional[List[str]]):
+        self._applying_remote = True
+        try:
+            bump_collection_version(collection_name, document_ids)
+        finally:
+            self._applying_remote = False
+        self._stats["remote_invalidations"] += 1
+
+    def _adopt(self, collection_name: str, epoch: Optional[str], version: int):
+        """Take a shared counter value as seen, and as the collection's validator
+
+        The validator is only taken while none of our own writes is left
+        out of the counter value, as our caches already reflect those.
+        """
+        self._seen[collection_name] = (epoch, version)
+        if not self._unpublished.get(collection_name) and version >= self._awaiting.get(collection_name, 0):
+            collection_versions.set_shared(collection_name, f"{epoch or ''}:{version}")
+
+    # Change stream mode
+    async def _watch_loop(self):
+        pipeline = [{"$match": {"ns.coll": {"$in": [*PORTFOLIO_COLLECTIONS, VERSIONS_COLLECTION]}}}]
+        resume_token = None
+        delay = self.poll_interval
+        while True:
+            try:
+                async with database.db.watch(pipeline, resume_after=resume_token) as stream:
+                    delay = self.poll_interval
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        collection_name = change["ns"]["coll"]
+                        if collection_name == VERSIONS_COLLECTION:
+                            self._on_counter_change(change)
+                        elif change["operationType"] in ("insert", "replace", "update", "delete"):
+                            document = change.get("fullDocument")
+                            # Updates and deletes only carry the ObjectId, so their ids are unknown
+                            self._apply_remote(collection_name, [document["id"]] if document and "id" in document else None)
+                        else:
+                            # drop, rename or invalidate: resume from the next event on a fresh stream
+                            self._apply_remote(collection_name, None)
+                            if change["operationType"] == "invalidate":
+                                resume_token = None
+                                break
+            except asyncio.CancelledError:
+                raise
+            except PyMongoError as e:
+                self._stats["errors"] += 1
+                logger.error(f"Change stream for cache invalidation failed, retrying in {delay:.1f}s: {e}")
+                # Events may have been missed while disconnected
+                for collection_name in PORTFOLIO_COLLECTIONS:
+                    self._apply_remote(collection_name, None)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+                try:
+                    await self._poll_once(apply=False)
+                except PyMongoError:
+                    pass  # validators stay local until the next counter event
+
+    def _on_counter_change(self, change: Dict[str, Any]):
+        """A worker counted a write; its data change came earlier in the same stream"""
+        collection_name = change["documentKey"]["_id"]
+        if collection_name not in PORTFOLIO_COLLECTIONS:
+            return
+        if change["operationType"] in ("insert", "replace"):
+            counter = change["fullDocument"]
+            self._adopt(collection_name, counter.get("epoch"), counter["version"])
+        elif change["operationType"] == "update" and "version" in change["updateDescription"]["updatedFields"]:
+            epoch, _ = self._seen.get(collection_name, (None, 0))
+            self._adopt(collection_name, epoch, change["updateDescription"]["updatedFields"]["version"])
+
+    # Counters, and polling mode
+    def _on_local_write(self, collection_name: str, document_ids: Optional[List[str]]):
+        if self._applying_remote or collection_name not in PORTFOLIO_COLLECTIONS:
+            return
+        self._unpublished[collection_name] = self._unpublished.get(collection_name, 0) + 1
+        task = asyncio.get_running_loop().create_task(self._publish(collection_name))
+        self._publishing.add(task)
+        task.add_done_callback(self._publishing.discard)
+
+    async def _publish(self, collection_name: str):
+        try:
+            counter = await database.db[VERSIONS_COLLECTION].find_one_and_update(
+                {"_id": collection_name},
+                {"$inc": {"version": 1}, "$setOnInsert": {"epoch": uuid.uuid4().hex[:8]}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.error(f"Error publishing cache invalidation for {collection_name}: {e}")
+            return
+        finally:
+            self._unpublished[collection_name] -= 1
+        self._stats["published"] += 1
+
+        epoch, version = counter.get("epoch"), counter["version"]
+        if self.mode != "poll":
+            # The change stream delivers our counter like everyone else's
+            self._awaiting[collection_name] = max(self._awaiting.get(collection_name, 0), version)
+            return
+        seen_epoch, seen_version = self._seen.get(collection_name, (None, 0))
+        if epoch == seen_epoch and seen_version >= version:
+            # A poll picked it up already, but could not take it as the validator then
+            self._adopt(collection_name, seen_epoch, seen_version)
+            return
+        if version != seen_version + 1 or (seen_version and epoch != seen_epoch):
+            # Writes from other workers landed in between; our caches may predate them
+            self._apply_remote(collection_name, None)
+        self._adopt(collection_name, epoch, version)
+
+    async def _poll_once(self, apply: bool = True):
+        """Apply counters that moved and take them as validators
+
+        With apply=False every counter is taken as is, for a fresh start or
+        after everything was invalidated anyway.
+        """
+        cursor = database.db[VERSIONS_COLLECTION].find({"_id": {"$in": list(PORTFOLIO_COLLECTIONS)}})
+        counters = {counter["_id"]: counter async for counter in cursor}
+        for collection_name in PORTFOLIO_COLLECTIONS:
+            counter = counters.get(collection_name, {})
+            epoch, version = counter.get("epoch"), counter.get("version", 0)
+            if apply:
+                if (epoch, version) == self._seen.get(collection_name, (None, 0)):
+                    continue
+                self._apply_remote(collection_name, None)
+            self._adopt(collection_name, epoch, version)
+
+    async def _poll_loop(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self._poll_once()
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.error(f"Error polling collection versions: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"mode": self.mode or "off", "running": self.running, **self._stats}
+
+cache_invalidator = CacheInvalidator()
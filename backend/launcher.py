@@ -0,0 +1,205 @@
+from pathlib import Path
+from typing import Dict, Optional
+import asyncio
+import importlib.util
+import os
+import signal
+import socket
+import sys
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _available(module_name: str) -> bool:
+    return importlib.util.find_spec(module_name) is not None
+
+def default_workers() -> int:
+    """CPUs this process may run on, which can be fewer than the machine has"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - not Linux
+        return os.cpu_count() or 1
+
+class LauncherSettings:
+    """Process, socket and HTTP settings, read from env"""
+
+    def __init__(self):
+        self.host = os.environ.get('HOST', '0.0.0.0')
+        self.port = int(os.environ.get('PORT', '8001'))
+        self.workers = int(os.environ.get('WEB_CONCURRENCY') or default_workers())
+        loop = os.environ.get('UVICORN_LOOP', 'auto')
+        self.loop = ("uvloop" if _available("uvloop") else "asyncio") if loop == "auto" else loop
+        http = os.environ.get('UVICORN_HTTP', 'auto')
+        self.http = ("httptools" if _available("httptools") else "h11") if http == "auto" else http
+        self.backlog = int(os.environ.get('LISTEN_BACKLOG', '2048'))
+        self.keep_alive = int(os.environ.get('KEEPALIVE_TIMEOUT_S', '5'))
+        self.graceful_timeout = int(os.environ.get('GRACEFUL_TIMEOUT_S', '30'))
+        # Time between SIGTERM and closing the listener, while /readyz already reports draining
+        self.drain = float(os.environ.get('SHUTDOWN_DRAIN_S', '0'))
+        self.reuse_port = os.environ.get('REUSE_PORT', '1') == '1' and hasattr(socket, "SO_REUSEPORT")
+        self.limit_concurrency = int(os.environ['LIMIT_CONCURRENCY']) if os.environ.get('LIMIT_CONCURRENCY') else None
+        # Workers exit after this many requests and are replaced, bounding slow leaks
+        self.limit_max_requests = int(os.environ['LIMIT_MAX_REQUESTS']) if os.environ.get('LIMIT_MAX_REQUESTS') else None
+        self.access_log = os.environ.get('ACCESS_LOG', '0') == '1'
+
+def bind_socket(host: str, port: int, backlog: int, reuse_port: bool) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+def run_worker(app, settings: LauncherSettings, sock: Optional[socket.socket] = None):
+    """Serve app in this process until SIGTERM/SIGINT, then drain and shut down"""
+    import uvicorn
+    from readiness import readiness
+
+    class DrainingServer(uvicorn.Server):
+        """Reports not ready for the drain period before it stops accepting connections"""
+
+        draining = False
+
+        def handle_exit(self, sig, frame):
+            if settings.drain > 0 and not self.draining and not self.should_exit:
+                self.draining = True
+                readiness.draining = True
+                logger.info(f"Worker {os.getpid()} draining for {settings.drain:.1f}s before shutdown")
+                asyncio.get_event_loop().call_later(settings.drain, super().handle_exit, sig, frame)
+                return
+            super().handle_exit(sig, frame)
+
+    if sock is None:
+        sock = bind_socket(settings.host, settings.port, settings.backlog, settings.reuse_port)
+    config = uvicorn.Config(
+        app,
+        loop=settings.loop,
+        http=settings.http,
+        backlog=settings.backlog,
+        timeout_keep_alive=settings.keep_alive,
+        timeout_graceful_shutdown=settings.graceful_timeout,
+        limit_concurrency=settings.limit_concurrency,
+        limit_max_requests=settings.limit_max_requests,
+        access_log=settings.access_log,
+        log_config=None,
+    )
+    DrainingServer(config).run(sockets=[sock])
+
+class Supervisor:
+    """Preforks workers, replaces the ones that die and stops them all on SIGTERM.
+
+    With SO_REUSEPORT every worker binds its own listener and the kernel
+    balances new connections between them; otherwise the workers accept
+    from one socket bound here before forking.
+
+    Workers share nothing but the listener and MongoDB, whose shared
+    collection counters keep their ETags in agreement. Admission state and
+    the fallback ETag epoch are renewed in each child after the fork;
+    caches, the Mongo pool and contact journals are built per worker at
+    startup. Limits are therefore
+    per worker too: RATE_LIMITS, MAX_DB_CONCURRENCY and MONGO_MAX_POOL_SIZE
+    each apply WEB_CONCURRENCY times over.
+    """
+
+    def __init__(self, app, settings: LauncherSettings):
+        self.app = app
+        self.settings = settings
+        self.sock = None if settings.reuse_port else bind_socket(settings.host, settings.port, settings.backlog, False)
+        # pid -> start time
+        self.workers: Dict[int, float] = {}
+        self.stopping = False
+        self.restart_delay = 1.0
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+                signal.signal(sig, signal.SIG_DFL)
+            code = 0
+            try:
+                run_worker(self.app, self.settings, self.sock)
+            except BaseException as e:
+                logger.error(f"Worker {os.getpid()} failed: {e}")
+                code = 1
+            finally:
+                logging.shutdown()
+                os._exit(code)
+        self.workers[pid] = time.monotonic()
+
+    def _stop(self, sig, frame):
+        if not self.stopping:
+            logger.info(f"Received signal {sig}, stopping {len(self.workers)} workers")
+        self.stopping = True
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _reap(self):
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.workers.clear()
+                return
+            if pid == 0:
+                return
+            started = self.workers.pop(pid, None)
+            if started is None or self.stopping:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if code != 0 and time.monotonic() - started < 5:
+                # Crashing right after start: back off instead of fork-looping
+                logger.error(f"Worker {pid} exited with {code} during startup, restarting in {self.restart_delay:.0f}s")
+                time.sleep(self.restart_delay)
+                self.restart_delay = min(self.restart_delay * 2, 30.0)
+            else:
+                logger.info(f"Worker {pid} exited with {code}, restarting")
+                self.restart_delay = 1.0
+            if not self.stopping:
+                self.spawn()
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        logger.info(
+            f"Starting {self.settings.workers} workers on {self.settings.host}:{self.settings.port} "
+            f"(loop={self.settings.loop}, http={self.settings.http}, reuse_port={self.settings.reuse_port})"
+        )
+        for _ in range(self.settings.workers):
+            self.spawn()
+
+        while not self.stopping:
+            self._reap()
+            time.sleep(0.2)
+
+        deadline = time.monotonic() + self.settings.drain + self.settings.graceful_timeout + 5
+        while self.workers and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in list(self.workers):
+            logger.warning(f"Worker {pid} did not stop in time, killing it")
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        logger.info("All workers stopped")
+
+def main(app=None):
+    """Run the API with the env-configured number of workers"""
+    if app is None:
+        sys.path.insert(0, str(Path(__file__).parent))
+        from server import app
+
+    settings = LauncherSettings()
+    if settings.workers <= 1:
+        run_worker(app, settings)
+    else:
+        # The app is imported before forking so workers share its pages
+        Supervisor(app, settings).run()
+
+if __name__ == "__main__":
+    main()
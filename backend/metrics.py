@@ -0,0 +1,169 @@
+from pymongo import monitoring
+from bisect import bisect_left
+from typing import Dict, List, Tuple, Any
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds; Mongo commands are usually much faster than whole requests
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COMMAND_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values"""
+
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...], buckets: Tuple[float, ...]):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = buckets
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values: Tuple[str, ...], value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = [[0] * (len(self.buckets) + 1), 0.0]
+                self._series[label_values] = series
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(values, list(counts), total) for values, (counts, total) in self._series.items()]
+        for values, counts, total in sorted(series):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                bucket_labels = _labels(self.label_names, values, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, values)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, values)} {cumulative}")
+        return lines
+
+class Gauge:
+    """Point-in-time values keyed by a tuple of label values"""
+
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, label_values: Tuple[str, ...] = (), amount: float = 1):
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def set(self, label_values: Tuple[str, ...], value: float):
+        self._values[label_values] = value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        for values, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.label_names, values)} {value}")
+        return lines
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route and status",
+    ("method", "route", "status"), REQUEST_BUCKETS
+)
+requests_in_flight = Gauge("http_requests_in_flight", "HTTP requests currently being served", ("method",))
+command_duration = Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command latency by collection and operation",
+    ("collection", "command", "outcome"), COMMAND_BUCKETS
+)
+pool_gauges = Gauge("mongodb_pool", "MongoDB connection pool state", ("stat",))
+
+class CommandMetrics(monitoring.CommandListener):
+    """Feeds command_duration from driver events, which carry the duration already"""
+
+    def __init__(self):
+        # (request_id, connection_id) -> collection, from started until succeeded/failed
+        self._collections: Dict[Tuple[int, Any], str] = {}
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            target = event.command.get("collection")
+        self._collections[(event.request_id, event.connection_id)] = target if isinstance(target, str) else ""
+
+    def _finish(self, event, outcome: str):
+        collection = self._collections.pop((event.request_id, event.connection_id), "")
+        command_duration.observe((collection, event.command_name, outcome), event.duration_micros / 1e6)
+
+    def succeeded(self, event):
+        self._finish(event, "success")
+
+    def failed(self, event):
+        self._finish(event, "failure")
+
+command_metrics = CommandMetrics()
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request by its route template.
+
+    The route is looked up from the endpoint the router stored in the scope,
+    so the label is "/api/services/{service_id}" rather than the raw path.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._routes: Dict[Any, str] = {}
+
+    def _route(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is not None:
+            route = self._routes.get(endpoint)
+            if route is None:
+                route = next((r.path for r in scope["app"].routes if getattr(r, "endpoint", None) is endpoint), "unmatched")
+                self._routes[endpoint] = route
+            return route
+        # Requests shed by middleware or unknown paths never reached the router
+        for route in scope["app"].routes:
+            match, _ = route.matches(scope)
+            if match.name == "FULL":
+                return route.path
+        return "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        requests_in_flight.inc((method,))
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            requests_in_flight.inc((method,), -1)
+            request_duration.observe((method, self._route(scope), str(status_code)), time.perf_counter() - started)
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in (request_duration, requests_in_flight, command_duration, pool_gauges):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
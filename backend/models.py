@@ -1,8 +1,29 @@
 from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Any, ClassVar, Tuple, Union, Generic, TypeVar
 from datetime import datetime
 import uuid
 
+# Index Models
+class IndexSpec(BaseModel):
+    keys: List[Tuple[str, Union[int, str]]]
+    unique: bool = False
+    options: Dict[str, Any] = {}
+
+    @property
+    def name(self) -> str:
+        """Index name in the same form MongoDB generates by default"""
+        return "_".join(f"{field}_{direction}" for field, direction in self.keys)
+
+ID_INDEX = IndexSpec(keys=[("id", 1)], unique=True)
+ACTIVE_ORDER_INDEX = IndexSpec(keys=[("is_active", 1), ("order", 1)])
+
+def text_index(weights: Dict[str, int]) -> IndexSpec:
+    """Weighted text index over the searchable fields; MongoDB allows one per collection"""
+    return IndexSpec(
+        keys=[(field, "text") for field in weights],
+        options={"weights": weights, "default_language": "english"}
+    )
+
 # Profile Models
 class ProfileSocial(BaseModel):
     github: str
@@ -10,6 +31,11 @@ class ProfileSocial(BaseModel):
     twitter: str
 
 class Profile(BaseModel):
+    indexes: ClassVar[List[IndexSpec]] = [
+        ID_INDEX,
+        IndexSpec(keys=[("email", 1)], unique=True)
+    ]
+
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
     title: str
@@ -32,6 +58,9 @@ class ProfileUpdate(BaseModel):
 
 # Service Models
 class Service(BaseModel):
+    search_fields: ClassVar[Dict[str, int]] = {"title": 10, "features": 5, "description": 3}
+    indexes: ClassVar[List[IndexSpec]] = [ID_INDEX, ACTIVE_ORDER_INDEX, text_index(search_fields)]
+
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     title: str
     description: str
@@ -57,6 +86,15 @@ class ServiceUpdate(BaseModel):
 
 # Project Models
 class Project(BaseModel):
+    search_fields: ClassVar[Dict[str, int]] = {"title": 10, "technologies": 5, "description": 3}
+    indexes: ClassVar[List[IndexSpec]] = [
+        ID_INDEX,
+        ACTIVE_ORDER_INDEX,
+        # Multikey: one entry per technology, serves ?technology= filtered lists
+        IndexSpec(keys=[("technologies", 1), ("is_active", 1), ("order", 1)]),
+        text_index(search_fields)
+    ]
+
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     title: str
     description: str
@@ -94,6 +132,9 @@ class ProjectUpdate(BaseModel):
 
 # Testimonial Models
 class Testimonial(BaseModel):
+    search_fields: ClassVar[Dict[str, int]] = {"content": 3}
+    indexes: ClassVar[List[IndexSpec]] = [ID_INDEX, ACTIVE_ORDER_INDEX, text_index(search_fields)]
+
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
     position: str
@@ -125,6 +166,12 @@ class TestimonialUpdate(BaseModel):
 
 # Contact Models
 class Contact(BaseModel):
+    indexes: ClassVar[List[IndexSpec]] = [
+        ID_INDEX,
+        IndexSpec(keys=[("created_at", -1), ("id", -1)]),
+        IndexSpec(keys=[("is_read", 1), ("created_at", -1), ("id", -1)])
+    ]
+
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
     email: EmailStr
@@ -142,6 +189,65 @@ class ContactCreate(BaseModel):
 class ContactUpdate(BaseModel):
     is_read: bool
 
+# Bulk Models
+CreateT = TypeVar("CreateT", bound=BaseModel)
+UpdateT = TypeVar("UpdateT", bound=BaseModel)
+
+class BulkUpdate(BaseModel, Generic[UpdateT]):
+    id: str
+    changes: UpdateT
+
+class BulkOperations(BaseModel, Generic[CreateT, UpdateT]):
+    create: List[CreateT] = []
+    update: List[BulkUpdate[UpdateT]] = []
+    delete: List[str] = []
+    # Ids in their new display order; each gets order = position starting at 1
+    order: List[str] = []
+    transaction: bool = False
+
+ServiceBulk = BulkOperations[ServiceCreate, ServiceUpdate]
+ProjectBulk = BulkOperations[ProjectCreate, ProjectUpdate]
+TestimonialBulk = BulkOperations[TestimonialCreate, TestimonialUpdate]
+
+class BulkResult(BaseModel):
+    success: bool = True
+    inserted_ids: List[str]
+    matched: int
+    modified: int
+    deleted: int
+
+# Aggregate Models
+class Portfolio(BaseModel):
+    profile: Optional[Profile] = None
+    services: List[Service]
+    projects: List[Project]
+    testimonials: List[Testimonial]
+    skills: List[str]
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+class ProjectFacets(BaseModel):
+    technologies: List[FacetCount]
+
+# Search Models
+class SearchHit(BaseModel):
+    collection: str
+    id: str
+    title: str
+    score: float
+    # Field -> HTML-escaped snippet with matches wrapped in <mark>
+    highlights: Dict[str, str]
+
+class SearchResults(BaseModel):
+    query: str
+    results: List[SearchHit]
+    offset: int
+    limit: int
+    has_more: bool
+    backend: str
+
 # Response Models
 class APIResponse(BaseModel):
     success: bool
@@ -151,4 +257,13 @@ class APIResponse(BaseModel):
 class ErrorResponse(BaseModel):
     success: bool = False
     message: str
-    error: Optional[str] = None
\ No newline at end of file
+    error: Optional[str] = None
+
+# Collection name -> document model, used to build the index registry
+COLLECTION_MODELS = {
+    "profiles": Profile,
+    "services": Service,
+    "projects": Project,
+    "testimonials": Testimonial,
+    "contacts": Contact
+}
@@ -0,0 +1,165 @@
+from pymongo import monitoring, ReadPreference
+from collections import deque
+from typing import Dict, Any
+import asyncio
+import os
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# MongoClient keyword -> (environment variable, parser); unset variables keep pymongo's defaults
+CLIENT_OPTIONS = {
+    "maxPoolSize": ("MONGO_MAX_POOL_SIZE", int),
+    "minPoolSize": ("MONGO_MIN_POOL_SIZE", int),
+    "maxIdleTimeMS": ("MONGO_MAX_IDLE_TIME_MS", int),
+    "waitQueueTimeoutMS": ("MONGO_WAIT_QUEUE_TIMEOUT_MS", int),
+    "serverSelectionTimeoutMS": ("MONGO_SERVER_SELECTION_TIMEOUT_MS", int),
+    "connectTimeoutMS": ("MONGO_CONNECT_TIMEOUT_MS", int),
+    "socketTimeoutMS": ("MONGO_SOCKET_TIMEOUT_MS", int),
+    # e.g. "zstd,snappy,zlib"; zstd and snappy need the zstandard / python-snappy packages
+    "compressors": ("MONGO_COMPRESSORS", str),
+}
+
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+DEFAULT_MAX_POOL_SIZE = 100
+
+def client_options() -> Dict[str, Any]:
+    """Pool, timeout and compression settings for the Mongo client, read from env"""
+    options = {}
+    for keyword, (env_name, parse) in CLIENT_OPTIONS.items():
+        value = os.environ.get(env_name)
+        if value:
+            options[keyword] = parse(value)
+    return options
+
+def read_preference():
+    """Read preference for the read-only (GET) queries, MONGO_READ_PREFERENCE
+
+    Anything but primary may serve reads that lag behind a write just made
+    through this API, including reads that end up in the document cache.
+    """
+    name = os.environ.get('MONGO_READ_PREFERENCE', 'primary')
+    if name not in READ_PREFERENCES:
+        raise ValueError(f"Unknown MONGO_READ_PREFERENCE {name!r}, expected one of {sorted(READ_PREFERENCES)}")
+    return READ_PREFERENCES[name]
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Connection pool utilization and checkout wait times from pool events.
+
+    Events are published from the driver's worker threads. A checkout starts
+    and completes on the same thread, so the start time is kept thread-local.
+    """
+
+    def __init__(self, max_pool_size: int = DEFAULT_MAX_POOL_SIZE, window: int = 1024):
+        self.max_pool_size = max_pool_size
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._waits = deque(maxlen=window)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.open = 0
+            self.checked_out = 0
+            self.max_checked_out = 0
+            self.checkouts = 0
+            self.checkout_failures: Dict[str, int] = {}
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.pools_cleared = 0
+            self._waits.clear()
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pools_cleared += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open -= 1
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_check_out_failed(self, event):
+        self._local.started = None
+        with self._lock:
+            self.checkout_failures[event.reason] = self.checkout_failures.get(event.reason, 0) + 1
+
+    def connection_checked_out(self, event):
+        started = getattr(self._local, "started", None)
+        wait = time.perf_counter() - started if started is not None else 0.0
+        self._local.started = None
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self._waits.append(wait)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+            percentile = lambda p: round(waits[min(len(waits) - 1, int(len(waits) * p))] * 1000, 3) if waits else 0.0
+            return {
+                "max_pool_size": self.max_pool_size,
+                "open_connections": self.open,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "utilization": round(self.checked_out / self.max_pool_size, 4),
+                "checkouts": self.checkouts,
+                "checkout_failures": dict(self.checkout_failures),
+                "pools_cleared": self.pools_cleared,
+                "wait_ms": {
+                    "mean": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                    "p50": percentile(0.5),
+                    "p99": percentile(0.99),
+                    "max": round(self.wait_max * 1000, 3),
+                },
+            }
+
+pool_metrics = PoolMetrics()
+
+async def prewarm_pool(client, connections: int):
+    """Open connections up front by running that many pings concurrently
+
+    Each in-flight command holds its own connection, so concurrent pings grow
+    the pool to the requested size before the first user request arrives.
+    """
+    if connections <= 0:
+        return
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(client.admin.command('ping') for _ in range(connections)))
+        logger.info(f"Prewarmed {connections} MongoDB connections in {(time.perf_counter() - started) * 1000:.0f} ms")
+    except Exception as e:
+        # A cold pool only costs latency, never fail startup over it
+        logger.warning(f"Connection pool prewarm failed: {e}")
@@ -0,0 +1,79 @@
+from database import database
+from typing import Dict, Any, Optional, Tuple
+import asyncio
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Readiness:
+    """Whether this worker should receive traffic, answered without touching MongoDB.
+
+    A background task pings the database every interval and probes only read
+    the cached result. A worker is ready once startup (including cache
+    warmup) finished, its last ping succeeded recently, and it is not
+    draining for shutdown.
+    """
+
+    def __init__(self):
+        self.interval = 5.0
+        self.started = False
+        self.draining = False
+        self.last_ping_ok: Optional[float] = None
+        self.last_ping_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def ping(self):
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(database.client.admin.command('ping'), timeout=self.interval)
+            self.last_ping_ok = time.monotonic()
+            self.last_ping_ms = round((time.perf_counter() - started) * 1000, 3)
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e) or type(e).__name__
+            logger.warning(f"Readiness ping failed: {self.last_error}")
+
+    async def _ping_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.ping()
+
+    def start(self, interval: float = 5.0):
+        """Mark startup complete and keep the cached ping fresh"""
+        self.interval = interval
+        self.started = True
+        # Startup just talked to the database
+        self.last_ping_ok = time.monotonic()
+        self._task = asyncio.create_task(self._ping_loop())
+
+    async def stop(self):
+        """Report not ready from now on, so load balancers drain this worker"""
+        self.draining = True
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self) -> Tuple[bool, Dict[str, Any]]:
+        ping_age = time.monotonic() - self.last_ping_ok if self.last_ping_ok is not None else None
+        checks = {
+            "startup": self.started,
+            "draining": self.draining,
+            # Two missed pings in a row take the worker out of rotation
+            "database": ping_age is not None and ping_age < 2 * self.interval + 1,
+        }
+        ready = checks["startup"] and checks["database"] and not checks["draining"]
+        return ready, {
+            "status": "ready" if ready else "not ready",
+            "checks": checks,
+            "last_ping_ms": self.last_ping_ms,
+            "last_ping_age_s": round(ping_age, 3) if ping_age is not None else None,
+            "last_error": self.last_error,
+        }
+
+readiness = Readiness()
@@ -0,0 +1,162 @@
+from fastapi import Response
+from pydantic import TypeAdapter
+from functools import lru_cache
+from typing import Any, Dict, Hashable, Optional, Tuple
+from collections import OrderedDict
+import asyncio
+import gzip
+import os
+from tracing import span
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+def fast_json_enabled() -> bool:
+    """Opt-in switch for serializing trusted documents without revalidation"""
+    return os.environ.get('FAST_JSON_RESPONSES') == '1'
+
+@lru_cache(maxsize=128)
+def type_adapter(type_: Any) -> TypeAdapter:
+    """TypeAdapters are expensive to build, so keep one per response type"""
+    return TypeAdapter(type_)
+
+def dump_json(type_: Any, data: Any, trusted: bool = False) -> bytes:
+    """Serialize data shaped like type_ to JSON bytes
+
+    Trusted data (documents read back from our own collections) is encoded
+    directly with orjson when it is installed. Everything else goes through
+    a cached TypeAdapter, which validates and serializes in one pass.
+    """
+    if trusted and orjson is not None:
+        return orjson.dumps(data)
+    adapter = type_adapter(type_)
+    return adapter.dump_json(adapter.validate_python(data))
+
+def precompress(body: bytes, gzip_level: int = 9, brotli_quality: int = 11) -> Dict[str, bytes]:
+    """Content-Encoding -> compressed body, by default at the highest ratio
+
+    gzip output is deterministic (mtime=0) so identical bodies compress to
+    identical files. br is only produced when brotli is installed.
+    """
+    encodings = {"gzip": gzip.compress(body, compresslevel=gzip_level, mtime=0)}
+    if brotli is not None:
+        encodings["br"] = brotli.compress(body, quality=brotli_quality)
+    return encodings
+
+@lru_cache(maxsize=256)
+def accepted_encodings(accept_encoding: str) -> Tuple[str, ...]:
+    """Encodings from an Accept-Encoding header we can serve, preferred first"""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = params.strip()
+        if quality.startswith("q=") and quality[2:].strip() in ("0", "0.0", "0.00", "0.000"):
+            continue
+        accepted.add(coding.strip())
+    return tuple(encoding for encoding in ("br", "gzip") if encoding in accepted)
+
+class CachedBody:
+    """A serialized response body with its precompressed variants"""
+    __slots__ = ("body", "encodings", "size")
+
+    def __init__(self, body: bytes, encodings: Dict[str, bytes]):
+        self.body = body
+        self.encodings = encodings
+        self.size = len(body) + sum(len(data) for data in encodings.values())
+
+class ResponseCache:
+    """LRU of encoded response bodies, bounded by total bytes.
+
+    Keys carry the ETag, which already encodes the collection versions a
+    route reads, so entries never need invalidating: after a write they are
+    simply no longer looked up and age out.
+    """
+
+    # Bodies above this are compressed off the event loop
+    THREAD_THRESHOLD = 256 * 1024
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, min_compress_bytes: int = 1024):
+        self.max_bytes = max_bytes
+        self.min_compress_bytes = min_compress_bytes
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def configure(self, max_bytes: int, min_compress_bytes: int):
+        self.max_bytes = max_bytes
+        self.min_compress_bytes = min_compress_bytes
+        self._entries.clear()
+        self._bytes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, key: Hashable) -> Optional[CachedBody]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self._stats["hits"] += 1
+        return entry
+
+    async def store(self, key: Hashable, body: bytes) -> CachedBody:
+        """Compress body once, at levels cheap enough for the request path, and keep it"""
+        encodings = {}
+        if len(body) >= self.min_compress_bytes:
+            with span("compress", bytes=len(body)):
+                if len(body) > self.THREAD_THRESHOLD:
+                    encodings = await asyncio.to_thread(precompress, body, 6, 5)
+                else:
+                    encodings = precompress(body, 6, 5)
+        entry = CachedBody(body, encodings)
+        if entry.size > self.max_bytes:
+            return entry
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous.size
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self._stats["evictions"] += 1
+        return entry
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hit_ratio": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+response_cache = ResponseCache()
+
+class FastJSONResponse(Response):
+    """JSON response whose body is already encoded"""
+    media_type = "application/json"
+
+def encoded_response(entry: CachedBody, accept_encoding: str, headers: Dict[str, str]) -> FastJSONResponse:
+    """Pick the client's preferred precompressed variant of a cached body"""
+    headers = {**headers, "Vary": "Accept-Encoding"}
+    for encoding in accepted_encodings(accept_encoding):
+        body = entry.encodings.get(encoding)
+        if body is not None:
+            headers["Content-Encoding"] = encoding
+            # The compressed bytes differ from the identity ones, so the validator is weak
+            if "ETag" in headers and not headers["ETag"].startswith("W/"):
+                headers["ETag"] = f"W/{headers['ETag']}"
+            return FastJSONResponse(content=body, headers=headers)
+    return FastJSONResponse(content=entry.body, headers=headers)
@@ -1,31 +1,238 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, create_model
+from pymongo.errors import BulkWriteError
+from typing import List, Optional, AsyncIterator, Tuple, Type, Union
+from datetime import datetime
+from functools import lru_cache
+import csv
+import io
+import json
+import os
 import logging
+from responses import FastJSONResponse, dump_json, fast_json_enabled, response_cache, encoded_response
+from contact_queue import contact_queue, ContactQueueFull
+from search import search
+from facets import technology_facets
+from tracing import TimedRoute, span
+from admission import admit_read, busy_response, ServerBusy
 from models import (
     Profile, ProfileUpdate, Service, ServiceCreate, ServiceUpdate,
     Project, ProjectCreate, ProjectUpdate, Testimonial, TestimonialCreate, 
-    TestimonialUpdate, Contact, ContactCreate, ContactUpdate, APIResponse
+    TestimonialUpdate, Contact, ContactCreate, ContactUpdate, Portfolio, APIResponse,
+    BulkOperations, BulkResult, ServiceBulk, ProjectBulk, TestimonialBulk, SearchResults,
+    ProjectFacets
 )
 from database import (
     get_profile, upsert_profile, get_documents, get_document,
-    create_document, update_document, delete_document
+    create_document, update_document, delete_document,
+    get_portfolio, get_portfolio_snapshot, collection_versions, PORTFOLIO_COLLECTIONS,
+    get_documents_page, decode_cursor, encode_cursor, keyset_filter, iter_documents,
+    bulk_write_documents
 )
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against our ETag"""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+def _cache_key(request: Request, etag: str) -> Tuple[str, str, str]:
+    return (request.url.path, request.url.query, etag)
+
+async def _cached_response(request: Request, response: Response, *collection_names: str, variant: str = "") -> Optional[Response]:
+    """Attach validators to a public GET and answer it without running the route if possible
+
+    Returns a 304 if the client copy is current, or the stored body from
+    response_cache if this representation was already encoded. Otherwise
+    the route is about to read, so it takes an admission slot first and
+    gets a 503 if none is free.
+    """
+    headers = {
+        "ETag": collection_versions.etag(*collection_names, variant=variant),
+        "Cache-Control": f"public, max-age={os.environ.get('HTTP_CACHE_MAX_AGE', '0')}, must-revalidate"
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, headers["ETag"]):
+        # Same validator the client's copy came with; compressed bodies carry a weak one
+        if f'W/{headers["ETag"]}' in if_none_match:
+            headers["ETag"] = f'W/{headers["ETag"]}'
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={**headers, "Vary": "Accept-Encoding"})
+    if response_cache.enabled:
+        entry = response_cache.get(_cache_key(request, headers["ETag"]))
+        if entry is not None:
+            return encoded_response(entry, request.headers.get("accept-encoding", ""), headers)
+    if not await admit_read():
+        return busy_response()
+    response.headers.update(headers)
+    return None
+
+async def _require_read_slot():
+    """Admission for reads that always query MongoDB"""
+    if not await admit_read():
+        raise ServerBusy()
+
+FIELDS_QUERY = Query(None, description="Comma-separated fields to return; id is always included")
+
+def _parse_fields(model: Type[BaseModel], fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Validate a ?fields= selection against a model"""
+    if not fields:
+        return None
+    selected = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = selected - model.model_fields.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    return tuple(sorted(selected | {"id"}))
+
+@lru_cache(maxsize=128)
+def _fields_model(model: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """Model with just the selected subset of a model's fields"""
+    return create_model(
+        f"{model.__name__}Fields",
+        **{name: (model.model_fields[name].annotation, model.model_fields[name]) for name in fields}
+    )
+
+async def _json_response(request: Request, model: Type[BaseModel], data: Union[dict, list], response: Response, fields: Optional[Tuple[str, ...]] = None) -> Optional[Response]:
+    """Encode a read result directly instead of through the route's response_model
+
+    Used for every public read while response_cache is enabled, which then
+    keeps the body and its gzip/br variants under the response's ETag.
+    Otherwise only for field projections, which the full model would
+    reject, and for every read when FAST_JSON_RESPONSES=1. Returns None
+    when FastAPI's regular response_model serialization should be used.
+    """
+    fast = fast_json_enabled()
+    etag = response.headers.get("etag")
+    cache = response_cache.enabled and etag is not None
+    if not fields and not fast and not cache:
+        return None
+    response_type = _fields_model(model, fields) if fields else model
+    if isinstance(data, list):
+        response_type = List[response_type]
+    with span("serialize", "orjson" if fast else "pydantic"):
+        body = dump_json(response_type, data, trusted=fast)
+    headers = {"ETag": etag, "Cache-Control": response.headers["cache-control"]} if etag else {}
+    if not cache:
+        return FastJSONResponse(content=body, headers=headers)
+    entry = await response_cache.store(_cache_key(request, etag), body)
+    return encoded_response(entry, request.headers.get("accept-encoding", ""), headers)
+
+async def _check_bulk_targets(collection_name: str, operations: BulkOperations, creates: List[dict]):
+    """Reject updates or deletes of unknown ids and an order that is not a full reordering
+
+    order must list every document that is active once the other
+    operations are applied, each exactly once; a partial list would leave
+    two documents at the same position. Documents created in the same
+    request may be left out, as their ids are only assigned here.
+    """
+    targets = {item.id for item in operations.update} | set(operations.delete)
+    if not targets and not operations.order:
+        return
+    documents = await get_documents(
+        collection_name,
+        {"$or": [{"is_active": True}, {"id": {"$in": sorted(targets | set(operations.order))}}]},
+        fields=["id", "is_active"]
+    )
+    active = {document["id"]: document.get("is_active", True) for document in documents}
+    active.update((document["id"], document["is_active"]) for document in creates)
+
+    unknown = sorted(targets - active.keys())
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No {collection_name} with ids: {', '.join(unknown)}"
+        )
+    if not operations.order:
+        return
+
+    for item in operations.update:
+        if item.changes.is_active is not None:
+            active[item.id] = item.changes.is_active
+    for document_id in operations.delete:
+        active.pop(document_id, None)
+    expected = {document_id for document_id, is_active in active.items() if is_active}
+    missing = sorted(expected - set(operations.order) - {document["id"] for document in creates})
+    extra = sorted(set(operations.order) - expected)
+    if missing or extra:
+        problems = []
+        if missing:
+            problems.append(f"missing active ids: {', '.join(missing)}")
+        if extra:
+            problems.append(f"unknown or inactive ids: {', '.join(extra)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"order must list every active document exactly once ({'; '.join(problems)})"
+        )
+
+async def _apply_bulk(collection_name: str, model: Type[BaseModel], operations: BulkOperations) -> BulkResult:
+    """Validate a bulk request and apply it as a single ordered bulk_write"""
+    if len(set(operations.order)) != len(operations.order):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="order must not contain duplicate ids"
+        )
+    creates = [model(**item.model_dump()).model_dump() for item in operations.create]
+    await _check_bulk_targets(collection_name, operations, creates)
+    order = operations.order
+    if order:
+        # Created documents not placed explicitly go last, in request order
+        order = order + [document["id"] for document in creates if document["is_active"] and document["id"] not in order]
+
+    try:
+        result = await bulk_write_documents(
+            collection_name,
+            creates=creates,
+            updates=[(item.id, item.changes.model_dump(exclude_unset=True)) for item in operations.update],
+            deletes=operations.delete,
+            order=order,
+            transactional=operations.transaction
+        )
+        return BulkResult(**result)
+    except BulkWriteError as e:
+        write_errors = e.details.get("writeErrors") or []
+        if not write_errors:
+            # The operations were applied but the write concern was not satisfied
+            logger.error(f"Write concern failed for bulk {collection_name} operations: {e.details.get('writeConcernErrors')}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Bulk {collection_name} operations were not acknowledged"
+            )
+        error = write_errors[0]
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Bulk operation {error['index']} failed: {error['errmsg']}"
+        )
+    except Exception as e:
+        logger.error(f"Error applying bulk {collection_name} operations: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to apply bulk {collection_name} operations"
+        )
 
 # Profile Routes
 @router.get("/profile", response_model=Profile)
-async def get_profile_data():
+async def get_profile_data(request: Request, response: Response, fields: Optional[str] = FIELDS_QUERY):
     """Get profile information"""
+    selected = _parse_fields(Profile, fields)
+    cached = await _cached_response(request, response, "profiles", variant=",".join(selected or ()))
+    if cached:
+        return cached
     try:
-        profile = await get_profile()
+        profile = await get_profile(cached=True, fields=selected)
         if not profile:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Profile not found"
             )
-        return profile
+        return await _json_response(request, Profile, profile, response, selected) or profile
     except Exception as e:
         logger.error(f"Error fetching profile: {e}")
         raise HTTPException(
@@ -37,18 +244,15 @@ async def get_profile_data():
 async def update_profile_data(profile_update: ProfileUpdate):
     """Update profile information"""
     try:
-        # Get existing profile
-        existing_profile = await get_profile()
-        if not existing_profile:
+        # Update only provided fields, never creating a profile from a partial update
+        update_data = profile_update.model_dump(exclude_unset=True)
+        updated_profile = await upsert_profile(update_data, create=False)
+        if not updated_profile:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Profile not found"
             )
         
-        # Update only provided fields
-        update_data = profile_update.dict(exclude_unset=True)
-        updated_profile = await upsert_profile(update_data)
-        
         return updated_profile
     except Exception as e:
         logger.error(f"Error updating profile: {e}")
@@ -57,17 +261,57 @@ async def update_profile_data(profile_update: ProfileUpdate):
             detail="Failed to update profile"
         )
 
+# Aggregate Routes
+@router.get("/portfolio", response_model=Portfolio)
+async def get_portfolio_data(request: Request, response: Response, snapshot: bool = True):
+    """Get profile, services, projects, testimonials and skills in one response"""
+    cached = await _cached_response(request, response, *PORTFOLIO_COLLECTIONS)
+    if cached:
+        return cached
+    try:
+        portfolio = await (get_portfolio_snapshot() if snapshot else get_portfolio())
+        return await _json_response(request, Portfolio, portfolio, response) or portfolio
+    except Exception as e:
+        logger.error(f"Error fetching portfolio: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch portfolio"
+        )
+
+# Search Routes
+@router.get("/search", response_model=SearchResults, dependencies=[Depends(_require_read_slot)])
+async def search_portfolio(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=50),
+    offset: int = Query(0, ge=0, le=1000)
+):
+    """Search active services, projects and testimonials, best matches first"""
+    try:
+        return await search(q, limit=limit, offset=offset)
+    except Exception as e:
+        logger.error(f"Error searching for {q!r}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to search portfolio"
+        )
+
 # Services Routes
 @router.get("/services", response_model=List[Service])
-async def get_services():
+async def get_services(request: Request, response: Response, fields: Optional[str] = FIELDS_QUERY):
     """Get all active services"""
+    selected = _parse_fields(Service, fields)
+    cached = await _cached_response(request, response, "services", variant=",".join(selected or ()))
+    if cached:
+        return cached
     try:
         services = await get_documents(
-            "services", 
+            "services",
             {"is_active": True},
-            [("order", 1)]
+            [("order", 1)],
+            cached=True,
+            fields=selected
         )
-        return services
+        return await _json_response(request, Service, services, response, selected) or services
     except Exception as e:
         logger.error(f"Error fetching services: {e}")
         raise HTTPException(
@@ -75,11 +319,34 @@ async def get_services():
             detail="Failed to fetch services"
         )
 
+@router.get("/services/{service_id}", response_model=Service)
+async def get_service(request: Request, response: Response, service_id: str, fields: Optional[str] = FIELDS_QUERY):
+    """Get a single service"""
+    selected = _parse_fields(Service, fields)
+    cached = await _cached_response(request, response, "services", variant=",".join(selected or ()))
+    if cached:
+        return cached
+    try:
+        service = await get_document("services", service_id, fields=selected)
+    except Exception as e:
+        logger.error(f"Error fetching service: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch service"
+        )
+
+    if not service:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Service not found"
+        )
+    return await _json_response(request, Service, service, response, selected) or service
+
 @router.post("/services", response_model=Service)
 async def create_service(service: ServiceCreate):
     """Create a new service"""
     try:
-        service_data = service.dict()
+        service_data = Service(**service.model_dump()).model_dump()
         created_service = await create_document("services", service_data)
         return created_service
     except Exception as e:
@@ -93,7 +360,7 @@ async def create_service(service: ServiceCreate):
 async def update_service(service_id: str, service_update: ServiceUpdate):
     """Update a service"""
     try:
-        update_data = service_update.dict(exclude_unset=True)
+        update_data = service_update.model_dump(exclude_unset=True)
         updated_service = await update_document("services", service_id, update_data)
         
         if not updated_service:
@@ -130,17 +397,40 @@ async def delete_service(service_id: str):
             detail="Failed to delete service"
         )
 
+@router.post("/services/bulk", response_model=BulkResult)
+async def bulk_services(operations: ServiceBulk):
+    """Create, update, delete and reorder services in one ordered batch"""
+    return await _apply_bulk("services", Service, operations)
+
 # Projects Routes
 @router.get("/projects", response_model=List[Project])
-async def get_projects():
-    """Get all active projects"""
+async def get_projects(
+    request: Request,
+    response: Response,
+    fields: Optional[str] = FIELDS_QUERY,
+    technology: Optional[List[str]] = Query(None, max_length=10, description="Only projects using every given technology")
+):
+    """Get all active projects, optionally only those using the given technologies"""
+    selected = _parse_fields(Project, fields)
+    technologies = sorted(set(technology)) if technology else []
+    cached = await _cached_response(
+        request, response, "projects",
+        variant=",".join(selected or ()) + (f"|{','.join(technologies)}" if technologies else "")
+    )
+    if cached:
+        return cached
+    filter_dict = {"is_active": True}
+    if technologies:
+        filter_dict = {"technologies": {"$all": technologies}, "is_active": True}
     try:
         projects = await get_documents(
             "projects",
-            {"is_active": True},
-            [("order", 1)]
+            filter_dict,
+            [("order", 1)],
+            cached=True,
+            fields=selected
         )
-        return projects
+        return await _json_response(request, Project, projects, response, selected) or projects
     except Exception as e:
         logger.error(f"Error fetching projects: {e}")
         raise HTTPException(
@@ -148,11 +438,52 @@ async def get_projects():
             detail="Failed to fetch projects"
         )
 
+# Declared before /projects/{project_id} so "facets" is not taken for an id
+@router.get("/projects/facets", response_model=ProjectFacets)
+async def get_project_facets(request: Request, response: Response):
+    """Get how many active projects use each technology"""
+    cached = await _cached_response(request, response, "projects", variant="facets")
+    if cached:
+        return cached
+    try:
+        await technology_facets.refresh()
+        facets = {"technologies": technology_facets.facets()}
+        return await _json_response(request, ProjectFacets, facets, response) or facets
+    except Exception as e:
+        logger.error(f"Error fetching project facets: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch project facets"
+        )
+
+@router.get("/projects/{project_id}", response_model=Project)
+async def get_project(request: Request, response: Response, project_id: str, fields: Optional[str] = FIELDS_QUERY):
+    """Get a single project"""
+    selected = _parse_fields(Project, fields)
+    cached = await _cached_response(request, response, "projects", variant=",".join(selected or ()))
+    if cached:
+        return cached
+    try:
+        project = await get_document("projects", project_id, fields=selected)
+    except Exception as e:
+        logger.error(f"Error fetching project: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch project"
+        )
+
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    return await _json_response(request, Project, project, response, selected) or project
+
 @router.post("/projects", response_model=Project)
 async def create_project(project: ProjectCreate):
     """Create a new project"""
     try:
-        project_data = project.dict()
+        project_data = Project(**project.model_dump()).model_dump()
         created_project = await create_document("projects", project_data)
         return created_project
     except Exception as e:
@@ -166,7 +497,7 @@ async def create_project(project: ProjectCreate):
 async def update_project(project_id: str, project_update: ProjectUpdate):
     """Update a project"""
     try:
-        update_data = project_update.dict(exclude_unset=True)
+        update_data = project_update.model_dump(exclude_unset=True)
         updated_project = await update_document("projects", project_id, update_data)
         
         if not updated_project:
@@ -203,17 +534,28 @@ async def delete_project(project_id: str):
             detail="Failed to delete project"
         )
 
+@router.post("/projects/bulk", response_model=BulkResult)
+async def bulk_projects(operations: ProjectBulk):
+    """Create, update, delete and reorder projects in one ordered batch"""
+    return await _apply_bulk("projects", Project, operations)
+
 # Testimonials Routes
 @router.get("/testimonials", response_model=List[Testimonial])
-async def get_testimonials():
+async def get_testimonials(request: Request, response: Response, fields: Optional[str] = FIELDS_QUERY):
     """Get all active testimonials"""
+    selected = _parse_fields(Testimonial, fields)
+    cached = await _cached_response(request, response, "testimonials", variant=",".join(selected or ()))
+    if cached:
+        return cached
     try:
         testimonials = await get_documents(
             "testimonials",
             {"is_active": True},
-            [("order", 1)]
+            [("order", 1)],
+            cached=True,
+            fields=selected
         )
-        return testimonials
+        return await _json_response(request, Testimonial, testimonials, response, selected) or testimonials
     except Exception as e:
         logger.error(f"Error fetching testimonials: {e}")
         raise HTTPException(
@@ -221,11 +563,34 @@ async def get_testimonials():
             detail="Failed to fetch testimonials"
         )
 
+@router.get("/testimonials/{testimonial_id}", response_model=Testimonial)
+async def get_testimonial(request: Request, response: Response, testimonial_id: str, fields: Optional[str] = FIELDS_QUERY):
+    """Get a single testimonial"""
+    selected = _parse_fields(Testimonial, fields)
+    cached = await _cached_response(request, response, "testimonials", variant=",".join(selected or ()))
+    if cached:
+        return cached
+    try:
+        testimonial = await get_document("testimonials", testimonial_id, fields=selected)
+    except Exception as e:
+        logger.error(f"Error fetching testimonial: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch testimonial"
+        )
+
+    if not testimonial:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Testimonial not found"
+        )
+    return await _json_response(request, Testimonial, testimonial, response, selected) or testimonial
+
 @router.post("/testimonials", response_model=Testimonial)
 async def create_testimonial(testimonial: TestimonialCreate):
     """Create a new testimonial"""
     try:
-        testimonial_data = testimonial.dict()
+        testimonial_data = Testimonial(**testimonial.model_dump()).model_dump()
         created_testimonial = await create_document("testimonials", testimonial_data)
         return created_testimonial
     except Exception as e:
@@ -239,7 +604,7 @@ async def create_testimonial(testimonial: TestimonialCreate):
 async def update_testimonial(testimonial_id: str, testimonial_update: TestimonialUpdate):
     """Update a testimonial"""
     try:
-        update_data = testimonial_update.dict(exclude_unset=True)
+        update_data = testimonial_update.model_dump(exclude_unset=True)
         updated_testimonial = await update_document("testimonials", testimonial_id, update_data)
         
         if not updated_testimonial:
@@ -276,18 +641,37 @@ async def delete_testimonial(testimonial_id: str):
             detail="Failed to delete testimonial"
         )
 
+@router.post("/testimonials/bulk", response_model=BulkResult)
+async def bulk_testimonials(operations: TestimonialBulk):
+    """Create, update, delete and reorder testimonials in one ordered batch"""
+    return await _apply_bulk("testimonials", Testimonial, operations)
+
 # Contact Routes
 @router.post("/contact", response_model=APIResponse)
 async def submit_contact_form(contact: ContactCreate):
-    """Submit contact form"""
+    """Submit contact form
+
+    With the write-behind queue running, the submission is acknowledged once
+    it is journaled locally and reaches MongoDB in the next batch.
+    """
     try:
-        contact_data = contact.dict()
-        created_contact = await create_document("contacts", contact_data)
+        contact_data = Contact(**contact.model_dump()).model_dump()
+        if contact_queue.running:
+            await contact_queue.submit(contact_data)
+        else:
+            await create_document("contacts", contact_data)
         
         return APIResponse(
             success=True,
             message="Thank you for your message! I'll get back to you soon.",
-            data={"contact_id": created_contact["id"]}
+            data={"contact_id": contact_data["id"]}
+        )
+    except ContactQueueFull as e:
+        logger.warning(f"Refusing contact submission: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Contact form is temporarily unavailable, please try again later",
+            headers={"Retry-After": "30"}
         )
     except Exception as e:
         logger.error(f"Error submitting contact form: {e}")
@@ -296,14 +680,40 @@ async def submit_contact_form(contact: ContactCreate):
             detail="Failed to submit contact form"
         )
 
-@router.get("/contact", response_model=List[Contact])
-async def get_contact_submissions():
-    """Get all contact submissions (admin only)"""
+@router.get("/contact", response_model=List[Contact], dependencies=[Depends(_require_read_slot)])
+async def get_contact_submissions(
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    is_read: Optional[bool] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None
+):
+    """Get one page of contact submissions, newest first (admin only)
+
+    The cursor for the following page is returned in the X-Next-Cursor header.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    filter_dict = {}
+    if is_read is not None:
+        filter_dict["is_read"] = is_read
+    if created_after or created_before:
+        filter_dict["created_at"] = {}
+        if created_after:
+            filter_dict["created_at"]["$gte"] = created_after
+        if created_before:
+            filter_dict["created_at"]["$lt"] = created_before
+
     try:
-        contacts = await get_documents(
-            "contacts",
-            sort_dict=[("created_at", -1)]
+        contacts, next_cursor = await get_documents_page(
+            "contacts", filter_dict, limit=limit, after=after
         )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         return contacts
     except Exception as e:
         logger.error(f"Error fetching contact submissions: {e}")
@@ -312,11 +722,81 @@ async def get_contact_submissions():
             detail="Failed to fetch contact submissions"
         )
 
+CONTACT_EXPORT_FIELDS = ["id", "name", "email", "company", "message", "is_read", "created_at"]
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+async def _export_contacts(export_format: str, after, batch_size: int) -> AsyncIterator[str]:
+    """Yield contacts oldest first as NDJSON lines or CSV rows, one chunk per batch
+
+    Every record carries the cursor that resumes the export right after it.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if export_format == "csv":
+        writer.writerow(CONTACT_EXPORT_FIELDS + ["cursor"])
+
+    pending = 0
+    documents = iter_documents(
+        "contacts",
+        keyset_filter(after, descending=False) if after else {},
+        [("created_at", 1), ("id", 1)],
+        batch_size=batch_size
+    )
+    try:
+        async for document in documents:
+            cursor = encode_cursor(document)
+            if export_format == "csv":
+                row = [document.get(field) for field in CONTACT_EXPORT_FIELDS]
+                writer.writerow([value.isoformat() if isinstance(value, datetime) else value for value in row] + [cursor])
+            else:
+                buffer.write(json.dumps({**document, "cursor": cursor}, default=_json_default))
+                buffer.write("\n")
+
+            pending += 1
+            if pending >= batch_size:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+    except Exception as e:
+        # Headers are already sent, so the client sees a truncated body and resumes from its last cursor
+        logger.error(f"Error exporting contact submissions: {e}")
+        raise
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+@router.get("/contact/export", dependencies=[Depends(_require_read_slot)])
+async def export_contact_submissions(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    since: Optional[str] = None,
+    batch_size: int = Query(500, ge=1, le=5000)
+):
+    """Stream every contact submission as NDJSON or CSV (admin only)
+
+    Pass the cursor of the last record received as `since` to resume.
+    """
+    try:
+        after = decode_cursor(since) if since else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _export_contacts(format, after, batch_size),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="contacts.{format}"'}
+    )
+
 @router.put("/contact/{contact_id}", response_model=Contact)
 async def mark_contact_as_read(contact_id: str, contact_update: ContactUpdate):
     """Mark contact as read"""
     try:
-        update_data = contact_update.dict(exclude_unset=True)
+        update_data = contact_update.model_dump(exclude_unset=True)
         updated_contact = await update_document("contacts", contact_id, update_data)
         
         if not updated_contact:
@@ -0,0 +1,221 @@
+from database import database, add_write_listener
+from models import Service, Project, Testimonial
+from collections import defaultdict
+from typing import Dict, List, Optional, Any, Set, Tuple
+import asyncio
+import heapq
+import html
+import math
+import os
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Searchable collection -> (field weights, field shown as the hit title)
+SEARCH_COLLECTIONS = {
+    "services": (Service.search_fields, "title"),
+    "projects": (Project.search_fields, "title"),
+    "testimonials": (Testimonial.search_fields, "name"),
+}
+# Keeps "node.js", "c++" and "c#" in one piece
+TOKEN_RE = re.compile(r"\w+(?:[.+#]+\w+)*[+#]*")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with".split()
+)
+SNIPPET_CONTEXT = 60
+SNIPPET_LENGTH = 200
+
+def stem(token: str) -> str:
+    """Light suffix stripping so "apps"/"app" and "building"/"build" match
+
+    Tokens like "node.js" or "c#" are names and are left alone.
+    """
+    if not token.isalpha():
+        return token
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 5 and token.endswith("ing"):
+        return token[:-3]
+    if len(token) > 4 and token.endswith("ed"):
+        return token[:-2]
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+def terms(text: str) -> List[str]:
+    return [stem(token) for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+def _field_text(value: Any) -> str:
+    if isinstance(value, list):
+        return " ".join(str(item) for item in value)
+    return str(value) if value is not None else ""
+
+class InvertedIndex:
+    """In-memory term -> document postings for active searchable documents.
+
+    Writes only mark documents stale through a write listener; the stale ones
+    are re-read in one query per collection before the next search.
+    """
+
+    def __init__(self):
+        # term -> {(collection, id): weighted term frequency}
+        self._postings: Dict[str, Dict[Tuple[str, str], float]] = {}
+        self._documents: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._document_terms: Dict[Tuple[str, str], Dict[str, float]] = {}
+        # collection -> ids to re-read, None to rebuild the whole collection
+        self._stale: Dict[str, Optional[Set[str]]] = {name: None for name in SEARCH_COLLECTIONS}
+        self._lock = asyncio.Lock()
+
+    def mark_stale(self, collection_name: str, document_ids: Optional[List[str]]):
+        if collection_name not in SEARCH_COLLECTIONS:
+            return
+        if document_ids is None:
+            self._stale[collection_name] = None
+        elif collection_name not in self._stale:
+            self._stale[collection_name] = set(document_ids)
+        elif self._stale[collection_name] is not None:
+            self._stale[collection_name].update(document_ids)
+
+    def _remove(self, key: Tuple[str, str]):
+        self._documents.pop(key, None)
+        for term in self._document_terms.pop(key, {}):
+            postings = self._postings[term]
+            del postings[key]
+            if not postings:
+                del self._postings[term]
+
+    def _add(self, collection_name: str, document: Dict[str, Any]):
+        weights, _ = SEARCH_COLLECTIONS[collection_name]
+        key = (collection_name, document["id"])
+        frequencies: Dict[str, float] = defaultdict(float)
+        for field, weight in weights.items():
+            for term in terms(_field_text(document.get(field))):
+                frequencies[term] += weight
+        self._documents[key] = document
+        self._document_terms[key] = frequencies
+        for term, frequency in frequencies.items():
+            self._postings.setdefault(term, {})[key] = frequency
+
+    async def refresh(self):
+        """Apply pending writes, re-reading only the documents they touched
+
+        Searches arriving during a refresh wait for it rather than reading
+        postings that are half removed or half re-added.
+        """
+        async with self._lock:
+            if not self._stale:
+                return
+            stale, self._stale = self._stale, {}
+            try:
+                for collection_name, document_ids in stale.items():
+                    weights, title_field = SEARCH_COLLECTIONS[collection_name]
+                    filter_dict: Dict[str, Any] = {"is_active": True}
+                    if document_ids is None:
+                        for key in [key for key in self._documents if key[0] == collection_name]:
+                            self._remove(key)
+                    else:
+                        for document_id in document_ids:
+                            self._remove((collection_name, document_id))
+                        filter_dict["id"] = {"$in": list(document_ids)}
+                    projection = {"_id": 0, "id": 1, title_field: 1, **{field: 1 for field in weights}}
+                    async for document in database.read_db[collection_name].find(filter_dict, projection):
+                        self._add(collection_name, document)
+            except Exception:
+                # Whatever was not applied is retried on the next search
+                for collection_name, document_ids in stale.items():
+                    self.mark_stale(collection_name, None if document_ids is None else list(document_ids))
+                raise
+
+    def search(self, query_terms: List[str], limit: int) -> List[Tuple[float, str, Dict[str, Any]]]:
+        """Top `limit` documents by weighted term frequency times inverse document frequency"""
+        total = len(self._documents)
+        scores: Dict[Tuple[str, str], float] = defaultdict(float)
+        for term in set(query_terms):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + total / len(postings))
+            for key, frequency in postings.items():
+                scores[key] += frequency * idf
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [(score, key[0], self._documents[key]) for key, score in top]
+
+search_index = InvertedIndex()
+add_write_listener(search_index.mark_stale)
+
+async def _text_search(query: str, limit: int) -> List[Tuple[float, str, Dict[str, Any]]]:
+    """Top `limit` documents across collections using the MongoDB text indexes"""
+    async def search_collection(collection_name: str):
+        weights, title_field = SEARCH_COLLECTIONS[collection_name]
+        cursor = database.read_db[collection_name].find(
+            {"$text": {"$search": query}, "is_active": True},
+            {"_id": 0, "id": 1, title_field: 1, **{field: 1 for field in weights}, "score": {"$meta": "textScore"}}
+        ).sort([("score", {"$meta": "textScore"})]).limit(limit)
+        return [(document.pop("score"), collection_name, document) async for document in cursor]
+
+    results = await asyncio.gather(*(search_collection(name) for name in SEARCH_COLLECTIONS))
+    return heapq.nlargest(limit, (hit for hits in results for hit in hits), key=lambda hit: hit[0])
+
+def highlight(text: str, query_terms: Set[str]) -> Optional[str]:
+    """HTML-escaped snippet around the first match with every match wrapped in <mark>"""
+    matches = [match for match in TOKEN_RE.finditer(text) if stem(match.group().lower()) in query_terms]
+    if not matches:
+        return None
+    start = max(0, matches[0].start() - SNIPPET_CONTEXT)
+    end = min(len(text), start + SNIPPET_LENGTH)
+    parts = ["…" if start else ""]
+    position = start
+    for match in matches:
+        if match.end() > end:
+            break
+        parts.append(html.escape(text[position:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group())}</mark>")
+        position = match.end()
+    parts.append(html.escape(text[position:end]))
+    parts.append("…" if end < len(text) else "")
+    return "".join(parts)
+
+async def search(query: str, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+    """Ranked, highlighted matches across services, projects and testimonials
+
+    Uses the MongoDB text indexes unless SEARCH_BACKEND=memory or the text
+    query fails, in which case the in-memory inverted index answers instead.
+    """
+    query_terms = terms(query)
+    hits = None
+    backend = "mongo"
+    if query_terms and os.environ.get('SEARCH_BACKEND', 'mongo') == 'mongo':
+        try:
+            hits = await _text_search(query, offset + limit + 1)
+        except Exception as e:
+            logger.warning(f"Text search failed, using the in-memory index: {e}")
+    if hits is None:
+        backend = "memory"
+        await search_index.refresh()
+        hits = search_index.search(query_terms, offset + limit + 1) if query_terms else []
+
+    unique_terms = set(query_terms)
+    results = []
+    for score, collection_name, document in hits[offset:offset + limit]:
+        weights, title_field = SEARCH_COLLECTIONS[collection_name]
+        highlights = {}
+        for field in weights:
+            snippet = highlight(_field_text(document.get(field)), unique_terms)
+            if snippet:
+                highlights[field] = snippet
+        results.append({
+            "collection": collection_name,
+            "id": document["id"],
+            "title": document.get(title_field, ""),
+            "score": round(score, 4),
+            "highlights": highlights
+        })
+    return {
+        "query": query,
+        "results": results,
+        "offset": offset,
+        "limit": limit,
+        "has_more": len(hits) > offset + limit,
+        "backend": backend
+    }
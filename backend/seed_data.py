@@ -1,8 +1,11 @@
-from database import get_database, create_document, upsert_profile
+from database import database, insert_missing_documents, bump_collection_version
 from models import Profile, Service, Project, Testimonial
-from datetime import datetime
+from pymongo.errors import BulkWriteError
+from datetime import datetime, timedelta
+import argparse
 import asyncio
 import logging
+import random
 
 logger = logging.getLogger(__name__)
 
@@ -125,45 +128,28 @@ TESTIMONIALS_DATA = [
     }
 ]
 
+def _with_timestamps(items):
+    now = datetime.utcnow()
+    return [{**item, "created_at": now, "updated_at": now} for item in items]
+
 async def seed_database():
-    """Seed the database with initial data"""
+    """Seed the database with initial data
+
+    Every collection is written with a single batched command and the
+    collections are seeded concurrently. Documents are matched by id, so
+    re-running the seed never duplicates or overwrites existing data.
+    """
     try:
         logger.info("Starting database seeding...")
         
-        # Seed Profile
-        logger.info("Seeding profile data...")
-        profile_data = PROFILE_DATA.copy()
-        profile_data["created_at"] = datetime.utcnow()
-        profile_data["updated_at"] = datetime.utcnow()
-        await upsert_profile(profile_data)
-        logger.info("Profile data seeded successfully")
-        
-        # Seed Services
-        logger.info("Seeding services data...")
-        for service_data in SERVICES_DATA:
-            service_data = service_data.copy()
-            service_data["created_at"] = datetime.utcnow()
-            service_data["updated_at"] = datetime.utcnow()
-            await create_document("services", service_data)
-        logger.info(f"Seeded {len(SERVICES_DATA)} services")
-        
-        # Seed Projects
-        logger.info("Seeding projects data...")
-        for project_data in PROJECTS_DATA:
-            project_data = project_data.copy() 
-            project_data["created_at"] = datetime.utcnow()
-            project_data["updated_at"] = datetime.utcnow()
-            await create_document("projects", project_data)
-        logger.info(f"Seeded {len(PROJECTS_DATA)} projects")
-        
-        # Seed Testimonials
-        logger.info("Seeding testimonials data...")
-        for testimonial_data in TESTIMONIALS_DATA:
-            testimonial_data = testimonial_data.copy()
-            testimonial_data["created_at"] = datetime.utcnow()
-            testimonial_data["updated_at"] = datetime.utcnow() 
-            await create_document("testimonials", testimonial_data)
-        logger.info(f"Seeded {len(TESTIMONIALS_DATA)} testimonials")
+        seeded = await asyncio.gather(
+            insert_missing_documents("profiles", _with_timestamps([PROFILE_DATA])),
+            insert_missing_documents("services", _with_timestamps(SERVICES_DATA)),
+            insert_missing_documents("projects", _with_timestamps(PROJECTS_DATA)),
+            insert_missing_documents("testimonials", _with_timestamps(TESTIMONIALS_DATA))
+        )
+        for collection_name, count in zip(("profiles", "services", "projects", "testimonials"), seeded):
+            logger.info(f"Seeded {count} {collection_name}")
         
         logger.info("Database seeding completed successfully!")
         
@@ -174,7 +160,12 @@ async def seed_database():
 async def check_and_seed():
     """Check if data exists and seed if needed"""
     try:
-        from database import get_profile, get_documents
+        from database import get_profile, write_startup_marker
+
+        # An earlier boot already seeded or found data, no need to look again
+        if database.startup_marker.get("seeded"):
+            logger.info("Startup marker shows the database is seeded, skipping seed")
+            return
         
         # Check if profile exists
         profile = await get_profile()
@@ -183,15 +174,138 @@ async def check_and_seed():
             await seed_database()
         else:
             logger.info("Database already contains data, skipping seed")
+        await write_startup_marker(seeded=True)
             
     except Exception as e:
         logger.error(f"Error checking/seeding database: {e}")
         raise
 
+# Synthetic datasets for load testing
+TECHNOLOGIES = [
+    "React", "Next.js", "TypeScript", "JavaScript", "Vue", "Svelte", "Node.js", "GraphQL",
+    "Tailwind CSS", "Redux", "D3.js", "WebSocket", "Stripe API", "Framer Motion", "Vite", "Jest"
+]
+WORDS = (
+    "fast scalable modern responsive accessible realtime analytics dashboard platform "
+    "design system checkout onboarding search performance migration mobile api cache"
+).split()
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+def _created_at(rng: random.Random, now: datetime) -> datetime:
+    """Spread documents over the past year, like a long-lived inbox"""
+    return now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+
+def synthetic_document(collection_name: str, n: int, rng: random.Random, now: datetime):
+    """Deterministic synthetic document; ids are stable so reruns are idempotent"""
+    created_at = _created_at(rng, now)
+    document_id = f"synthetic-{collection_name}-{n:07d}"
+    if collection_name == "contacts":
+        return {
+            "id": document_id, "name": f"Visitor {n}", "email": f"visitor{n}@example.com",
+            "company": rng.choice([None, "Acme", "Globex", "Initech"]),
+            "message": _sentence(rng, rng.randint(8, 40)),
+            "is_read": rng.random() < 0.7, "created_at": created_at
+        }
+    common = {
+        "id": document_id, "order": n, "is_active": rng.random() < 0.9,
+        "created_at": created_at, "updated_at": created_at
+    }
+    if collection_name == "projects":
+        return {
+            **common, "title": f"Project {n}", "description": _sentence(rng, 30),
+            "image": "/api/placeholder/400/300", "technologies": rng.sample(TECHNOLOGIES, rng.randint(2, 6)),
+            "results": [_sentence(rng, 5) for _ in range(3)], "live_url": "#", "github_url": "#"
+        }
+    if collection_name == "services":
+        return {
+            **common, "title": f"Service {n}", "description": _sentence(rng, 20),
+            "features": [_sentence(rng, 3) for _ in range(4)]
+        }
+    return {
+        **common, "name": f"Client {n}", "position": "CTO", "company": f"Company {n}",
+        "content": _sentence(rng, 25), "rating": rng.randint(3, 5)
+    }
+
+async def generate_synthetic(counts, batch_size: int = 1000, concurrency: int = 4, seed: int = 42):
+    """Insert synthetic documents in concurrent insert_many batches
+
+    Batches are unordered so documents that already exist (same id) are
+    skipped by the unique id index while the rest of the batch is written.
+    """
+    now = datetime.utcnow()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def insert_batch(collection_name, documents):
+        async with semaphore:
+            try:
+                result = await database.db[collection_name].insert_many(documents, ordered=False)
+                return len(result.inserted_ids)
+            except BulkWriteError as e:
+                if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                    raise
+                return e.details["nInserted"]
+
+    for collection_name, count in counts.items():
+        if not count:
+            continue
+        rng = random.Random(f"{seed}-{collection_name}")
+        batches = []
+        for start in range(0, count, batch_size):
+            documents = [synthetic_document(collection_name, n, rng, now) for n in range(start, min(start + batch_size, count))]
+            batches.append(insert_batch(collection_name, documents))
+        inserted = sum(await asyncio.gather(*batches))
+        bump_collection_version(collection_name)
+        logger.info(f"Inserted {inserted} synthetic {collection_name} ({count - inserted} already present)")
+
+async def clear_synthetic(collection_names):
+    """Remove every document created by generate_synthetic"""
+    for collection_name in collection_names:
+        result = await database.db[collection_name].delete_many({"id": {"$regex": "^synthetic-"}})
+        bump_collection_version(collection_name)
+        logger.info(f"Removed {result.deleted_count} synthetic {collection_name}")
+
+async def main(args):
+    from database import connect_to_mongo, close_mongo_connection
+
+    await connect_to_mongo()
+    try:
+        if args.clear_synthetic:
+            await clear_synthetic(["contacts", "projects", "services", "testimonials"])
+        elif args.synthetic:
+            await generate_synthetic(
+                {
+                    "contacts": args.contacts,
+                    "projects": args.projects,
+                    "services": args.services,
+                    "testimonials": args.testimonials
+                },
+                batch_size=args.batch_size,
+                concurrency=args.concurrency,
+                seed=args.seed
+            )
+        else:
+            await seed_database()
+    finally:
+        await close_mongo_connection()
+
 if __name__ == "__main__":
     # Run seeding directly
-    import os
+    from pathlib import Path
     from dotenv import load_dotenv
     
-    load_dotenv()
-    asyncio.run(seed_database())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Seed the portfolio database")
+    parser.add_argument("--synthetic", action="store_true", help="generate a synthetic load-test dataset")
+    parser.add_argument("--clear-synthetic", action="store_true", help="remove previously generated synthetic data")
+    parser.add_argument("--contacts", type=int, default=100_000)
+    parser.add_argument("--projects", type=int, default=10_000)
+    parser.add_argument("--services", type=int, default=100)
+    parser.add_argument("--testimonials", type=int, default=1_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=4, help="insert_many batches in flight")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for reproducible data")
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    load_dotenv(Path(__file__).parent / '.env')
+    asyncio.run(main(parser.parse_args()))
@@ -1,8 +1,24 @@
 from fastapi import FastAPI, APIRouter
+from fastapi.responses import PlainTextResponse, JSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from database import connect_to_mongo, close_mongo_connection
+from database import (
+    connect_to_mongo, close_mongo_connection, document_cache, index_report,
+    refresh_portfolio_snapshot
+)
 from seed_data import check_and_seed
+from contact_queue import contact_queue
+from export_static import static_exporter
+from responses import response_cache
+from invalidation import cache_invalidator
+from readiness import readiness
+from facets import technology_facets
+import admission
+from mongo_pool import pool_metrics
+from slow_queries import slow_query_log
+from tracing import TracingMiddleware, TimedRoute, span_exporter
+from metrics import MetricsMiddleware, render_metrics, pool_gauges
+import asyncio
 import os
 import logging
 from pathlib import Path
@@ -15,7 +31,19 @@ load_dotenv(ROOT_DIR / '.env')
 app = FastAPI(title="Portfolio API", version="1.0.0")
 
 # Create a router with the /api prefix
-api_router = APIRouter(prefix="/api")
+api_router = APIRouter(prefix="/api", route_class=TimedRoute)
+
+# Shed abusive or excess Mongo-bound requests before they reach a route.
+# Added before CORS so CORS stays outermost and 429/503 responses carry its headers.
+app.add_middleware(admission.AdmissionControlMiddleware)
+# Reads shed inside a route get the same 503 as the ones shed by the middleware
+app.add_exception_handler(admission.ServerBusy, admission.server_busy_handler)
+
+# Time every request, including the ones shed above
+app.add_middleware(MetricsMiddleware)
+
+# Per-request spans and the Server-Timing header; wraps the middleware above so their time is counted
+app.add_middleware(TracingMiddleware)
 
 # Add CORS middleware
 app.add_middleware(
@@ -24,6 +52,7 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 # Configure logging
@@ -43,19 +72,118 @@ async def root():
 async def health_check():
     return {"status": "healthy", "message": "API is operational"}
 
+# Read cache counters
+@api_router.get("/stats/cache")
+async def cache_stats():
+    return document_cache.stats()
+
+# Write-behind contact queue counters
+@api_router.get("/stats/contact-queue")
+async def contact_queue_stats():
+    return contact_queue.stats()
+
+# Encoded response bodies served from memory
+@api_router.get("/stats/response-cache")
+async def response_cache_stats():
+    return response_cache.stats()
+
+# How writes from other workers reach this one's caches
+@api_router.get("/stats/invalidation")
+async def invalidation_stats():
+    return cache_invalidator.stats()
+
+# Sampled trace export
+@api_router.get("/stats/tracing")
+async def tracing_stats():
+    return span_exporter.stats()
+
+# Requests admitted and shed by admission control
+@api_router.get("/stats/admission")
+async def admission_stats():
+    return admission.admission_controller.stats() if admission.admission_controller else {}
+
+# Connection pool utilization and checkout wait times
+@api_router.get("/stats/pool")
+async def pool_stats():
+    return pool_metrics.stats()
+
+# Recent slow MongoDB commands and the plans chosen for them
+@api_router.get("/stats/slow-queries")
+async def slow_query_stats():
+    return slow_query_log.report()
+
+# Index drift found at startup
+@api_router.get("/stats/indexes")
+async def index_stats():
+    return index_report
+
 # Include portfolio routes
 api_router.include_router(portfolio_router, tags=["portfolio"])
 
 # Include the router in the main app
 app.include_router(api_router)
 
+# Prometheus scrape endpoint, outside /api like the usual convention
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    for stat, value in pool_metrics.stats().items():
+        if isinstance(value, (int, float)):
+            pool_gauges.set((stat,), value)
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+# Liveness: the process serves requests at all; never touches the database
+@app.get("/livez", include_in_schema=False)
+async def livez():
+    return {"status": "alive"}
+
+# Readiness: startup and warmup done and the cached database ping is fresh
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    ready, details = readiness.status()
+    return JSONResponse(details, status_code=200 if ready else 503)
+
 @app.on_event("startup")
 async def startup_db_client():
     """Initialize database connection and seed data on startup"""
     try:
         logger.info("Starting up Portfolio API...")
+        response_cache.configure(
+            max_bytes=int(float(os.environ.get('RESPONSE_CACHE_MAX_MB', '32')) * 1024 * 1024),
+            min_compress_bytes=int(os.environ.get('RESPONSE_COMPRESS_MIN_BYTES', '1024'))
+        )
         await connect_to_mongo()
-        await check_and_seed()
+
+        # Independent startup tasks run concurrently
+        startup_tasks = [
+            check_and_seed(),
+            cache_invalidator.start(
+                os.environ.get('CACHE_INVALIDATION', 'auto'),
+                poll_interval=float(os.environ.get('CACHE_INVALIDATION_POLL_MS', '1000')) / 1000
+            )
+        ]
+        if os.environ.get('CONTACT_WRITE_BEHIND') == '1':
+            startup_tasks.append(contact_queue.start(
+                os.environ.get('CONTACT_JOURNAL_DIR', str(ROOT_DIR / 'data' / 'journal')),
+                batch_size=int(os.environ.get('CONTACT_BATCH_SIZE', '100')),
+                flush_interval=float(os.environ.get('CONTACT_FLUSH_INTERVAL_MS', '500')) / 1000,
+                max_pending=int(os.environ.get('CONTACT_MAX_PENDING', '10000'))
+            ))
+        await asyncio.gather(*startup_tasks)
+
+        # Warm the caches the public routes read before reporting ready
+        await asyncio.gather(refresh_portfolio_snapshot(), technology_facets.refresh())
+        if os.environ.get('STATIC_EXPORT') == '1':
+            static_exporter.start(
+                os.environ.get('STATIC_EXPORT_DIR', str(ROOT_DIR / 'data' / 'static')),
+                keep=int(os.environ.get('STATIC_EXPORT_KEEP', '3')),
+                debounce=float(os.environ.get('STATIC_EXPORT_DEBOUNCE_MS', '1000')) / 1000
+            )
+        span_exporter.start(
+            file=os.environ.get('TRACE_EXPORT_FILE'),
+            url=os.environ.get('TRACE_EXPORT_URL'),
+            service_name=os.environ.get('TRACE_SERVICE_NAME', 'portfolio-api')
+        )
+        readiness.start(interval=float(os.environ.get('READINESS_PING_MS', '5000')) / 1000)
         logger.info("Portfolio API startup completed successfully")
     except Exception as e:
         logger.error(f"Failed to startup API: {e}")
@@ -65,11 +193,16 @@ async def startup_db_client():
 async def shutdown_db_client():
     """Close database connection on shutdown"""
     try:
+        await readiness.stop()
+        await static_exporter.stop()
+        await cache_invalidator.stop()
+        await span_exporter.stop()
+        await contact_queue.stop()
         await close_mongo_connection()
         logger.info("Portfolio API shutdown completed")
     except Exception as e:
         logger.error(f"Error during API shutdown: {e}")
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
+    from launcher import main
+    main(app)
\ No newline at end of file
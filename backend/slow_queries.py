@@ -0,0 +1,131 @@
+from pymongo import monitoring
+from collections import deque, OrderedDict
+from datetime import datetime
+from typing import Dict, Any, Optional
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Where each command keeps the parts that determine its query shape
+SHAPE_FIELDS = {
+    "find": ("filter", "sort"),
+    "aggregate": ("pipeline", None),
+    "count": ("query", None),
+    "distinct": ("query", None),
+    "findAndModify": ("query", "sort"),
+    "update": ("updates", None),
+    "delete": ("deletes", None),
+}
+# Commands that can be explained without side effects
+EXPLAINABLE = {"find", "aggregate", "count", "distinct", "findAndModify"}
+# Driver-added fields that explain rejects or that tie the command to a session
+SESSION_FIELDS = {"lsid", "txnNumber", "autocommit", "startTransaction", "$clusterTime", "$db", "$readPreference"}
+
+def query_shape(value: Any) -> Any:
+    """Replace every literal with "?" so queries differing only in values compare equal"""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, list) and any(isinstance(item, dict) for item in value):
+        return [query_shape(item) for item in value]
+    return "?"
+
+class SlowQueryLog(monitoring.CommandListener):
+    """Logs commands over a threshold and explains each new slow query shape once.
+
+    Driver events arrive on Motor's worker threads; explains are handed to the
+    event loop with call_soon_threadsafe and never block the command itself.
+    """
+
+    def __init__(self, threshold_ms: float = 100.0, capacity: int = 200, max_plans: int = 256):
+        self.threshold_ms = threshold_ms
+        self.entries = deque(maxlen=capacity)
+        self.max_plans = max_plans
+        # shape -> winning plan, or None while its explain is in flight
+        self.plans: OrderedDict = OrderedDict()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._explain = None
+        # (request_id, connection_id) -> started command, kept until it finishes
+        self._commands: Dict[Any, Dict[str, Any]] = {}
+
+    def configure(self, threshold_ms: float, capacity: int, explain=None):
+        """Apply settings and bind explains to the running loop
+
+        explain is an async callable taking a command document; None disables
+        plan capture. A threshold of 0 or less turns the log off.
+        """
+        self.threshold_ms = threshold_ms
+        self.entries = deque(self.entries, maxlen=capacity)
+        self._explain = explain
+        self._loop = asyncio.get_running_loop()
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms > 0
+
+    def started(self, event):
+        if self.enabled and event.command_name in SHAPE_FIELDS:
+            self._commands[(event.request_id, event.connection_id)] = event.command
+
+    def succeeded(self, event):
+        self._finish(event, None)
+
+    def failed(self, event):
+        self._finish(event, str(event.failure.get("errmsg", "")) if isinstance(event.failure, dict) else str(event.failure))
+
+    def _finish(self, event, error: Optional[str]):
+        command = self._commands.pop((event.request_id, event.connection_id), None)
+        duration_ms = event.duration_micros / 1000
+        if command is None or duration_ms < self.threshold_ms:
+            return
+
+        name = event.command_name
+        filter_field, sort_field = SHAPE_FIELDS[name]
+        filter_value = command.get(filter_field)
+        if name in ("update", "delete") and filter_value:
+            filter_value = filter_value[0].get("q")
+        sort_value = command.get(sort_field) if sort_field else None
+        shape = json.dumps({
+            "command": name,
+            "collection": command.get(name),
+            "filter": query_shape(filter_value or {}),
+            "sort": dict(sort_value) if sort_value else None,
+        }, default=str)
+
+        self.entries.append({
+            "at": datetime.utcnow().isoformat(),
+            "duration_ms": round(duration_ms, 3),
+            "shape": shape,
+            "error": error,
+        })
+        logger.warning(f"Slow MongoDB command ({duration_ms:.1f} ms): {shape}")
+
+        if name in EXPLAINABLE and self._explain and self._loop and shape not in self.plans:
+            self.plans[shape] = None
+            if len(self.plans) > self.max_plans:
+                self.plans.popitem(last=False)
+            explain_command = {key: value for key, value in command.items() if key not in SESSION_FIELDS}
+            self._loop.call_soon_threadsafe(self._schedule_explain, shape, explain_command)
+
+    def _schedule_explain(self, shape: str, command: Dict[str, Any]):
+        asyncio.ensure_future(self._capture_plan(shape, command))
+
+    async def _capture_plan(self, shape: str, command: Dict[str, Any]):
+        try:
+            explain = await self._explain(command)
+            planner = explain.get("queryPlanner", {})
+            winning_plan = planner.get("winningPlan", {})
+            self.plans[shape] = winning_plan.get("queryPlan", winning_plan)
+        except Exception as e:
+            logger.error(f"Error explaining slow query {shape}: {e}")
+            self.plans.pop(shape, None)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "threshold_ms": self.threshold_ms,
+            "entries": list(self.entries),
+            "plans": {shape: plan for shape, plan in self.plans.items() if plan is not None},
+        }
+
+slow_query_log = SlowQueryLog()
@@ -0,0 +1,308 @@
+from fastapi.routing import APIRoute
+from contextvars import ContextVar
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Tuple
+import asyncio
+import json
+import os
+import random
+import time
+import urllib.request
+import logging
+
+logger = logging.getLogger(__name__)
+
+# OpenTelemetry span kinds
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+# Server-Timing entries per response; the rest are folded into "other"
+MAX_TIMING_ENTRIES = 20
+
+class Span:
+    __slots__ = ("name", "description", "span_id", "parent_id", "kind", "start", "end", "attributes", "error")
+
+    def __init__(self, name: str, description: str, parent_id: Optional[str], kind: int, attributes: Dict[str, Any]):
+        self.name = name
+        self.description = description
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start = time.perf_counter_ns()
+        self.end = 0
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+class Trace:
+    """Spans recorded while serving one request"""
+
+    def __init__(self, trace_id: str, parent_id: Optional[str], sampled: bool):
+        self.trace_id = trace_id
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.route: Optional[str] = None
+        self.spans: List[Span] = []
+        self.start_unix_ns = time.time_ns()
+        self.start = time.perf_counter_ns()
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: total so far plus span time per name and description"""
+        durations: Dict[Tuple[str, str], float] = defaultdict(float)
+        for span in self.spans:
+            durations[(span.name, span.description)] += (span.end - span.start) / 1e6
+        entries = [f"total;dur={(time.perf_counter_ns() - self.start) / 1e6:.3f}"]
+        ranked = sorted(durations.items(), key=lambda item: -item[1])
+        for (name, description), duration in ranked[:MAX_TIMING_ENTRIES]:
+            escaped = description.replace("\\", "\\\\").replace('"', '\\"')
+            entries.append(f'{name};desc="{escaped}";dur={duration:.3f}' if description else f"{name};dur={duration:.3f}")
+        if len(ranked) > MAX_TIMING_ENTRIES:
+            entries.append(f"other;dur={sum(duration for _, duration in ranked[MAX_TIMING_ENTRIES:]):.3f}")
+        return ", ".join(entries)
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[str]] = ContextVar("current_span", default=None)
+
+class _SpanContext:
+    __slots__ = ("trace", "span", "token")
+
+    def __init__(self, trace: Trace, span: Span):
+        self.trace = trace
+        self.span = span
+
+    def __enter__(self) -> Span:
+        self.token = _current_span.set(self.span.span_id)
+        return self.span
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.span.end = time.perf_counter_ns()
+        if exc is not None:
+            self.span.error = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self.token)
+        self.trace.spans.append(self.span)
+
+class _NoSpan:
+    """Returned outside a traced request so instrumentation costs one ContextVar lookup"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc, traceback):
+        return None
+
+_NO_SPAN = _NoSpan()
+
+def span(name: str, description: str = "", kind: int = KIND_INTERNAL, **attributes: Any):
+    """Time a block as a child of the current span, e.g. span("mongo", "find projects")
+
+    name becomes the Server-Timing metric name and must be a token.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return _NO_SPAN
+    return _SpanContext(trace, Span(name, description, _current_span.get() or trace.parent_id, kind, attributes))
+
+class TimedRoute(APIRoute):
+    """APIRoute that records the handler, including response_model serialization, as a span"""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        path = self.path
+
+        async def timed_handler(request):
+            trace = _current_trace.get()
+            if trace is None:
+                return await handler(request)
+            trace.route = path
+            with span("route", path):
+                return await handler(request)
+
+        return timed_handler
+
+def _attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+class SpanExporter:
+    """Batches sampled traces as OTLP/JSON and writes them off the event loop.
+
+    The target is a file (one ExportTraceServiceRequest per line) or an
+    OTLP/HTTP collector URL such as http://localhost:4318/v1/traces.
+    """
+
+    def __init__(self):
+        self.file: Optional[Path] = None
+        self.url: Optional[str] = None
+        self.service_name = "portfolio-api"
+        self.interval = 1.0
+        self._queue = deque(maxlen=10000)
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"exported_spans": 0, "dropped_traces": 0, "errors": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.file is not None or self.url is not None
+
+    def start(self, file: Optional[str] = None, url: Optional[str] = None, service_name: str = "portfolio-api", interval: float = 1.0):
+        self.file = Path(file) if file else None
+        self.url = url or None
+        self.service_name = service_name
+        self.interval = interval
+        if self.enabled:
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def submit(self, trace: Trace):
+        if len(self._queue) == self._queue.maxlen:
+            self._stats["dropped_traces"] += 1
+        self._queue.append(trace)
+
+    def _encode(self, traces: List[Trace]) -> Dict[str, Any]:
+        spans = []
+        for trace in traces:
+            for recorded in trace.spans:
+                encoded = {
+                    "traceId": trace.trace_id,
+                    "spanId": recorded.span_id,
+                    "name": recorded.description or recorded.name if recorded.kind == KIND_SERVER else f"{recorded.name} {recorded.description}".strip(),
+                    "kind": recorded.kind,
+                    "startTimeUnixNano": str(trace.start_unix_ns + recorded.start - trace.start),
+                    "endTimeUnixNano": str(trace.start_unix_ns + recorded.end - trace.start),
+                    "attributes": [_attribute(key, value) for key, value in recorded.attributes.items()],
+                    "status": {"code": 2, "message": recorded.error} if recorded.error else {"code": 0},
+                }
+                if recorded.parent_id:
+                    encoded["parentSpanId"] = recorded.parent_id
+                spans.append(encoded)
+        return {"resourceSpans": [{
+            "resource": {"attributes": [_attribute("service.name", self.service_name), _attribute("process.pid", os.getpid())]},
+            "scopeSpans": [{"scope": {"name": "portfolio.tracing"}, "spans": spans}],
+        }]}
+
+    def _write(self, payload: bytes):
+        if self.file is not None:
+            self.file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.file, "ab") as handle:
+                handle.write(payload + b"\n")
+        if self.url is not None:
+            request = urllib.request.Request(self.url, data=payload, headers={"Content-Type": "application/json"})
+            urllib.request.urlopen(request, timeout=5).close()
+
+    async def flush(self):
+        if not self._queue or not self.enabled:
+            return
+        traces = list(self._queue)
+        self._queue.clear()
+        payload = self._encode(traces)
+        try:
+            await asyncio.to_thread(self._write, json.dumps(payload, separators=(",", ":")).encode())
+            self._stats["exported_spans"] += len(payload["resourceSpans"][0]["scopeSpans"][0]["spans"])
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.error(f"Error exporting {len(traces)} traces: {e}")
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "queued_traces": len(self._queue), **self._stats}
+
+span_exporter = SpanExporter()
+
+def _parse_traceparent(value: str) -> Optional[Tuple[str, str, bool]]:
+    """W3C traceparent "00-<trace id>-<parent id>-<flags>" -> (trace id, parent id, sampled)"""
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or parts[1] == "0" * 32:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        return parts[1], parts[2], bool(int(parts[3], 16) & 1)
+    except ValueError:
+        return None
+
+class TracingMiddleware:
+    """ASGI middleware opening a trace per HTTP request.
+
+    Hands a TRACE_SAMPLE_RATE fraction of requests, plus those an upstream
+    traceparent marked sampled, to span_exporter. The Server-Timing header
+    names collections and route internals, so it is off by default.
+    SERVER_TIMING=sampled adds it to sampled requests only and
+    SERVER_TIMING=1 to every response. An incoming traceparent is honoured
+    as sent, so the ingress should strip it from untrusted clients.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        mode = os.environ.get('SERVER_TIMING', '0')
+        self.server_timing = mode == '1'
+        self.server_timing_sampled = self.server_timing or mode == 'sampled'
+        self.sample_rate = float(os.environ.get('TRACE_SAMPLE_RATE', '0'))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (self.server_timing or span_exporter.enabled):
+            # With SERVER_TIMING=sampled and no exporter nothing is ever sampled
+            await self.app(scope, receive, send)
+            return
+
+        upstream = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                upstream = _parse_traceparent(value.decode("latin-1"))
+                break
+        sampled = span_exporter.enabled and (
+            (upstream is not None and upstream[2]) or random.random() < self.sample_rate
+        )
+        if upstream is not None:
+            trace = Trace(upstream[0], upstream[1], sampled)
+        else:
+            trace = Trace(f"{random.getrandbits(128):032x}", None, sampled)
+        root = Span("request", "", trace.parent_id, KIND_SERVER, {
+            "http.method": scope["method"],
+            "http.target": scope["path"],
+        })
+        root.start = trace.start
+        trace_token = _current_trace.set(trace)
+        span_token = _current_span.set(root.span_id)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                root.attributes["http.status_code"] = message["status"]
+                if self.server_timing or (self.server_timing_sampled and trace.sampled):
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"server-timing", trace.server_timing().encode("latin-1")),
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            root.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(span_token)
+            _current_trace.reset(trace_token)
+            if trace.sampled:
+                root.end = time.perf_counter_ns()
+                root.description = f"{scope['method']} {trace.route or scope['path']}"
+                if trace.route:
+                    root.attributes["http.route"] = trace.route
+                trace.spans.append(root)
+                span_exporter.submit(trace)
@@ -28,13 +28,8 @@ const Portfolio = () => {
       setLoading(true);
       setError(null);
 
-      // Load all portfolio data concurrently
-      const [profile, services, projects, testimonials] = await Promise.all([
-        portfolioAPI.getProfile(),
-        portfolioAPI.getServices(),
-        portfolioAPI.getProjects(),
-        portfolioAPI.getTestimonials()
-      ]);
+      // Load all portfolio sections in a single request
+      const { profile, services, projects, testimonials } = await portfolioAPI.getPortfolio();
 
       setPortfolioData({
         profile,
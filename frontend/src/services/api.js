@@ -50,6 +50,28 @@ apiClient.interceptors.response.use(
 
 // API Service Functions
 export const portfolioAPI = {
+  // Aggregate API - profile, services, projects, testimonials and skills in one request
+  getPortfolio: async () => {
+    try {
+      const response = await apiClient.get('/portfolio');
+      return response.data;
+    } catch (error) {
+      console.error('Error fetching portfolio:', error);
+      throw error;
+    }
+  },
+
+  // Search API - ranked matches with <mark>-highlighted snippets
+  search: async (q, { limit = 20, offset = 0 } = {}) => {
+    try {
+      const response = await apiClient.get('/search', { params: { q, limit, offset } });
+      return response.data;
+    } catch (error) {
+      console.error('Error searching portfolio:', error);
+      throw error;
+    }
+  },
+
   // Profile API
   getProfile: async () => {
     try {
@@ -112,6 +134,17 @@ export const portfolioAPI = {
     }
   },
 
+  // operations: { create: [], update: [{ id, changes }], delete: [ids], order: [ids], transaction }
+  bulkUpdateServices: async (operations) => {
+    try {
+      const response = await apiClient.post('/services/bulk', operations);
+      return response.data;
+    } catch (error) {
+      console.error('Error applying bulk services changes:', error);
+      throw error;
+    }
+  },
+
   // Projects API
   getProjects: async () => {
     try {
@@ -153,6 +186,17 @@ export const portfolioAPI = {
     }
   },
 
+  // operations: { create: [], update: [{ id, changes }], delete: [ids], order: [ids], transaction }
+  bulkUpdateProjects: async (operations) => {
+    try {
+      const response = await apiClient.post('/projects/bulk', operations);
+      return response.data;
+    } catch (error) {
+      console.error('Error applying bulk projects changes:', error);
+      throw error;
+    }
+  },
+
   // Testimonials API
   getTestimonials: async () => {
     try {
@@ -194,6 +238,17 @@ export const portfolioAPI = {
     }
   },
 
+  // operations: { create: [], update: [{ id, changes }], delete: [ids], order: [ids], transaction }
+  bulkUpdateTestimonials: async (operations) => {
+    try {
+      const response = await apiClient.post('/testimonials/bulk', operations);
+      return response.data;
+    } catch (error) {
+      console.error('Error applying bulk testimonials changes:', error);
+      throw error;
+    }
+  },
+
   // Contact API
   submitContactForm: async (contactData) => {
     try {
@@ -205,10 +260,14 @@ export const portfolioAPI = {
     }
   },
 
-  getContactSubmissions: async () => {
+  // params: { limit, cursor, is_read, created_after, created_before }
+  getContactSubmissions: async (params = {}) => {
     try {
-      const response = await apiClient.get('/contact');
-      return response.data;
+      const response = await apiClient.get('/contact', { params });
+      return {
+        items: response.data,
+        nextCursor: response.headers['x-next-cursor'] || null,
+      };
     } catch (error) {
       console.error('Error fetching contact submissions:', error);
       throw error;
@@ -0,0 +1,57 @@
+"""Shared fixtures: the API started on mongomock-motor against a fresh database per test"""
+from pathlib import Path
+import os
+import sys
+import uuid
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "portfolio_test")
+# mongomock can neither explain queries nor open change streams
+os.environ["INDEX_PLAN_CHECK"] = "off"
+os.environ["CACHE_INVALIDATION"] = "off"
+# Every test request comes from one client address
+os.environ["RATE_LIMITS"] = ""
+
+import mongomock_motor  # noqa: E402
+import database  # noqa: E402
+
+class MemoryClient(mongomock_motor.AsyncMongoMockClient):
+    """Motor stand-in; pool and monitoring options do not apply to it"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+
+database.AsyncIOMotorClient = MemoryClient
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture
+async def app(monkeypatch):
+    """The app after startup (connect, seed, warm caches) on its own database"""
+    monkeypatch.setenv("DB_NAME", f"portfolio_test_{uuid.uuid4().hex[:12]}")
+    from server import app
+
+    # Process-wide caches and indexes still describe the previous test's database
+    for collection_name in database.INDEX_REGISTRY:
+        database.bump_collection_version(collection_name)
+    for handler in app.router.on_startup:
+        await handler()
+    yield app
+    for handler in app.router.on_shutdown:
+        await handler()
+
+@pytest.fixture
+async def client(app):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
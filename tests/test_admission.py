@@ -0,0 +1,235 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+import admission
+from admission import (
+    AdmissionController, AdmissionControlMiddleware, DEFAULT_RATE_LIMITS,
+    admit_read, client_address, parse_networks, parse_rate_limits
+)
+
+pytestmark = pytest.mark.anyio
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(admission.time, "monotonic", clock)
+    return clock
+
+def _controller(spec: str = "POST /api/contact=6/min:2", **kwargs) -> AdmissionController:
+    options = {"max_concurrency": 4, "max_write_concurrency": 2, "queue_timeout": 0.01, **kwargs}
+    return AdmissionController(parse_rate_limits(spec), **options)
+
+# Rules
+def test_parse_rate_limits():
+    contact, writes = parse_rate_limits(DEFAULT_RATE_LIMITS)
+
+    assert (contact.methods, contact.path, contact.rate, contact.burst) == (("POST",), "/api/contact", 5 / 60, 5)
+    assert writes.methods == ("POST", "PUT", "DELETE")
+    assert writes.matches("DELETE", "/api/services/service-1")
+    assert not writes.matches("GET", "/api/services")
+    assert not contact.matches("POST", "/api/contact/export")
+    assert parse_rate_limits("") == []
+    assert parse_rate_limits("GET /api/search=10/s")[0].burst == 10
+
+def test_first_matching_rule_wins(clock):
+    controller = _controller("POST /api/contact=1/min:1;POST /api/*=100/s")
+
+    assert controller.check_rate("POST", "/api/contact", "a") is None
+    assert controller.check_rate("POST", "/api/contact", "a") is not None
+    assert controller.check_rate("POST", "/api/services", "a") is None
+
+# Token buckets
+def test_bucket_allows_burst_then_refills(clock):
+    controller = _controller()
+
+    assert controller.check_rate("POST", "/api/contact", "a") is None
+    assert controller.check_rate("POST", "/api/contact", "a") is None
+    retry_after = controller.check_rate("POST", "/api/contact", "a")
+    assert retry_after == pytest.approx(10.0)
+
+    clock.now += 5
+    assert controller.check_rate("POST", "/api/contact", "a") is not None
+    clock.now += 10
+    assert controller.check_rate("POST", "/api/contact", "a") is None
+    assert controller.stats()["shed_rate_limited"] == {"POST /api/contact": 2}
+
+def test_refill_is_capped_at_burst(clock):
+    controller = _controller()
+    controller.check_rate("POST", "/api/contact", "a")
+
+    clock.now += 3600
+    results = [controller.check_rate("POST", "/api/contact", "a") for _ in range(3)]
+
+    assert results[:2] == [None, None]
+    assert results[2] is not None
+
+def test_clients_have_separate_buckets(clock):
+    controller = _controller()
+    for _ in range(3):
+        controller.check_rate("POST", "/api/contact", "a")
+
+    assert controller.check_rate("POST", "/api/contact", "b") is None
+
+def test_bucket_table_is_lru_bounded(clock):
+    controller = _controller(max_clients=2)
+    for client in ("a", "b", "c"):
+        controller.check_rate("POST", "/api/contact", client)
+
+    assert controller.stats()["tracked_clients"] == 2
+
+def test_default_limits_need_trusted_proxies(monkeypatch):
+    monkeypatch.delenv("RATE_LIMITS", raising=False)
+    monkeypatch.delenv("TRUSTED_PROXIES", raising=False)
+    assert AdmissionController.from_env().rules == []
+
+    monkeypatch.setenv("TRUSTED_PROXIES", "10.0.0.0/8")
+    assert [rule.name for rule in AdmissionController.from_env().rules] == ["POST /api/contact", "POST,PUT,DELETE /api/*"]
+
+    monkeypatch.setenv("RATE_LIMITS", "")
+    assert AdmissionController.from_env().rules == []
+
+# Client identity
+TRUSTED = parse_networks("10.0.0.0/8, 127.0.0.1")
+
+@pytest.mark.parametrize("peer, forwarded_for, expected", [
+    ("203.0.113.9", None, "203.0.113.9"),
+    # Only a trusted proxy's X-Forwarded-For is believed
+    ("203.0.113.9", "198.51.100.1", "203.0.113.9"),
+    ("127.0.0.1", "198.51.100.1", "198.51.100.1"),
+    # Client-supplied entries on the left are ignored
+    ("127.0.0.1", "6.6.6.6, 198.51.100.1, 10.1.2.3", "198.51.100.1"),
+    ("127.0.0.1", "not-an-ip, 198.51.100.1", "198.51.100.1"),
+    ("127.0.0.1", "198.51.100.1, not-an-ip", "127.0.0.1"),
+    # Every hop trusted: the furthest one is the best guess
+    ("127.0.0.1", "10.0.0.5, 10.0.0.6", "10.0.0.5"),
+    (None, "198.51.100.1", "unknown"),
+])
+def test_client_address(peer, forwarded_for, expected):
+    assert client_address(peer, forwarded_for, TRUSTED) == expected
+
+# Concurrency slots
+async def test_write_cap_leaves_room_for_reads():
+    controller = _controller()
+    assert await controller.acquire(True)
+    assert await controller.acquire(True)
+
+    assert not await controller.acquire(True)
+    assert await controller.acquire(False)
+    assert controller.stats()["in_flight"] == 3
+
+async def test_reset_drops_buckets_and_slots(clock):
+    controller = _controller()
+    for _ in range(4):
+        await controller.acquire(False)
+    controller.check_rate("POST", "/api/contact", "a")
+
+    controller.reset()
+
+    assert controller.stats()["in_flight"] == 0
+    assert controller.stats()["tracked_clients"] == 0
+    assert await controller.acquire(False)
+
+# Middleware
+async def _endpoint(scope, receive, send):
+    """Writes and ?query reads take a while; other reads are answered at once without a slot"""
+    status = 200
+    if scope["method"] != "GET":
+        await asyncio.sleep(0.05)
+    elif scope["query_string"] == b"query":
+        if await admit_read():
+            await asyncio.sleep(0.05)
+        else:
+            status = 503
+    await send({"type": "http.response.start", "status": status, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+@pytest.fixture
+def middleware(monkeypatch):
+    monkeypatch.setattr(admission, "admission_controller", admission.admission_controller)
+    monkeypatch.setenv("MAX_DB_CONCURRENCY", "2")
+    monkeypatch.setenv("MAX_DB_WRITE_CONCURRENCY", "1")
+    monkeypatch.setenv("ADMISSION_QUEUE_TIMEOUT_MS", "5")
+    monkeypatch.setenv("TRUSTED_PROXIES", "127.0.0.1")
+    monkeypatch.setenv("RATE_LIMITS", "POST /api/contact=2/min")
+    return AdmissionControlMiddleware(_endpoint)
+
+def _client(app, peer="127.0.0.1") -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app, client=(peer, 1234)), base_url="http://test")
+
+async def test_rate_limit_follows_forwarded_client(middleware):
+    async with _client(middleware) as client:
+        async def post(forwarded_for):
+            return (await client.post("/api/contact", headers={"X-Forwarded-For": forwarded_for})).status_code
+
+        assert [await post(f"198.51.100.{n}") for n in range(4)] == [200] * 4
+        # A forged left-most entry does not make a new client
+        assert [await post(f"6.6.6.{n}, 198.51.100.7") for n in range(3)] == [200, 200, 429]
+
+        response = await client.post("/api/contact", headers={"X-Forwarded-For": "198.51.100.7"})
+        assert response.status_code == 429
+        assert int(response.headers["retry-after"]) >= 1
+        assert json.loads(response.content) == {"success": False, "message": "Too many requests, please slow down"}
+
+async def test_reads_only_hold_a_slot_once_they_query(middleware):
+    async with _client(middleware) as client:
+        # Both slots are taken by reads that query MongoDB
+        holders = [asyncio.create_task(client.get("/api/services?query")) for _ in range(2)]
+        await asyncio.sleep(0.01)
+
+        answered_from_cache = await client.get("/api/services")
+        shed = await client.get("/api/services?query")
+
+        assert answered_from_cache.status_code == 200
+        assert shed.status_code == 503
+        assert [holder.status_code for holder in await asyncio.gather(*holders)] == [200, 200]
+    assert middleware.controller.stats()["in_flight"] == 0
+
+async def test_writes_are_shed_when_their_cap_is_full(middleware):
+    async with _client(middleware) as client:
+        holder = asyncio.create_task(client.put("/api/services/service-1"))
+        await asyncio.sleep(0.01)
+
+        response = await client.put("/api/services/service-2")
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+        assert (await holder).status_code == 200
+
+async def test_exempt_paths_skip_admission(middleware):
+    for _ in range(2):
+        await middleware.controller.acquire(False)
+    async with _client(middleware) as client:
+        assert (await client.post("/api/stats/anything")).status_code == 200
+        assert (await client.get("/api/health?query")).status_code == 200
+
+# Through the app: validators and cached bodies need no slot
+async def test_conditional_and_cached_reads_are_never_shed(client):
+    etag = (await client.get("/api/services")).headers["etag"]
+    controller = admission.admission_controller
+    for _ in range(controller.max_concurrency):
+        assert await controller.acquire(False)
+    try:
+        assert (await client.get("/api/services", headers={"If-None-Match": etag})).status_code == 304
+        assert (await client.get("/api/services")).status_code == 200
+        response = await client.get("/api/services?fields=title")
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+        # Shed in the route or in a dependency: the same answer as from the middleware
+        searched = await client.get("/api/search?q=react")
+        assert searched.status_code == 503
+        assert searched.headers["retry-after"] == "1"
+        busy = {"success": False, "message": admission.BUSY_MESSAGE}
+        assert response.json() == searched.json() == busy
+    finally:
+        for _ in range(controller.max_concurrency):
+            controller.release(False)
@@ -0,0 +1,83 @@
+import pytest
+from pymongo.errors import BulkWriteError
+
+import routes.portfolio
+
+pytestmark = pytest.mark.anyio
+
+async def _active_services(client):
+    return [(service["id"], service["order"]) for service in (await client.get("/api/services")).json()]
+
+async def test_create_update_delete_and_reorder_in_one_request(client):
+    response = await client.post("/api/services/bulk", json={
+        "create": [{"title": "New", "description": "Fresh", "features": []}],
+        "update": [{"id": "service-1", "changes": {"title": "Renamed"}}],
+        "delete": ["service-2"],
+        "order": ["service-3", "service-1"]
+    })
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["deleted"] == 1
+    [created] = result["inserted_ids"]
+    # Created documents the order leaves out go last
+    assert await _active_services(client) == [("service-3", 1), ("service-1", 2), (created, 3)]
+
+async def test_partial_order_is_rejected(client):
+    response = await client.post("/api/services/bulk", json={"order": ["service-3"]})
+
+    assert response.status_code == 400
+    assert "service-1" in response.json()["detail"]
+    assert await _active_services(client) == [("service-1", 1), ("service-2", 2), ("service-3", 3)]
+
+async def test_order_with_unknown_id_is_rejected(client):
+    response = await client.post("/api/services/bulk", json={"order": ["service-3", "service-2", "service-1", "nope"]})
+
+    assert response.status_code == 400
+    assert "nope" in response.json()["detail"]
+
+async def test_duplicate_order_ids_are_rejected(client):
+    response = await client.post("/api/services/bulk", json={"order": ["service-1", "service-1", "service-2", "service-3"]})
+
+    assert response.status_code == 400
+
+async def test_order_follows_deactivation_in_the_same_request(client):
+    response = await client.post("/api/services/bulk", json={
+        "update": [{"id": "service-2", "changes": {"is_active": False}}],
+        "order": ["service-3", "service-1"]
+    })
+
+    assert response.status_code == 200
+    assert await _active_services(client) == [("service-3", 1), ("service-1", 2)]
+
+async def test_unknown_update_or_delete_ids_are_404(client):
+    response = await client.post("/api/services/bulk", json={
+        "update": [{"id": "missing", "changes": {"title": "x"}}],
+        "delete": ["gone"]
+    })
+
+    assert response.status_code == 404
+    assert "gone" in response.json()["detail"] and "missing" in response.json()["detail"]
+    assert len(await _active_services(client)) == 3
+
+async def test_write_concern_only_error_is_reported(client, monkeypatch):
+    async def write_concern_failure(*args, **kwargs):
+        raise BulkWriteError({"writeErrors": [], "writeConcernErrors": [{"errmsg": "waiting for replication timed out"}]})
+
+    monkeypatch.setattr(routes.portfolio, "bulk_write_documents", write_concern_failure)
+
+    response = await client.post("/api/services/bulk", json={"order": ["service-3", "service-2", "service-1"]})
+
+    assert response.status_code == 500
+    assert "not acknowledged" in response.json()["detail"]
+
+async def test_write_error_names_the_failing_operation(client, monkeypatch):
+    async def duplicate_key(*args, **kwargs):
+        raise BulkWriteError({"writeErrors": [{"index": 1, "code": 11000, "errmsg": "E11000 duplicate key"}]})
+
+    monkeypatch.setattr(routes.portfolio, "bulk_write_documents", duplicate_key)
+
+    response = await client.post("/api/services/bulk", json={"order": ["service-3", "service-2", "service-1"]})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Bulk operation 1 failed: E11000 duplicate key"
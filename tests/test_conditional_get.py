@@ -0,0 +1,67 @@
+import pytest
+
+from database import collection_versions
+from routes.portfolio import _etag_matches
+
+pytestmark = pytest.mark.anyio
+
+def test_etag_matches_weak_and_lists():
+    etag = '"abc-1"'
+    assert _etag_matches('"abc-1"', etag)
+    assert _etag_matches('W/"abc-1"', etag)
+    assert _etag_matches('"other", W/"abc-1"', etag)
+    assert _etag_matches("*", etag)
+    assert not _etag_matches('"abc-2"', etag)
+    assert not _etag_matches('"abc-1-x"', etag)
+
+def test_etag_tracks_collection_versions():
+    before = collection_versions.etag("services")
+    collection_versions.bump("services")
+    assert collection_versions.etag("services") != before
+    assert collection_versions.etag("services", variant="title") != collection_versions.etag("services")
+
+async def test_if_none_match_returns_304(client):
+    response = await client.get("/api/services")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    response = await client.get("/api/services", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+async def test_write_invalidates_etag(client):
+    etag = (await client.get("/api/services")).headers["etag"]
+
+    response = await client.put("/api/services/service-1", json={"title": "Renamed"})
+    assert response.status_code == 200
+
+    response = await client.get("/api/services", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()[0]["title"] == "Renamed"
+
+async def test_write_to_other_collection_keeps_etag(client):
+    etag = (await client.get("/api/services")).headers["etag"]
+
+    await client.put("/api/projects/project-1", json={"title": "Renamed"})
+
+    response = await client.get("/api/services", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+async def test_field_selection_has_its_own_etag(client):
+    full = await client.get("/api/services")
+    selected = await client.get("/api/services?fields=title")
+    assert selected.headers["etag"] != full.headers["etag"]
+
+    response = await client.get("/api/services?fields=title", headers={"If-None-Match": full.headers["etag"]})
+    assert response.status_code == 200
+    assert set(response.json()[0]) == {"id", "title"}
+
+async def test_aggregate_etag_covers_every_collection(client):
+    etag = (await client.get("/api/portfolio")).headers["etag"]
+
+    await client.put("/api/testimonials/testimonial-1", json={"content": "Changed"})
+
+    response = await client.get("/api/portfolio", headers={"If-None-Match": etag})
+    assert response.status_code == 200
@@ -0,0 +1,78 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from database import database
+from routes.portfolio import CONTACT_EXPORT_FIELDS, _export_contacts
+
+pytestmark = pytest.mark.anyio
+
+async def _insert_contacts(count: int):
+    """Contacts in threes sharing a created_at, inserted out of order"""
+    start = datetime(2026, 1, 1)
+    documents = [
+        {
+            "id": f"contact-{n:03d}", "name": f"Visitor {n}", "email": f"v{n}@example.com",
+            "company": "Acme" if n % 2 else None, "message": "Hello, \"world\"\nbye",
+            "is_read": n % 2 == 0, "created_at": start + timedelta(minutes=n - n % 3)
+        }
+        for n in reversed(range(count))
+    ]
+    await database.db.contacts.insert_many([dict(document) for document in documents])
+    return sorted(documents, key=lambda document: (document["created_at"], document["id"]))
+
+def _ndjson(text: str):
+    return [json.loads(line) for line in text.splitlines()]
+
+async def test_ndjson_export_is_oldest_first_with_cursors(client):
+    documents = await _insert_contacts(10)
+
+    response = await client.get("/api/contact/export")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.headers["content-disposition"] == 'attachment; filename="contacts.ndjson"'
+    records = _ndjson(response.text)
+    assert [record["id"] for record in records] == [document["id"] for document in documents]
+    assert records[0]["created_at"] == "2026-01-01T00:00:00"
+    assert all(record["cursor"] for record in records)
+
+async def test_csv_export(client):
+    documents = await _insert_contacts(5)
+
+    response = await client.get("/api/contact/export?format=csv")
+
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == CONTACT_EXPORT_FIELDS + ["cursor"]
+    assert [row[0] for row in rows[1:]] == [document["id"] for document in documents]
+    first = dict(zip(rows[0], rows[1]))
+    assert first["message"] == "Hello, \"world\"\nbye"
+    assert (first["company"], first["is_read"]) == ("", "True")
+
+@pytest.mark.parametrize("export_format, header_lines", [("ndjson", 0), ("csv", 1)])
+async def test_one_chunk_per_batch(app, export_format, header_lines):
+    await _insert_contacts(10)
+
+    chunks = [chunk async for chunk in _export_contacts(export_format, None, 4)]
+
+    # CSV records can span lines, NDJSON ones cannot
+    parse = _ndjson if export_format == "ndjson" else lambda chunk: list(csv.reader(io.StringIO(chunk)))
+    assert [len(parse(chunk)) for chunk in chunks] == [4 + header_lines, 4, 2]
+
+async def test_resuming_from_any_cursor_neither_repeats_nor_skips(client):
+    documents = await _insert_contacts(9)
+    records = _ndjson((await client.get("/api/contact/export")).text)
+
+    for position, record in enumerate(records):
+        response = await client.get("/api/contact/export", params={"since": record["cursor"], "batch_size": 2})
+        resumed = [resumed_record["id"] for resumed_record in _ndjson(response.text)]
+        assert resumed == [document["id"] for document in documents[position + 1:]]
+
+async def test_bad_since_is_a_400(client):
+    response = await client.get("/api/contact/export?since=garbage")
+
+    assert response.status_code == 400
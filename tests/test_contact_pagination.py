@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from database import database, decode_cursor, encode_cursor, keyset_filter
+
+pytestmark = pytest.mark.anyio
+
+async def _insert_contacts(count: int, ties_every: int = 3):
+    """Contacts with every third one sharing the previous one's created_at"""
+    start = datetime(2026, 1, 1)
+    documents = []
+    for n in range(count):
+        created_at = start + timedelta(minutes=n - n % ties_every)
+        documents.append({
+            "id": f"contact-{n:03d}", "name": f"Visitor {n}", "email": f"v{n}@example.com",
+            "company": None, "message": "Hello", "is_read": n % 2 == 0, "created_at": created_at
+        })
+    await database.db.contacts.insert_many(documents)
+    return documents
+
+def test_cursor_round_trip():
+    document = {"id": "contact-1", "created_at": datetime(2026, 1, 2, 3, 4, 5, 6000)}
+    assert decode_cursor(encode_cursor(document)) == (document["created_at"], "contact-1")
+    assert "=" not in encode_cursor(document)
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", "bm90IGpzb24", "WzEsMiwzXQ"])
+def test_malformed_cursor_raises(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+def test_keyset_filter_breaks_ties_on_id():
+    created_at = datetime(2026, 1, 1)
+    assert keyset_filter((created_at, "b")) == {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "id": {"$lt": "b"}}
+    ]}
+    assert keyset_filter((created_at, "b"), descending=False)["$or"][1]["id"] == {"$gt": "b"}
+
+async def _walk(client, query: str):
+    pages, cursor = [], None
+    while True:
+        url = f"/api/contact?{query}" + (f"&cursor={cursor}" if cursor else "")
+        response = await client.get(url)
+        assert response.status_code == 200
+        pages.append([contact["id"] for contact in response.json()])
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            return pages
+
+async def test_pages_cover_every_contact_once_newest_first(client):
+    documents = await _insert_contacts(23)
+
+    pages = await _walk(client, "limit=5")
+
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+    ids = [contact_id for page in pages for contact_id in page]
+    expected = sorted(documents, key=lambda document: (document["created_at"], document["id"]), reverse=True)
+    assert ids == [document["id"] for document in expected]
+
+async def test_exact_multiple_of_limit_has_no_empty_page(client):
+    await _insert_contacts(10)
+
+    pages = await _walk(client, "limit=5")
+
+    assert [len(page) for page in pages] == [5, 5]
+
+async def test_filters_apply_across_pages(client):
+    documents = await _insert_contacts(20)
+    created_after = datetime(2026, 1, 1, 0, 6).isoformat()
+
+    pages = await _walk(client, f"limit=3&is_read=false&created_after={created_after}")
+
+    ids = {contact_id for page in pages for contact_id in page}
+    assert ids == {
+        document["id"] for document in documents
+        if not document["is_read"] and document["created_at"] >= datetime(2026, 1, 1, 0, 6)
+    }
+
+async def test_bad_cursor_is_a_400(client):
+    response = await client.get("/api/contact?cursor=garbage")
+    assert response.status_code == 400
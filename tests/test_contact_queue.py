@@ -0,0 +1,166 @@
+import asyncio
+import fcntl
+import json
+from datetime import timedelta
+
+import pytest
+
+import contact_queue as contact_queue_module
+import routes.portfolio
+from contact_queue import ContactQueue, ContactQueueFull
+from database import database
+from models import Contact
+
+pytestmark = pytest.mark.anyio
+
+def _contact(n: int) -> dict:
+    return Contact(name=f"Visitor {n}", email=f"v{n}@example.com", message="Hello").model_dump()
+
+@pytest.fixture
+async def queue(app, tmp_path):
+    queue = ContactQueue()
+    await queue.start(str(tmp_path), batch_size=10, flush_interval=0.05)
+    yield queue
+    await queue.stop()
+
+async def _stored_ids():
+    return {document["id"] async for document in database.db.contacts.find({}, {"id": 1})}
+
+async def test_submissions_reach_mongo_and_the_journal_empties(queue):
+    contacts = [_contact(n) for n in range(25)]
+
+    await asyncio.gather(*(queue.submit(contact) for contact in contacts))
+    assert queue.journal_path.read_bytes().count(b"\n") == 25
+
+    await asyncio.sleep(0.2)
+    assert await _stored_ids() >= {contact["id"] for contact in contacts}
+    assert queue.journal_path.stat().st_size == 0
+    assert queue.stats()["pending"] == 0
+
+async def test_concurrent_submissions_share_one_fsync(queue, monkeypatch):
+    appends = []
+    append = queue._append
+    monkeypatch.setattr(queue, "_append", lambda data: (appends.append(data), append(data)))
+
+    await asyncio.gather(*(queue.submit(_contact(n)) for n in range(20)))
+
+    assert len(appends) < 20
+    assert sum(data.count(b"\n") for data in appends) == 20
+
+async def test_idle_queue_does_not_rewrite_the_journal(queue, monkeypatch):
+    await queue.submit(_contact(0))
+    await asyncio.sleep(0.15)
+
+    truncates = []
+    monkeypatch.setattr(queue, "_truncate", lambda: truncates.append(1))
+    await asyncio.sleep(0.3)
+
+    assert truncates == []
+
+async def test_orphaned_journal_is_replayed_once(app, tmp_path):
+    stored = _contact(0)
+    await database.db.contacts.insert_one(dict(stored))
+    orphan = tmp_path / "contacts-999999.journal"
+    lines = [Contact(**contact).model_dump_json() for contact in (stored, _contact(1), _contact(2))]
+    # A crash mid-write tears the last, never acknowledged, line
+    orphan.write_text("\n".join(lines) + '\n{"id": "torn", "na')
+
+    queue = ContactQueue()
+    await queue.start(str(tmp_path))
+    await queue.stop()
+
+    assert not orphan.exists()
+    assert queue.stats()["replayed"] == 3
+    assert await database.db.contacts.count_documents({}) == 3
+    assert "torn" not in await _stored_ids()
+
+async def test_journal_held_by_a_live_worker_is_left_alone(app, tmp_path):
+    live = tmp_path / "contacts-1.journal"
+    live.write_text(Contact(**_contact(0)).model_dump_json() + "\n")
+    with open(live, "rb") as journal:
+        fcntl.flock(journal.fileno(), fcntl.LOCK_EX)
+        queue = ContactQueue()
+        await queue.start(str(tmp_path))
+        await queue.stop()
+
+    assert live.exists()
+    assert await database.db.contacts.count_documents({}) == 0
+
+async def test_full_queue_refuses_submissions_with_503(queue, client, monkeypatch):
+    async def mongo_down(documents):
+        raise RuntimeError("mongo is down")
+
+    monkeypatch.setattr(contact_queue_module, "insert_contacts", mongo_down)
+    monkeypatch.setattr(routes.portfolio, "contact_queue", queue)
+    queue.max_pending = 2
+
+    await queue.submit(_contact(0))
+    await queue.submit(_contact(1))
+    with pytest.raises(ContactQueueFull):
+        await queue.submit(_contact(2))
+
+    response = await client.post("/api/contact", json={"name": "A", "email": "a@example.com", "message": "Hi"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "30"
+    assert queue.stats()["rejected"] == 2
+
+async def test_stop_keeps_the_journal_while_mongo_is_down(app, tmp_path, monkeypatch):
+    async def mongo_down(documents):
+        raise RuntimeError("mongo is down")
+
+    queue = ContactQueue()
+    await queue.start(str(tmp_path), flush_interval=0.05)
+    monkeypatch.setattr(contact_queue_module, "insert_contacts", mongo_down)
+    await queue.submit(_contact(0))
+    await queue.stop()
+
+    [line] = queue.journal_path.read_text().splitlines()
+    assert json.loads(line)["name"] == "Visitor 0"
+
+async def test_created_at_is_stamped_when_written(app, tmp_path):
+    queue = ContactQueue()
+    await queue.start(str(tmp_path), flush_interval=60)
+    contact = _contact(0)
+    submitted_at = contact["created_at"]
+
+    await queue.submit(contact)
+    await asyncio.sleep(0.1)
+    await queue.stop()
+
+    stored = await database.db.contacts.find_one({"id": contact["id"]})
+    # Later than the submission, so cursors taken in between do not skip it
+    assert stored["created_at"] - submitted_at >= timedelta(milliseconds=90)
+
+async def test_journal_of_a_starting_worker_is_never_replayed(app, tmp_path, monkeypatch):
+    stolen = []
+
+    def replay_from_another_worker():
+        """What a worker booting at this very moment would be able to replay"""
+        with open(tmp_path / "contacts.lock", "ab") as directory_lock:
+            try:
+                fcntl.flock(directory_lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return  # it waits for this start to finish
+            for path in tmp_path.glob("contacts-*.journal"):
+                with open(path, "rb") as journal:
+                    try:
+                        fcntl.flock(journal.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        continue
+                    stolen.append(path)
+
+    def racing_open(path, *args, **kwargs):
+        handle = open(path, *args, **kwargs)
+        if str(path).endswith(".journal"):
+            replay_from_another_worker()
+        return handle
+
+    queue = ContactQueue()
+    with monkeypatch.context() as patch:
+        patch.setattr(contact_queue_module, "open", racing_open, raising=False)
+        await queue.start(str(tmp_path))
+    replay_from_another_worker()
+
+    assert stolen == []
+    assert queue.journal_path.exists()
+    await queue.stop()
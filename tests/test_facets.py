@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from database import database
+from facets import TechnologyFacets
+
+pytestmark = pytest.mark.anyio
+
+class SlowCursor:
+    """Yields to the event loop before every document, like a Motor cursor between batches"""
+
+    def __init__(self, cursor, on_yield):
+        self.cursor = cursor
+        self.on_yield = on_yield
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await asyncio.sleep(0)
+        self.on_yield()
+        return await self.cursor.__anext__()
+
+class ProjectsReader:
+    """read_db stand-in whose projects.find goes through find_projects"""
+
+    def __init__(self, read_db, find_projects):
+        self.read_db = read_db
+        self.projects = self
+        self.find_projects = find_projects
+
+    def find(self, *args, **kwargs):
+        return self.find_projects(self.read_db.projects, *args, **kwargs)
+
+@pytest.fixture
+def facets(app, monkeypatch):
+    facets = TechnologyFacets()
+    facets.seen = []
+    slow_find = lambda projects, *args, **kwargs: SlowCursor(
+        projects.find(*args, **kwargs), lambda: facets.seen.append(facets.facets())
+    )
+    monkeypatch.setattr(database, "read_db", ProjectsReader(database.read_db, slow_find))
+    return facets
+
+def _counts(facets):
+    return {facet["value"]: facet["count"] for facet in facets.facets()}
+
+async def test_counts_active_projects(facets):
+    await facets.refresh()
+
+    assert facets.facets()[0] == {"value": "React", "count": 3}
+    assert _counts(facets)["Stripe API"] == 1
+
+async def test_overlapping_refreshes_never_expose_partial_counts(facets):
+    await facets.refresh()
+    expected = facets.facets()
+    facets.seen.clear()
+
+    facets.mark_stale("projects", None)
+    rebuild = asyncio.create_task(facets.refresh())
+    await asyncio.sleep(0)
+    # A second caller waits for the rebuild instead of reading half of it
+    await facets.refresh()
+
+    assert facets.facets() == expected
+    assert facets.seen and all(seen == expected for seen in facets.seen)
+    await rebuild
+
+async def test_writes_only_move_the_touched_projects(facets):
+    await facets.refresh()
+    await database.db.projects.update_one({"id": "project-1"}, {"$set": {"technologies": ["Vue", "Vue", "TypeScript"]}})
+    await database.db.projects.update_one({"id": "project-2"}, {"$set": {"is_active": False}})
+
+    facets.mark_stale("projects", ["project-1", "project-2"])
+    facets.seen.clear()
+    await facets.refresh()
+
+    counts = _counts(facets)
+    assert counts["React"] == 1
+    assert counts["Vue"] == 1
+    assert "D3.js" not in counts and "Next.js" not in counts
+    # Only the two touched projects were read
+    assert len(facets.seen) <= 3
+
+async def test_other_collections_are_ignored(facets):
+    await facets.refresh()
+    facets.mark_stale("services", None)
+
+    facets.seen.clear()
+    await facets.refresh()
+
+    assert facets.seen == []
+
+async def test_failed_refresh_is_retried(facets, monkeypatch):
+    await facets.refresh()
+    expected = facets.facets()
+    facets.mark_stale("projects", None)
+
+    with monkeypatch.context() as patch:
+        def unreachable(projects, *args, **kwargs):
+            raise RuntimeError("mongo is down")
+
+        patch.setattr(database.read_db, "find_projects", unreachable)
+        with pytest.raises(RuntimeError):
+            await facets.refresh()
+    assert facets.facets() == expected
+
+    await database.db.projects.update_one({"id": "project-3"}, {"$set": {"is_active": False}})
+    await facets.refresh()
+
+    assert _counts(facets)["React"] == 2
+
+async def test_facets_endpoint_follows_writes(client):
+    before = (await client.get("/api/projects/facets")).json()["technologies"]
+    assert before[0] == {"value": "React", "count": 3}
+
+    await client.put("/api/projects/project-3", json={"technologies": ["Svelte"]})
+
+    after = {facet["value"]: facet["count"] for facet in (await client.get("/api/projects/facets")).json()["technologies"]}
+    assert after["React"] == 2
+    assert after["Svelte"] == 1
+    assert "Framer Motion" not in after
@@ -0,0 +1,59 @@
+import pytest
+
+import database as database_module
+from database import create_indexes, database, index_fingerprint
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def backfills(app, monkeypatch):
+    """Startup work done since the fixture was set up"""
+    calls = []
+    backfill = database_module.backfill_missing_ids
+
+    async def recording_backfill():
+        calls.append("backfill")
+        return await backfill()
+
+    monkeypatch.setattr(database_module, "backfill_missing_ids", recording_backfill)
+    return calls
+
+async def _index_names(collection_name):
+    return {index["name"] async for index in database.db[collection_name].list_indexes()}
+
+async def test_first_startup_records_the_registry(app):
+    marker = await database.db.app_meta.find_one({"_id": "startup"})
+
+    assert marker["index_fingerprint"] == index_fingerprint()
+
+async def test_unchanged_registry_skips_the_rebuild_but_still_reports(client, backfills):
+    await database.db.services.create_index("title", name="stray")
+
+    await create_indexes()
+
+    assert backfills == []
+    report = (await client.get("/api/stats/indexes")).json()
+    assert report["services"] == {"missing": [], "extra": ["stray"], "mismatched": []}
+    assert report["projects"] == {"missing": [], "extra": [], "mismatched": []}
+
+async def test_dropped_index_is_recreated_on_the_next_startup(client, backfills):
+    await database.db.contacts.drop_index("id_1")
+
+    await create_indexes()
+
+    assert backfills == ["backfill"]
+    assert "id_1" in await _index_names("contacts")
+    assert (await client.get("/api/stats/indexes")).json()["contacts"]["missing"] == ["id_1"]
+
+    await create_indexes()
+
+    assert backfills == ["backfill"]
+    assert (await client.get("/api/stats/indexes")).json()["contacts"]["missing"] == []
+
+async def test_changed_registry_reconciles(app, backfills):
+    await database_module.write_startup_marker(index_fingerprint="older")
+
+    await create_indexes()
+
+    assert backfills == ["backfill"]
+    assert database.startup_marker["index_fingerprint"] == index_fingerprint()
@@ -0,0 +1,189 @@
+import asyncio
+import os
+
+import pytest
+
+import database as database_module
+from database import collection_versions, database
+from invalidation import CacheInvalidator, VERSIONS_COLLECTION
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def invalidator(app, monkeypatch):
+    """A poll-mode invalidator whose write listener is dropped after the test"""
+    monkeypatch.setattr(database_module, "_write_listeners", list(database_module._write_listeners))
+    invalidator = CacheInvalidator()
+    # Polls are driven by the tests
+    await invalidator.start("poll", poll_interval=3600)
+    yield invalidator
+    await invalidator.stop()
+
+async def _write_from_other_worker(title: str):
+    """What another worker's PUT /api/services/service-1 leaves in the database"""
+    await database.db.services.update_one({"id": "service-1"}, {"$set": {"title": title}})
+    await database.db[VERSIONS_COLLECTION].update_one(
+        {"_id": "services"}, {"$inc": {"version": 1}, "$setOnInsert": {"epoch": "remote"}}, upsert=True
+    )
+
+async def test_poll_applies_remote_writes(invalidator, client):
+    etag = (await client.get("/api/services")).headers["etag"]
+
+    await _write_from_other_worker("Remote")
+    # Nothing has told this worker yet
+    assert (await client.get("/api/services", headers={"If-None-Match": etag})).status_code == 304
+
+    await invalidator._poll_once()
+
+    response = await client.get("/api/services", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()[0]["title"] == "Remote"
+    assert invalidator.stats()["remote_invalidations"] == 1
+
+async def test_several_remote_writes_between_polls(invalidator, client):
+    await client.get("/api/services")
+    for n in range(3):
+        await _write_from_other_worker(f"Remote {n}")
+
+    await invalidator._poll_once()
+
+    assert (await client.get("/api/services")).json()[0]["title"] == "Remote 2"
+    assert invalidator.stats()["remote_invalidations"] == 1
+
+async def test_own_writes_are_published_but_not_applied_again(invalidator, client):
+    await client.put("/api/services/service-1", json={"title": "Local"})
+    await asyncio.gather(*invalidator._publishing)
+    version = collection_versions.get("services")
+
+    await invalidator._poll_once()
+
+    counter = await database.db[VERSIONS_COLLECTION].find_one({"_id": "services"})
+    assert counter["version"] == 1
+    assert collection_versions.get("services") == version
+    assert invalidator.stats() == {"mode": "poll", "running": True, "remote_invalidations": 0, "published": 1, "errors": 0}
+
+async def test_remote_writes_interleaved_with_own_are_applied(invalidator, client):
+    await _write_from_other_worker("Remote")
+    await client.put("/api/services/service-2", json={"title": "Local"})
+    await asyncio.gather(*invalidator._publishing)
+
+    await invalidator._poll_once()
+
+    titles = [service["title"] for service in (await client.get("/api/services")).json()]
+    assert titles[:2] == ["Remote", "Local"]
+    assert invalidator.stats()["remote_invalidations"] == 1
+
+class ChangeStream:
+    """Stand-in for a Motor change stream yielding prepared events, then idling"""
+
+    def __init__(self, events):
+        self.events = events
+        self.resume_token = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.events:
+            await asyncio.Event().wait()
+        self.resume_token = {"_data": len(self.events)}
+        return self.events.pop(0)
+
+async def test_change_stream_events_invalidate(app, monkeypatch):
+    events = [
+        {"operationType": "insert", "ns": {"coll": "services"}, "fullDocument": {"id": "service-9"}},
+        {"operationType": "update", "ns": {"coll": "projects"}},
+    ]
+    monkeypatch.setattr(database.db, "watch", lambda pipeline, resume_after=None: ChangeStream(events))
+    bumps = []
+    monkeypatch.setattr(database_module, "_write_listeners", [lambda name, ids: bumps.append((name, ids))])
+
+    invalidator = CacheInvalidator()
+    await invalidator.start("changestream")
+    await asyncio.sleep(0.05)
+    await invalidator.stop()
+
+    assert bumps == [("services", ["service-9"]), ("projects", None)]
+    assert invalidator.stats()["remote_invalidations"] == 2
+
+async def test_change_stream_counters_become_validators(app, monkeypatch):
+    events = [
+        {"operationType": "update", "ns": {"coll": "services"}},
+        {
+            "operationType": "update", "ns": {"coll": VERSIONS_COLLECTION}, "documentKey": {"_id": "services"},
+            "updateDescription": {"updatedFields": {"version": 4}}
+        },
+    ]
+    monkeypatch.setattr(database.db, "watch", lambda pipeline, resume_after=None: ChangeStream(events))
+    monkeypatch.setattr(database_module, "_write_listeners", list(database_module._write_listeners))
+
+    invalidator = CacheInvalidator()
+    await invalidator.start("changestream")
+    await asyncio.sleep(0.05)
+    await invalidator.stop()
+
+    assert collection_versions.etag("services") == '":4"'
+
+# ETags and workers
+def _validator(counter) -> str:
+    return f'"{counter["epoch"]}:{counter["version"]}"'
+
+async def _etag(client) -> str:
+    return (await client.get("/api/services")).headers["etag"].removeprefix("W/")
+
+async def test_workers_agree_on_etags(invalidator, client):
+    etag = (await client.get("/api/services")).headers["etag"]
+
+    # Another worker, or this one after a restart: its own epoch, the same counters
+    collection_versions.new_epoch()
+    await CacheInvalidator()._poll_once(apply=False)
+
+    assert (await client.get("/api/services", headers={"If-None-Match": etag})).status_code == 304
+
+async def test_local_writes_take_the_shared_counter_as_etag(invalidator, client):
+    await client.put("/api/services/service-1", json={"title": "Local"})
+    # Not counted yet: nobody else may hand out the same validator
+    assert collection_versions.epoch in await _etag(client)
+
+    await asyncio.gather(*invalidator._publishing)
+
+    counter = await database.db[VERSIONS_COLLECTION].find_one({"_id": "services"})
+    assert await _etag(client) == _validator(counter)
+
+async def test_poll_racing_a_publish_settles_on_the_shared_counter(invalidator, client):
+    await client.put("/api/services/service-1", json={"title": "Local"})
+    await _write_from_other_worker("Remote")
+
+    await invalidator._poll_once()
+    await asyncio.gather(*invalidator._publishing)
+
+    counter = await database.db[VERSIONS_COLLECTION].find_one({"_id": "services"})
+    assert counter["version"] == 2
+    assert await _etag(client) == _validator(counter)
+
+async def test_etags_without_invalidation_stay_per_worker(client):
+    etag = (await client.get("/api/services")).headers["etag"]
+
+    collection_versions.new_epoch()
+
+    assert (await client.get("/api/services", headers={"If-None-Match": etag})).status_code == 200
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_workers_get_their_own_epoch():
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.write(write_end, collection_versions.epoch.encode())
+        os._exit(0)
+    os.close(write_end)
+    child_epoch = os.read(read_end, 64).decode()
+    os.waitpid(pid, 0)
+    os.close(read_end)
+
+    assert child_epoch and child_epoch != collection_versions.epoch
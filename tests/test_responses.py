@@ -0,0 +1,110 @@
+import gzip
+
+import pytest
+
+import responses
+from responses import CachedBody, ResponseCache, accepted_encodings, encoded_response
+
+pytestmark = pytest.mark.anyio
+
+# Content negotiation
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("gzip, deflate, br", ("br", "gzip")),
+    # Our preference, not the client's order or weights
+    ("gzip;q=1.0, br;q=0.5", ("br", "gzip")),
+    ("gzip;q=0, br", ("br",)),
+    ("br; q=0.000, GZIP", ("gzip",)),
+    ("gzip;q=0.001", ("gzip",)),
+    ("identity, deflate", ()),
+    ("", ()),
+])
+def test_accepted_encodings(accept_encoding, expected):
+    assert accepted_encodings(accept_encoding) == expected
+
+def _entry() -> CachedBody:
+    return CachedBody(b'{"a": 1}', {"gzip": b"gzipped", "br": b"brotli"})
+
+def test_br_is_served_before_gzip():
+    response = encoded_response(_entry(), "gzip, br", {"ETag": '"v1"'})
+
+    assert response.body == b"brotli"
+    assert response.headers["content-encoding"] == "br"
+
+def test_compressed_bodies_get_a_weak_etag_and_vary():
+    response = encoded_response(_entry(), "gzip", {"ETag": '"v1"'})
+
+    assert response.body == b"gzipped"
+    assert response.headers["etag"] == 'W/"v1"'
+    assert response.headers["vary"] == "Accept-Encoding"
+
+def test_identity_body_keeps_the_strong_etag():
+    response = encoded_response(_entry(), "gzip;q=0", {"ETag": '"v1"'})
+
+    assert response.body == b'{"a": 1}'
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == '"v1"'
+    assert response.headers["vary"] == "Accept-Encoding"
+
+def test_small_bodies_are_not_compressed():
+    response = encoded_response(CachedBody(b"{}", {}), "br, gzip", {"ETag": '"v1"'})
+
+    assert response.body == b"{}"
+    assert response.headers["etag"] == '"v1"'
+
+# Byte-bounded LRU
+async def test_store_compresses_large_bodies():
+    cache = ResponseCache(max_bytes=1 << 20, min_compress_bytes=100)
+    body = b'{"text": "' + b"portfolio " * 100 + b'"}'
+
+    entry = await cache.store("key", body)
+
+    assert gzip.decompress(entry.encodings["gzip"]) == body
+    assert entry.size == len(body) + sum(len(data) for data in entry.encodings.values())
+    assert (await cache.store("small", b"{}")).encodings == {}
+
+async def test_least_recently_used_entries_are_evicted_by_bytes():
+    cache = ResponseCache(max_bytes=250, min_compress_bytes=1 << 20)
+    for key in ("a", "b"):
+        await cache.store(key, b"x" * 100)
+    cache.get("a")
+
+    await cache.store("c", b"x" * 100)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["bytes"] == 200
+    assert cache.stats()["evictions"] == 1
+
+async def test_replacing_an_entry_keeps_the_byte_count():
+    cache = ResponseCache(max_bytes=1000, min_compress_bytes=1 << 20)
+    await cache.store("a", b"x" * 100)
+    await cache.store("a", b"x" * 300)
+
+    assert cache.stats()["bytes"] == 300
+    assert cache.stats()["entries"] == 1
+
+async def test_oversize_entry_is_served_but_not_stored():
+    cache = ResponseCache(max_bytes=250, min_compress_bytes=1 << 20)
+    await cache.store("a", b"x" * 100)
+
+    entry = await cache.store("big", b"x" * 300)
+
+    assert entry.body == b"x" * 300
+    assert cache.get("big") is None
+    assert cache.get("a") is not None
+    assert cache.stats()["bytes"] == 100
+
+# Through the app
+async def test_compressed_response_revalidates_with_its_weak_etag(client, monkeypatch):
+    monkeypatch.setattr(responses.response_cache, "min_compress_bytes", 0)
+    response = await client.get("/api/services", headers={"Accept-Encoding": "gzip"})
+    etag = response.headers["etag"]
+    assert etag.startswith("W/")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+
+    revalidated = await client.get("/api/services", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+    assert revalidated.headers["vary"] == "Accept-Encoding"
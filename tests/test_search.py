@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+from database import database
+from search import InvertedIndex, highlight, stem, terms
+
+pytestmark = pytest.mark.anyio
+
+# Tokenizer
+def test_terms_keep_technology_names_whole():
+    assert terms("Building Node.js apps with C++ and C#") == ["build", "node.js", "app", "c++", "c#"]
+
+@pytest.mark.parametrize("token, expected", [
+    ("companies", "company"), ("designing", "design"), ("focused", "focus"),
+    ("apps", "app"), ("class", "class"), ("ring", "ring"), ("bed", "bed"), ("bus", "bus"),
+])
+def test_stem(token, expected):
+    assert stem(token) == expected
+
+# Highlighting
+def test_highlight_escapes_everything_but_the_marks():
+    assert highlight("<b>React</b> & React Native", {"react"}) == (
+        "&lt;b&gt;<mark>React</mark>&lt;/b&gt; &amp; <mark>React</mark> Native"
+    )
+
+def test_highlight_matches_stems_and_trims_long_text():
+    text = "filler " * 30 + "Designed dashboards" + " tail" * 60
+
+    snippet = highlight(text, {"design", "dashboard"})
+
+    assert snippet.startswith("…") and snippet.endswith("…")
+    assert "<mark>Designed</mark> <mark>dashboards</mark>" in snippet
+    assert highlight(text, {"react"}) is None
+
+# Through the API, on the in-memory index
+@pytest.fixture
+async def services(client, monkeypatch):
+    monkeypatch.setenv("SEARCH_BACKEND", "memory")
+    ids = []
+    for n in range(5):
+        response = await client.post("/api/services", json={
+            "title": f"Quuxify tier {n}", "description": "Plain <script> text", "features": []
+        })
+        ids.append(response.json()["id"])
+    return ids
+
+async def test_pages_cover_every_hit_once(client, services):
+    pages = []
+    for offset in (0, 2, 4):
+        body = (await client.get(f"/api/search?q=quuxify&limit=2&offset={offset}")).json()
+        assert (body["offset"], body["limit"], body["backend"]) == (offset, 2, "memory")
+        pages.append(body)
+
+    assert [len(page["results"]) for page in pages] == [2, 2, 1]
+    assert [page["has_more"] for page in pages] == [True, True, False]
+    ids = [result["id"] for page in pages for result in page["results"]]
+    assert sorted(ids) == sorted(services)
+
+async def test_results_are_highlighted_and_escaped(client, services):
+    body = (await client.get("/api/search?q=quuxify script")).json()
+
+    result = body["results"][0]
+    assert result["collection"] == "services"
+    assert result["highlights"]["title"].startswith("<mark>Quuxify</mark>")
+    assert result["highlights"]["description"] == "Plain &lt;<mark>script</mark>&gt; text"
+
+async def test_writes_reach_the_index(client, services):
+    await client.put(f"/api/services/{services[0]}", json={"is_active": False})
+    await client.put(f"/api/services/{services[1]}", json={"title": "Renamed"})
+
+    ids = {result["id"] for result in (await client.get("/api/search?q=quuxify")).json()["results"]}
+
+    assert ids == set(services[2:])
+
+async def test_stopwords_only_query_has_no_results(client, services):
+    body = (await client.get("/api/search?q=the and of")).json()
+
+    assert body["results"] == [] and not body["has_more"]
+
+# Concurrent refreshes
+class SlowReader:
+    """read_db stand-in whose cursors yield to the event loop before every document"""
+
+    def __init__(self, read_db):
+        self.read_db = read_db
+
+    def __getitem__(self, collection_name):
+        return SlowCollection(self.read_db[collection_name])
+
+class SlowCollection:
+    def __init__(self, collection):
+        self.collection = collection
+
+    def find(self, *args, **kwargs):
+        return self._slow(self.collection.find(*args, **kwargs))
+
+    async def _slow(self, cursor):
+        async for document in cursor:
+            await asyncio.sleep(0)
+            yield document
+
+async def test_search_during_a_rebuild_waits_for_it(app, monkeypatch):
+    await database.db.services.insert_many([
+        {"id": f"bulk-{n}", "title": "Zorblax", "description": "", "features": [], "order": n, "is_active": True}
+        for n in range(200)
+    ])
+    monkeypatch.setattr(database, "read_db", SlowReader(database.read_db))
+    index = InvertedIndex()
+    await index.refresh()
+
+    index.mark_stale("services", None)
+    rebuild = asyncio.create_task(index.refresh())
+    await asyncio.sleep(0)
+    await index.refresh()
+
+    assert len(index.search(["zorblax"], 1000)) == 200
+    await rebuild